@@ -0,0 +1,36 @@
+"""
+Compares decode and decode+parse throughput for each installed JSON backend.
+
+    python -m benchmarks.bench_decode
+"""
+import json
+import timeit
+
+import rttapi.parser as parser
+from benchmarks import fixtures
+from rttapi.decoder import available_decoders, get_decoder
+
+
+def _rate(func, number: int) -> float:
+    return number / min(timeit.repeat(func, repeat=5, number=number))
+
+
+def main():
+    search = json.dumps(fixtures.search(services=500)).encode('utf-8')
+    service = json.dumps(fixtures.service(locations=80)).encode('utf-8')
+
+    print('{:<10} {:>16} {:>16} {:>16} {:>16}'.format(
+        'backend', 'search decode/s', 'search +parse/s', 'service decode/s', 'service +parse/s'))
+    for name in available_decoders():
+        decode = get_decoder(name)
+        print('{:<10} {:>16,.0f} {:>16,.0f} {:>16,.0f} {:>16,.0f}'.format(
+            name,
+            _rate(lambda: decode(search), 20),
+            _rate(lambda: parser.parse_search(decode(search)), 10),
+            _rate(lambda: decode(service), 200),
+            _rate(lambda: parser.parse_service(decode(service)), 100),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares answering station/time-window and origin to destination queries with a TimetableIndex against
+scanning the locations of every service, and times building and updating the index.
+
+    python -m benchmarks.bench_index
+"""
+import datetime
+import time
+import timeit
+from random import Random
+
+import rttapi.parser as parser
+from benchmarks import fixtures
+from rttapi.index import TimetableIndex, call_seconds
+
+_DAY = datetime.date(2021, 3, 27)
+
+
+def _shift(value: str, minutes: int) -> str:
+    return fixtures._hhmm(int(value[:2]) * 60 + int(value[2:4]) + minutes) + value[4:]
+
+
+def _services(count: int, calls: int) -> list:
+    """
+    :return: count parsed services of the given length, each starting at a different time of day
+    """
+    random = Random(1)
+    out = []
+    for i in range(count):
+        json = fixtures.service('W{:05d}'.format(i), calls)
+        offset = random.randrange(0, 20 * 60)
+        for pair in json['origin'] + json['destination']:
+            pair['workingTime'] = _shift(pair['workingTime'], offset)
+            pair['publicTime'] = _shift(pair['publicTime'], offset)
+        for location in json['locations']:
+            for key in ('wttBookedArrival', 'wttBookedDeparture', 'gbttBookedArrival', 'gbttBookedDeparture',
+                        'realtimeArrival', 'realtimeDeparture'):
+                location[key] = _shift(location[key], offset)
+        out.append(parser.parse_service(json))
+    return out
+
+
+def _scan_calls(services: list, code: str, start: int, end: int) -> list:
+    return [(service, location) for service in services for location in service.locations
+            if code in (location.crs, location.tiploc) and start <= (call_seconds(location) or -1) < end]
+
+
+def _scan_journeys(services: list, origin: str, destination: str, start: int, end: int) -> list:
+    out = []
+    for service in services:
+        for i, location in enumerate(service.locations):
+            if origin in (location.crs, location.tiploc) and start <= (call_seconds(location) or -1) < end:
+                if any(destination in (later.crs, later.tiploc) for later in service.locations[i + 1:]):
+                    out.append(service)
+                    break
+    return out
+
+
+def main(count: int = 10000, calls: int = 20):
+    begin = time.perf_counter()
+    services = _services(count, calls)
+    print('{} services of {} calls, parsed in {:.1f} s'.format(count, calls, time.perf_counter() - begin))
+
+    begin = time.perf_counter()
+    index = TimetableIndex(services)
+    print('add_all            {:10.1f} ms'.format((time.perf_counter() - begin) * 1000))
+
+    begin = time.perf_counter()
+    one_by_one = TimetableIndex()
+    for service in services:
+        one_by_one.add(service)
+    print('add each           {:10.1f} ms'.format((time.perf_counter() - begin) * 1000))
+
+    start, end = datetime.datetime.combine(_DAY, datetime.time(8)), datetime.datetime.combine(_DAY, datetime.time(9))
+    cases = (
+        ('calls_at', lambda: index.calls_at('CLJ', start, end),
+         lambda: _scan_calls(services, 'CLJ', 8 * 3600, 9 * 3600)),
+        ('journeys', lambda: index.journeys('WOK', 'BOG', start, end),
+         lambda: _scan_journeys(services, 'WOK', 'BOG', 8 * 3600, 9 * 3600)),
+    )
+    for name, indexed, scan in cases:
+        assert len(indexed()) == len(scan())
+        index_seconds = min(timeit.repeat(indexed, repeat=5, number=10)) / 10
+        scan_seconds = min(timeit.repeat(scan, repeat=3, number=1))
+        print('{:<10} {:5d} hits  index {:8.3f} ms   scan {:8.1f} ms   {:6.0f}x'.format(
+            name, len(indexed()), index_seconds * 1000, scan_seconds * 1000, scan_seconds / index_seconds))
+
+    update = services[::100]
+    seconds = min(timeit.repeat(lambda: [index.add(service) for service in update], repeat=5, number=1))
+    print('update             {:10.1f} us/service'.format(seconds / len(update) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Reports the memory used per parsed Service, comparing the slotted model classes against
+equivalent __dict__-based objects (the layout the model used before it adopted __slots__),
+and the memory retained with and without string interning when each service is decoded from
+its own response body.
+
+    python -m benchmarks.bench_memory
+"""
+import datetime
+import json
+
+import rttapi.parser as parser
+from benchmarks import fixtures
+from benchmarks.common import memory_per as _measure
+
+
+class _Plain:
+    """ A __dict__-based stand-in for a model object """
+    pass
+
+
+def _to_plain(obj):
+    if isinstance(obj, list):
+        return [_to_plain(item) for item in obj]
+    if not hasattr(type(obj), '__slots__') or isinstance(obj, (str, datetime.date)):
+        return obj
+
+    out = _Plain()
+    for name in type(obj).__slots__:
+        setattr(out, name, _to_plain(getattr(obj, name)))
+    return out
+
+
+def main(count: int = 500, locations: int = 80):
+    payloads = [fixtures.service('W{:05d}'.format(i), locations) for i in range(count)]
+
+    slotted = _measure(lambda i: parser.parse_service(payloads[i]), count)
+    plain = _measure(lambda i: _to_plain(parser.parse_service(payloads[i])), count)
+
+    print('{} services x {} locations'.format(count, locations))
+    print('__dict__ objects: {:10.0f} bytes per Service'.format(plain))
+    print('__slots__ objects:{:10.0f} bytes per Service ({:.0%} of before)'.format(slotted, slotted / plain))
+
+    bodies = [json.dumps(payload).encode('utf-8') for payload in payloads]
+    pool = parser.get_intern_pool()
+    try:
+        parser.set_intern_pool(None)
+        separate = _measure(lambda i: parser.parse_service(json.loads(bodies[i])), count)
+        parser.set_intern_pool(parser.InternPool())
+        interned = _measure(lambda i: parser.parse_service(json.loads(bodies[i])), count)
+    finally:
+        parser.set_intern_pool(pool)
+
+    print('decoded separately, not interned: {:10.0f} bytes per Service'.format(separate))
+    print('decoded separately, interned:     {:10.0f} bytes per Service ({:.0%} of before)'.format(
+        interned, interned / separate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Measures rttapi.parser throughput on synthetic payloads.
+
+    python -m benchmarks.bench_parser
+"""
+import datetime
+
+import rttapi.parser as parser
+from benchmarks import fixtures
+from benchmarks.common import rate as _rate
+
+def main():
+    service = fixtures.service(locations=80)
+    search = fixtures.search(services=500)
+    locations = service['locations']
+
+    print('parse_location: {:12,.0f} locations/sec'.format(
+        _rate(lambda: [parser.parse_location(location) for location in locations], len(locations))))
+    print('parse_service:  {:12,.0f} locations/sec'.format(
+        _rate(lambda: parser.parse_service(service), len(locations))))
+    print('parse_search:   {:12,.0f} services/sec'.format(
+        _rate(lambda: parser.parse_search(search), len(search['services']), number=2)))
+
+    run_dates = [service['runDate'] for service in search['services']]
+    strptime = _rate(lambda: [datetime.datetime.strptime(value, "%Y-%m-%d").date() for value in run_dates],
+                     len(run_dates))
+    memo = _rate(lambda: [parser._parse_run_date(value) for value in run_dates], len(run_dates))
+    print('run_date (500-service search):')
+    print('  strptime:       {:8.3f} us/service'.format(1e6 / strptime))
+    print('  memoised:       {:8.3f} us/service'.format(1e6 / memo))
+
+
+if __name__ == '__main__':
+    main()
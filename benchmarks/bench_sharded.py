@@ -0,0 +1,85 @@
+"""
+Measures how the number of boards polled, parsed and published per second by a ShardedPoller scales with its
+number of worker processes, against the local stub server running in a process of its own.
+
+    python -m benchmarks.bench_sharded
+
+Scaling is bounded by the number of CPU cores, which must also run the stub server.
+"""
+import collections
+import json
+import multiprocessing
+import time
+
+from benchmarks import fixtures
+from benchmarks.stub_server import StubServer
+from rttapi.sharded import ShardedPoller
+
+
+class _ChangingServer(StubServer):
+    """
+    Serves every station's board with a platform alternately changed and restored, so that each poll is
+    published rather than skipped as unchanged.
+    """
+
+    def __init__(self, services: int):
+        super().__init__(services=services)
+        board = fixtures.search(services=services)
+        self.__boards = [json.dumps(board).encode('utf-8')]
+        board['services'][0]['locationDetail']['platform'] = 'X'
+        self.__boards.append(json.dumps(board).encode('utf-8'))
+        self.__polls = collections.Counter()
+
+    def body_for(self, path: str):
+        if '/search/' not in path:
+            return super().body_for(path)
+        self.__polls[path] += 1
+        return self.__boards[self.__polls[path] % 2]
+
+
+def _serve(services: int, ready, stop, address):
+    with _ChangingServer(services) as server:
+        address.put(server.base_url)
+        ready.set()
+        stop.wait()
+
+
+def _throughput(base_url: str, processes: int, stations: int, seconds: float) -> float:
+    codes = ['S{:03d}'.format(i) for i in range(stations)]
+    with ShardedPoller('user', 'pass', codes, processes=processes, budget=10000, min_interval=0,
+                       base_url=base_url) as poller:
+        # Let every worker start and poll once before measuring
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline and not all(poller.store.version(code) for code in codes):
+            time.sleep(0.05)
+
+        before = sum(poller.store.version(code) for code in codes)
+        start = time.monotonic()
+        time.sleep(seconds)
+        published = sum(poller.store.version(code) for code in codes) - before
+        return published / (time.monotonic() - start)
+
+
+def main(services: int = 300, stations: int = 64, seconds: float = 5.0):
+    ready, stop, address = multiprocessing.Event(), multiprocessing.Event(), multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(services, ready, stop, address), daemon=True)
+    server.start()
+    ready.wait()
+    base_url = address.get()
+
+    cores = multiprocessing.cpu_count()
+    counts = sorted({1, 2, 4, max(1, cores - 1), cores})
+    print('{} cores, {} stations, {} services per board'.format(cores, stations, services))
+    single = None
+    try:
+        for processes in counts:
+            boards = _throughput(base_url, processes, stations, seconds)
+            single = single or boards
+            print('{:>3} processes: {:8.1f} boards/s  ({:.2f}x)'.format(processes, boards, boards / single))
+    finally:
+        stop.set()
+        server.join()
+
+
+if __name__ == '__main__':
+    main()
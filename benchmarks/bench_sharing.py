@@ -0,0 +1,61 @@
+"""
+Compares re-parsing a polled station board from scratch against parsing it with an IdentityTable, when a
+fraction of its services change between polls, in time and in memory allocated per poll.
+
+    python -m benchmarks.bench_sharing
+"""
+import json
+import timeit
+import tracemalloc
+
+import rttapi.parser as parser
+from benchmarks import fixtures
+from rttapi.decoder import get_decoder
+from rttapi.sharing import IdentityTable
+
+
+def _polls(count: int, changed: float) -> list:
+    """
+    :return: count raw bodies of the terminus board, each with a different share of services changed
+    """
+    board = json.loads(fixtures.load('terminus'))
+    step = max(1, int(1 / changed))
+    out = []
+    for poll in range(count):
+        for service in board['services'][poll % step::step]:
+            service['locationDetail']['realtimeDeparture'] = '{:04d}'.format(poll)
+        out.append(json.dumps(board).encode('utf-8'))
+    return out
+
+
+def _allocated(func) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(polls: int = 10, changed: float = 0.05):
+    decode = get_decoder()
+    decoded = [decode(body) for body in _polls(polls, changed)]
+    services = len(decoded[0]['services'])
+
+    def plain():
+        for board in decoded:
+            parser.parse_search(board)
+
+    def shared(table=IdentityTable()):
+        for board in decoded:
+            parser.parse_search(board, table=table)
+
+    shared()
+    print('{} services, {:.0%} changed per poll'.format(services, changed))
+    for name, func in (('plain', plain), ('shared', shared)):
+        seconds = min(timeit.repeat(func, repeat=5, number=1)) / polls
+        print('{:<8} {:8.2f} ms/poll   peak {:8.0f} KiB allocated'.format(
+            name, seconds * 1000, _allocated(func) / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Compares time-to-first-result of the streaming search (RttApi.iter_station_departures) against the buffered
+search (RttApi.search_station_departures) for a large station board served by the local stub server.
+
+    python -m benchmarks.bench_stream
+"""
+import statistics
+
+from benchmarks.common import timings
+from benchmarks.stub_server import StubServer
+from rttapi.api import RttApi
+
+
+def _time(func, repeat: int) -> float:
+    return statistics.median(timings(func, repeat)) * 1000
+
+
+def main(services: int = 2000, repeat: int = 20):
+    with StubServer(services=services) as server:
+        api = RttApi('user', 'pass', base_url=server.base_url)
+
+        print('{} services'.format(services))
+        print('buffered, full board:     {:8.2f} ms'.format(
+            _time(lambda: api.search_station_departures('WAT'), repeat)))
+        print('streaming, full board:    {:8.2f} ms'.format(
+            _time(lambda: list(api.iter_station_departures('WAT')), repeat)))
+        print('streaming, first result:  {:8.2f} ms'.format(
+            _time(lambda: next(api.iter_station_departures('WAT')), repeat)))
+        api.close()
+
+
+if __name__ == '__main__':
+    main()
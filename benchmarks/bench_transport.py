@@ -0,0 +1,34 @@
+"""
+Compares per-call latency of a fresh connection per request (SimpleTransport) against
+a pooled keep-alive connection (PooledTransport), using the local stub server.
+
+    python -m benchmarks.bench_transport
+"""
+import statistics
+
+from benchmarks.common import percentile, timings
+from benchmarks.stub_server import StubServer
+from rttapi.api import RttApi
+from rttapi.transport import PooledTransport, SimpleTransport
+
+
+def run(transport, base_url: str, calls: int) -> list:
+    api = RttApi('user', 'pass', transport=transport, base_url=base_url)
+    out = timings(lambda: api.search_station_departures('CLJ'), calls)
+    api.close()
+    return out
+
+
+def main(calls: int = 200):
+    with StubServer() as server:
+        for name, transport in (('simple', SimpleTransport()), ('pooled', PooledTransport())):
+            durations = run(transport, server.base_url, calls)
+            print('{:<8} median {:7.3f} ms   p95 {:7.3f} ms'.format(
+                name,
+                statistics.median(durations) * 1000,
+                percentile(durations, 95) * 1000
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Measurement helpers shared by the benchmarks.
+"""
+import time
+import timeit
+import tracemalloc
+from typing import Callable, List, Sequence
+
+
+def rate(func: Callable, items: int, repeat: int = 5, number: int = 20) -> float:
+    """
+    :return: items processed per second by func, from the best of repeat runs of number calls
+    """
+    best = min(timeit.repeat(func, repeat=repeat, number=number))
+    return items * number / best
+
+
+def timings(func: Callable, calls: int) -> List[float]:
+    """
+    :return: The duration in seconds of each of calls calls to func
+    """
+    out = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        out.append(time.perf_counter() - start)
+    return out
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """
+    :return: The p-th percentile of values, interpolating linearly as numpy.percentile does
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def memory_per(build: Callable[[int], object], count: int) -> float:
+    """
+    :param build: Called with 0 to count - 1, returning the objects to measure
+    :return: The average number of bytes allocated and kept alive per object built
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [build(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del kept
+    return total / count
@@ -0,0 +1,323 @@
+"""
+Synthetic RTT API payloads for benchmarking.
+
+The generated dicts follow the shape of the real api.rtt.io responses closely enough to exercise every
+branch of rttapi.parser. search() and service() are uniform and sized freely; the SCENARIOS are irregular like
+real boards and are recorded to benchmarks/data so every run measures the same bytes.
+"""
+import datetime
+import gzip
+import pathlib
+from random import Random
+
+_STATIONS = [
+    ('CLPHMJC', 'CLJ', 'Clapham Junction'),
+    ('WATRLMN', 'WAT', 'London Waterloo'),
+    ('VICTRIC', 'VIC', 'London Victoria'),
+    ('WOKING', 'WOK', 'Woking'),
+    ('BSNGSTK', 'BSK', 'Basingstoke'),
+    ('WINCHSTR', 'WIN', 'Winchester'),
+    ('SOTON', 'SOU', 'Southampton Central'),
+    ('BMTH', 'BMH', 'Bournemouth'),
+    ('GUILDFD', 'GLD', 'Guildford'),
+    ('HAVANT', 'HAV', 'Havant'),
+    ('PORTSMH', 'PMH', 'Portsmouth Harbour'),
+    ('BOGNORR', 'BOG', 'Bognor Regis'),
+]
+
+_OPERATORS = [('SW', 'South Western Railway'), ('SN', 'Southern'), ('GW', 'Great Western Railway')]
+
+
+def _hhmm(minutes: int) -> str:
+    minutes %= 24 * 60
+    return "{:02d}{:02d}".format(minutes // 60, minutes % 60)
+
+
+def _pair(station: tuple, minutes: int) -> dict:
+    tiploc, _, name = station
+    return {
+        'tiploc': tiploc,
+        'description': name,
+        'workingTime': _hhmm(minutes) + '00',
+        'publicTime': _hhmm(minutes)
+    }
+
+
+def location(station: tuple, minutes: int, origin: tuple, destination: tuple, start: int, end: int,
+             lateness: int = 0) -> dict:
+    """
+    Builds a single fully-populated location dict.
+    """
+    tiploc, crs, name = station
+    return {
+        'realtimeActivated': True,
+        'tiploc': tiploc,
+        'crs': crs,
+        'description': name,
+        'wttBookedArrival': _hhmm(minutes) + '00',
+        'wttBookedDeparture': _hhmm(minutes + 1) + '00',
+        'gbttBookedArrival': _hhmm(minutes),
+        'gbttBookedDeparture': _hhmm(minutes + 1),
+        'origin': [_pair(origin, start)],
+        'destination': [_pair(destination, end)],
+        'isCall': True,
+        'isPublicCall': True,
+        'realtimeArrival': _hhmm(minutes + lateness),
+        'realtimeArrivalActual': False,
+        'realtimeGbttArrivalLateness': lateness,
+        'realtimeDeparture': _hhmm(minutes + 1 + lateness),
+        'realtimeDepartureActual': False,
+        'realtimeGbttDepartureLateness': lateness,
+        'platform': str(1 + minutes % 12),
+        'platformConfirmed': minutes % 2 == 0,
+        'platformChanged': False,
+        'line': 'F',
+        'displayAs': 'CALL'
+    }
+
+
+def search(crs: str = 'CLJ', services: int = 50, run_date: datetime.date = datetime.date(2021, 3, 27)) -> dict:
+    """
+    Builds a station search payload with the given number of services.
+    """
+    station = next((s for s in _STATIONS if s[1] == crs), (crs, crs, crs))
+    out = []
+    for i in range(services):
+        origin = _STATIONS[i % len(_STATIONS)]
+        destination = _STATIONS[(i + 5) % len(_STATIONS)]
+        start = 300 + i * 2
+        atoc_code, atoc_name = _OPERATORS[i % len(_OPERATORS)]
+        out.append({
+            'locationDetail': location(station, start + 20, origin, destination, start, start + 90, i % 7),
+            'serviceUid': 'W{:05d}'.format(i),
+            'runDate': run_date.isoformat(),
+            'trainIdentity': '2M{:02d}'.format(i % 100),
+            'runningIdentity': '2M{:02d}'.format(i % 100),
+            'atocCode': atoc_code,
+            'atocName': atoc_name,
+            'serviceType': 'train',
+            'isPassenger': True,
+            'countdownMinutes': i
+        })
+    return {
+        'location': {'name': station[2], 'crs': station[1], 'tiploc': station[0]},
+        'filter': None,
+        'services': out
+    }
+
+
+def service(service_uid: str = 'W00001', locations: int = 80,
+            run_date: datetime.date = datetime.date(2021, 3, 27)) -> dict:
+    """
+    Builds a service detail payload calling at the given number of locations.
+    """
+    origin = _STATIONS[0]
+    destination = _STATIONS[-1]
+    start = 22 * 60
+    end = start + locations * 3
+    return {
+        'serviceUid': service_uid,
+        'runDate': run_date.isoformat(),
+        'serviceType': 'train',
+        'isPassenger': True,
+        'trainIdentity': '1A23',
+        'powerType': 'EMU',
+        'trainClass': 'S',
+        'atocCode': 'SW',
+        'atocName': 'South Western Railway',
+        'performanceMonitored': True,
+        'origin': [_pair(origin, start)],
+        'destination': [_pair(destination, end)],
+        'locations': [
+            location(_STATIONS[i % len(_STATIONS)], start + i * 3, origin, destination, start, end, i % 4)
+            for i in range(locations)
+        ],
+        'realtimeActivated': True,
+        'runningIdentity': '1A23'
+    }
+
+
+_TERMINUS = ('WATRLMN', 'WAT', 'London Waterloo')
+_SMALL_STATION = ('BOGNORR', 'BOG', 'Bognor Regis')
+
+_LONG_DISTANCE_CALLS = [
+    _TERMINUS, ('CLPHMJC', 'CLJ', 'Clapham Junction'), ('SURBITN', 'SUR', 'Surbiton'), ('WOKING', 'WOK', 'Woking'),
+    ('FRNBRMN', 'FNB', 'Farnborough (Main)'), ('FLEET', 'FLE', 'Fleet'), ('BSNGSTK', 'BSK', 'Basingstoke'),
+    ('WINCHSTR', 'WIN', 'Winchester'), ('ESTLEGH', 'ESL', 'Eastleigh'), ('SOTPKWY', 'SOA', 'Southampton Airport'),
+    ('SOTON', 'SOU', 'Southampton Central'), ('TOTTON', 'TTN', 'Totton'), ('BKNHRST', 'BCU', 'Brockenhurst'),
+    ('NMILTON', 'NWM', 'New Milton'), ('CHRISTC', 'CHR', 'Christchurch'), ('POKSDWN', 'POK', 'Pokesdown'),
+    ('BMTH', 'BMH', 'Bournemouth'), ('BRANKSM', 'BSM', 'Branksome'), ('PSTONE', 'PKS', 'Parkstone'),
+    ('POOLE', 'POO', 'Poole'), ('HAMWTHY', 'HAM', 'Hamworthy'), ('WARHAM', 'WRM', 'Wareham'),
+    ('DRCHS', 'DCH', 'Dorchester South'), ('WEYMTH', 'WEY', 'Weymouth'),
+]
+
+_CANCEL_REASONS = [
+    ('TG', 'a shortage of train crew', 'This train has been cancelled because of a shortage of train crew'),
+    ('IB', 'a fault with the signalling system',
+     'This train has been cancelled because of a fault with the signalling system'),
+    ('OC', 'a late running freight train', 'This train has been cancelled because of a late running freight train'),
+]
+
+
+def _call(random, station: tuple, minutes: int, origin: dict, destination: dict, lateness: int,
+          actual: bool, first: bool = False, last: bool = False, cancelled: bool = False) -> dict:
+    """
+    Builds a public calling point the way api.rtt.io reports it: no arrival at the origin, no departure at
+    the destination, forecasts until the train has passed and fields such as lateness only when known.
+    """
+    tiploc, crs, name = station
+    out = {
+        'realtimeActivated': True,
+        'tiploc': tiploc,
+        'crs': crs,
+        'description': name,
+        'origin': [origin],
+        'destination': [destination],
+        'isCall': True,
+        'isPublicCall': True,
+    }
+    if not first:
+        out['wttBookedArrival'] = _hhmm(minutes) + ('30' if minutes % 3 == 0 else '00')
+        out['gbttBookedArrival'] = _hhmm(minutes)
+        out['realtimeArrival'] = _hhmm(minutes + lateness)
+        out['realtimeArrivalActual'] = actual
+        if actual or lateness:
+            out['realtimeGbttArrivalLateness'] = lateness
+            out['realtimeWttArrivalLateness'] = lateness
+    if not last:
+        out['wttBookedDeparture'] = _hhmm(minutes + 1) + '00'
+        out['gbttBookedDeparture'] = _hhmm(minutes + 1)
+        out['realtimeDeparture'] = _hhmm(minutes + 1 + lateness)
+        out['realtimeDepartureActual'] = actual
+        if actual or lateness:
+            out['realtimeGbttDepartureLateness'] = lateness
+            out['realtimeWttDepartureLateness'] = lateness
+    if random.random() < 0.9:
+        out['platform'] = str(random.randint(1, 19))
+        out['platformConfirmed'] = actual or random.random() < 0.5
+        out['platformChanged'] = random.random() < 0.05
+    if random.random() < 0.4:
+        out['line'] = random.choice('FSCD')
+        out['lineConfirmed'] = actual
+    if random.random() < 0.2:
+        out['path'] = random.choice('FSU')
+        out['pathConfirmed'] = actual
+    out['displayAs'] = 'ORIGIN' if first else 'DESTINATION' if last else 'CALL'
+    if cancelled:
+        code, short_text, long_text = random.choice(_CANCEL_REASONS)
+        out['displayAs'] = 'CANCELLED_CALL'
+        out['cancelReasonCode'] = code
+        out['cancelReasonShortText'] = short_text
+        out['cancelReasonLongText'] = long_text
+        for key in ('realtimeArrival', 'realtimeDeparture'):
+            out.pop(key, None)
+    return out
+
+
+def _search_service(random, station: tuple, i: int, run_date: datetime.date, now: int) -> dict:
+    minutes = now + i * 60 // 40
+    origin = _STATIONS[random.randrange(len(_STATIONS))]
+    destination = _STATIONS[random.randrange(len(_STATIONS))]
+    start = minutes - random.randint(0, 90)
+    end = minutes + random.randint(5, 150)
+    atoc_code, atoc_name = _OPERATORS[random.randrange(len(_OPERATORS))]
+    lateness = max(0, int(random.gauss(1, 4)))
+    detail = _call(random, station, minutes, _pair(origin, start), _pair(destination, end), lateness,
+                   actual=minutes < now, first=station == origin, last=station == destination,
+                   cancelled=random.random() < 0.03)
+    out = {
+        'locationDetail': detail,
+        'serviceUid': '{}{:05d}'.format(random.choice('CGLPWY'), random.randrange(100000)),
+        'runDate': (run_date - datetime.timedelta(days=1) if minutes >= 24 * 60 else run_date).isoformat(),
+        'trainIdentity': '{}{}{:02d}'.format(random.choice('12'), random.choice('ACDHJLOPW'), random.randrange(100)),
+        'runningIdentity': '{}{}{:02d}'.format(random.choice('12'), random.choice('ACDHJLOPW'), random.randrange(100)),
+        'atocCode': atoc_code,
+        'atocName': atoc_name,
+        'serviceType': 'bus' if random.random() < 0.02 else 'train',
+        'isPassenger': True,
+    }
+    if minutes - now < 60:
+        out['countdownMinutes'] = max(0, minutes - now)
+    if random.random() < 0.01:
+        out['plannedCancel'] = True
+    return out
+
+
+def station_search(station: tuple, services: int, seed: int, run_date: datetime.date = datetime.date(2021, 3, 27),
+                   now: int = 17 * 60) -> dict:
+    """
+    Builds a realistic station board: services with varied operators, origins and destinations, forecasts
+    before now and actual times after, a few cancellations and buses, and optional fields only where set.
+    """
+    random = Random(seed)
+    tiploc, crs, name = station
+    return {
+        'location': {'name': name, 'crs': crs, 'tiploc': tiploc, 'country': 'gb', 'system': 'nr'},
+        'filter': None,
+        'services': [_search_service(random, station, i, run_date, now) for i in range(services)]
+    }
+
+
+def long_distance_service(service_uid: str = 'W12345', calls: int = 80, seed: int = 80,
+                          run_date: datetime.date = datetime.date(2021, 3, 27)) -> dict:
+    """
+    Builds a realistic long-distance stopping service that runs past midnight, with actual times for the first
+    half of the journey and forecasts after.
+    """
+    random = Random(seed)
+    # The principal stations spread evenly along the route, with halts between them
+    named = {round(k * (calls - 1) / (len(_LONG_DISTANCE_CALLS) - 1)): station
+             for k, station in enumerate(_LONG_DISTANCE_CALLS)}
+    stations = [named.get(i) or ('HALT{:03d}'.format(i), 'Z{}{}'.format(chr(65 + i // 26), chr(65 + i % 26)),
+                                 'Halt {}'.format(i))
+                for i in range(calls)]
+    start = 22 * 60 + 30
+    end = start + (calls - 1) * 4
+    origin = _pair(stations[0], start)
+    destination = _pair(stations[-1], end)
+
+    locations = []
+    lateness = 0
+    for i, station in enumerate(stations):
+        actual = i < calls // 2
+        if actual:
+            lateness = max(0, lateness + random.randint(-1, 2))
+        locations.append(_call(random, station, start + i * 4, origin, destination, lateness, actual,
+                               first=i == 0, last=i == calls - 1))
+
+    return {
+        'serviceUid': service_uid,
+        'runDate': run_date.isoformat(),
+        'serviceType': 'train',
+        'isPassenger': True,
+        'trainIdentity': '2W99',
+        'powerType': 'EMU',
+        'trainClass': 'S',
+        'atocCode': 'SW',
+        'atocName': 'South Western Railway',
+        'performanceMonitored': True,
+        'origin': [origin],
+        'destination': [destination],
+        'locations': locations,
+        'realtimeActivated': True,
+        'runningIdentity': '2W99'
+    }
+
+
+SCENARIOS = {
+    'small_station': lambda: station_search(_SMALL_STATION, 14, seed=1),
+    'terminus': lambda: station_search(_TERMINUS, 1200, seed=2),
+    'long_distance': lambda: long_distance_service(),
+}
+""" Builders for the recorded fixtures in benchmarks/data, by name """
+
+DATA = pathlib.Path(__file__).parent / 'data'
+
+
+def load(name: str) -> bytes:
+    """
+    :param name: One of SCENARIOS
+    :return: The raw response body recorded for a scenario
+    """
+    with gzip.open(str(DATA / '{}.json.gz'.format(name)), 'rb') as f:
+        return f.read()
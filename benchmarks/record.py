@@ -0,0 +1,73 @@
+"""
+Records the benchmark fixtures in benchmarks/data, either from the builders in benchmarks.fixtures or from the
+live API:
+
+    python -m benchmarks.record
+    python -m benchmarks.record --username rttapi_user --password secret \\
+        --small-station BOG --terminus WAT --service W12345/2021/03/27
+
+Live recordings keep the response bodies exactly as received. Re-recording changes what every benchmark
+measures, so compare results only between runs that used the same fixtures.
+"""
+import argparse
+import gzip
+import json
+
+from benchmarks import fixtures
+from rttapi.api import _search_url, _service_url, _send
+from rttapi.transport import PooledTransport
+
+_BASE_URL = 'https://api.rtt.io/api/v1'
+
+
+def save(name: str, body: bytes):
+    fixtures.DATA.mkdir(exist_ok=True)
+    # mtime=0 keeps the file identical when the same body is recorded again
+    with open(str(fixtures.DATA / '{}.json.gz'.format(name)), 'wb') as f:
+        with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as out:
+            out.write(body)
+
+
+def record_synthetic():
+    for name, build in fixtures.SCENARIOS.items():
+        save(name, json.dumps(build(), separators=(',', ':')).encode('utf-8'))
+
+
+def record_live(username: str, password: str, small_station: str, terminus: str, service: str):
+    credentials = (username, password)
+    transport = PooledTransport()
+    uid, year, month, day = service.split('/')
+    urls = {
+        'small_station': _search_url(_BASE_URL, small_station),
+        'terminus': _search_url(_BASE_URL, terminus),
+        'long_distance': _service_url(_BASE_URL, uid, year, month, day),
+    }
+    try:
+        for name, url in urls.items():
+            save(name, _send(credentials, url, transport).content)
+    finally:
+        transport.close()
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--username')
+    args.add_argument('--password')
+    args.add_argument('--small-station', default='BOG')
+    args.add_argument('--terminus', default='WAT')
+    args.add_argument('--service', default=None, help='service_uid/yyyy/mm/dd')
+    opts = args.parse_args()
+
+    if opts.username is None:
+        record_synthetic()
+    elif opts.service is None:
+        args.error('--service is required when recording from the live API')
+    else:
+        record_live(opts.username, opts.password, opts.small_station, opts.terminus, opts.service)
+
+    for name in fixtures.SCENARIOS:
+        print('{:<14} {:10,d} bytes'.format(name, len(fixtures.load(name))))
+
+
+if __name__ == '__main__':
+    main()
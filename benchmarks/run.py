@@ -0,0 +1,179 @@
+"""
+Runs the benchmark suite over the recorded fixtures and the local stub server, reporting parse throughput,
+end-to-end request latency percentiles, memory per parsed object and how throughput scales with concurrency.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --quick --only parse,memory
+    python -m benchmarks.run --json baseline.json
+    python -m benchmarks.run --baseline baseline.json --tolerance 0.15
+
+With --baseline, every result is compared against the saved run and the exit status is 1 if any has regressed
+by more than the tolerance, so the suite can gate changes. Timings vary between machines; only compare runs
+made on the same machine.
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+from collections import OrderedDict
+
+import rttapi.parser as parser
+from benchmarks import fixtures
+from benchmarks.common import memory_per, percentile, rate, timings
+from benchmarks.stub_server import StubServer
+from rttapi.api import RttApi
+from rttapi.decoder import get_decoder
+from rttapi.transport import PooledTransport
+
+SECTIONS = ('parse', 'latency', 'memory', 'concurrency')
+
+_SERVICE_DATE = ('W12345', '2021', '03', '27')
+
+
+class Results:
+    """
+    Benchmark results by name, each with its unit and whether higher or lower is better.
+    """
+
+    def __init__(self):
+        self.values = OrderedDict()
+
+    def add(self, name: str, value: float, unit: str, better: str):
+        self.values[name] = {'value': value, 'unit': unit, 'better': better}
+        print('  {:<44} {:>14,.2f} {}'.format(name, value, unit))
+
+    def compare(self, baseline: dict, tolerance: float) -> list:
+        """
+        :return: (name, baseline value, value) for every result worse than baseline by more than tolerance
+        """
+        regressions = []
+        for name, result in self.values.items():
+            before = baseline.get(name)
+            if before is None or not before['value']:
+                continue
+            change = result['value'] / before['value'] - 1
+            if (change < -tolerance) if result['better'] == 'higher' else (change > tolerance):
+                regressions.append((name, before['value'], result['value']))
+        return regressions
+
+
+def bench_parse(results: Results, quick: bool):
+    decode = get_decoder()
+    number = 2 if quick else 10
+    for name in fixtures.SCENARIOS:
+        body = fixtures.load(name)
+        if name == 'long_distance':
+            parse, unit = parser.parse_service, 'locations/s'
+            items = len(decode(body)['locations'])
+        else:
+            parse, unit = parser.parse_search, 'services/s'
+            items = len(decode(body)['services'])
+        json_ = decode(body)
+        scale = max(1, 2000 // items)
+        results.add('parse.{}.decode'.format(name), rate(lambda: decode(body), len(body) / 1e6,
+                                                          number=number * scale), 'MB/s', 'higher')
+        results.add('parse.{}.parse'.format(name), rate(lambda: parse(json_), items, number=number * scale),
+                    unit, 'higher')
+
+
+def bench_latency(results: Results, quick: bool, latency: float):
+    calls = 30 if quick else 200
+    with StubServer(latency=latency) as server:
+        api = RttApi('user', 'pass', base_url=server.base_url)
+        requests = (
+            ('small_station', lambda: api.search_station_departures('BOG'), calls),
+            ('terminus', lambda: api.search_station_departures('WAT'), max(10, calls // 10)),
+            ('long_distance', lambda: api.fetch_service_info_ymd(*_SERVICE_DATE), calls),
+        )
+        for name, request, count in requests:
+            timings(request, 3)
+            durations = timings(request, count)
+            for p in (50, 90, 99):
+                results.add('latency.{}.p{}'.format(name, p), percentile(durations, p) * 1000, 'ms', 'lower')
+        api.close()
+
+
+def bench_memory(results: Results, quick: bool):
+    decode = get_decoder()
+    for name in fixtures.SCENARIOS:
+        body = fixtures.load(name)
+        if name == 'long_distance':
+            parse, count = parser.parse_service, 20 if quick else 200
+        else:
+            parse, count = parser.parse_search, 2 if name == 'terminus' else (20 if quick else 200)
+        # Each object is decoded from its own copy of the body, as if each came from a separate response
+        per_object = memory_per(lambda i: parse(decode(body)), count)
+        results.add('memory.{}'.format(name), per_object / 1024, 'KiB/object', 'lower')
+
+
+def bench_concurrency(results: Results, quick: bool, latency: float):
+    requests = 32 if quick else 128
+    workers = (1, 2, 4, 8, 16)
+    with StubServer(latency=latency) as server:
+        api = RttApi('user', 'pass', base_url=server.base_url,
+                     transport=PooledTransport(pool_maxsize=max(workers)))
+        keys = [('W{:05d}'.format(i), datetime.date(2021, 3, 27)) for i in range(requests)]
+        list(api.fetch_services(keys[:max(workers)], max_workers=max(workers)))
+
+        single = None
+        for count in workers:
+            start = time.perf_counter()
+            for result in api.fetch_services(keys, max_workers=count):
+                if not result.ok:
+                    raise result.error
+            throughput = requests / (time.perf_counter() - start)
+            single = single or throughput
+            results.add('concurrency.workers_{}'.format(count), throughput, 'requests/s', 'higher')
+            results.add('concurrency.workers_{}.speedup'.format(count), throughput / single, 'x', 'higher')
+        api.close()
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--only', default=','.join(SECTIONS), help='comma separated sections: ' + ', '.join(SECTIONS))
+    args.add_argument('--quick', action='store_true', help='fewer repetitions, for a smoke test')
+    args.add_argument('--latency', type=float, default=0.0, help='stub server latency for the latency section')
+    args.add_argument('--concurrency-latency', type=float, default=0.02,
+                      help='stub server latency for the concurrency section')
+    args.add_argument('--json', help='write the results to this file')
+    args.add_argument('--baseline', help='compare against results previously written with --json')
+    args.add_argument('--tolerance', type=float, default=0.15, help='allowed regression, as a fraction')
+    opts = args.parse_args(argv)
+
+    sections = opts.only.split(',')
+    for section in sections:
+        if section not in SECTIONS:
+            args.error('unknown section {}'.format(section))
+
+    results = Results()
+    for section in SECTIONS:
+        if section not in sections:
+            continue
+        print(section)
+        if section == 'parse':
+            bench_parse(results, opts.quick)
+        elif section == 'latency':
+            bench_latency(results, opts.quick, opts.latency)
+        elif section == 'memory':
+            bench_memory(results, opts.quick)
+        else:
+            bench_concurrency(results, opts.quick, opts.concurrency_latency)
+
+    if opts.json:
+        with open(opts.json, 'w') as f:
+            json.dump(results.values, f, indent=2)
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            regressions = results.compare(json.load(f), opts.tolerance)
+        for name, before, after in regressions:
+            print('REGRESSION {}: {:,.2f} -> {:,.2f} {}'.format(name, before, after, results.values[name]['unit']))
+        if regressions:
+            return 1
+        print('no regressions beyond {:.0%}'.format(opts.tolerance))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
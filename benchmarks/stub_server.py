@@ -0,0 +1,144 @@
+"""
+A local stand-in for api.rtt.io, serving the recorded fixtures over plain HTTP with configurable latency.
+
+Searches for the terminus (WAT by default) return the terminus fixture, searches for any other station the
+small station fixture, and every service request the long distance fixture.
+
+Run standalone with:
+
+    python -m benchmarks.stub_server --port 8080 --latency 0.02 --jitter 0.01
+
+and point an RttApi at it with base_url='http://127.0.0.1:8080/api/v1'.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import fixtures
+
+_SEARCH = re.compile(r'^/api/v1/json/search/(?P<station>[^/]+)(?P<arrivals>/arrivals)?$')
+_SERVICE = re.compile(r'^/api/v1/json/service/(?P<uid>[^/]+)/(?P<year>\d+)/(?P<month>\d+)/(?P<day>\d+)$')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (e.g. streaming benchmarks) reset the connection; that is expected
+        pass
+
+
+class StubServer:
+    """
+    Threaded HTTP/1.1 server mimicking the api.rtt.io routes used by rttapi.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 services: int = None, locations: int = None, terminus: str = 'WAT'):
+        """
+        :param host: Interface to bind to
+        :param port: Port to bind to. 0 picks a free port.
+        :param latency: Seconds of artificial server think time added to every response
+        :param jitter: Up to this many seconds more are added at random to every response
+        :param services: If set, station searches return this many uniform synthetic services instead of the
+                         recorded fixtures
+        :param locations: If set, service requests return a uniform synthetic service with this many locations
+                          instead of the recorded fixture
+        :param terminus: The station whose searches return the terminus fixture
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        if services is None:
+            self.__search_bodies = {terminus: fixtures.load('terminus')}
+            self.__search_body = fixtures.load('small_station')
+        else:
+            self.__search_bodies = {}
+            self.__search_body = json.dumps(fixtures.search(services=services)).encode('utf-8')
+        if locations is None:
+            self.__service_body = fixtures.load('long_distance')
+        else:
+            self.__service_body = json.dumps(fixtures.service(locations=locations)).encode('utf-8')
+        self.__server = _Server((host, port), self.__handler())
+        self.__thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return 'http://{}:{}/api/v1'.format(host, port)
+
+    def body_for(self, path: str):
+        match = _SEARCH.match(path)
+        if match:
+            return self.__search_bodies.get(match.group('station'), self.__search_body)
+        if _SERVICE.match(path):
+            return self.__service_body
+        return None
+
+    def __handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub.requests += 1
+                delay = stub.latency + (random.random() * stub.jitter if stub.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                body = stub.body_for(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StubServer':
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--host', default='127.0.0.1')
+    args.add_argument('--port', type=int, default=8080)
+    args.add_argument('--latency', type=float, default=0.0)
+    args.add_argument('--jitter', type=float, default=0.0)
+    opts = args.parse_args()
+
+    server = StubServer(opts.host, opts.port, opts.latency, opts.jitter)
+    print('Serving on {}'.format(server.base_url))
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
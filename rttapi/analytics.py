@@ -0,0 +1,181 @@
+from typing import Dict, Iterable, Sequence, Union
+
+from rttapi.columns import Categorical, _numpy, service_columns
+from rttapi.model import Service
+
+_CANCELLED = ('CANCELLED_CALL', 'CANCELLED_PASS')
+
+_GROUP_KEYS = ('crs', 'tiploc', 'atoc_code', 'service_uid', 'train_identity', 'service_type', 'run_date', 'hour')
+
+
+def punctuality(services: Union[Iterable[Service], Dict[str, object]],
+                by: Union[str, Sequence[str]] = 'atoc_code',
+                event: str = 'arrival',
+                timetable: str = 'gbtt',
+                thresholds: Sequence[int] = (0, 5, 10),
+                percentiles: Sequence[float] = (50, 90),
+                actual_only: bool = False,
+                destination_only: bool = False) -> Dict[str, object]:
+    """
+    Computes punctuality statistics over the calls of many services, grouped by station, operator, hour etc.
+
+    Every location with a booked time for the event is counted. A location is cancelled if it is displayed as
+    a cancelled call or pass, or has a cancellation reason. Otherwise it is observed if it has a realtime time,
+    and its delay is the realtime time minus the booked time. Everything is computed with array operations over
+    rttapi.columns.service_columns, so a full day of services is handled in one pass.
+
+    :param services: The rttapi.model.Service objects, or columns already built from them by service_columns
+    :param by: The column or columns to group by: any of 'crs', 'tiploc', 'atoc_code', 'service_uid',
+               'train_identity', 'service_type', 'run_date', or 'hour' (the hour of the booked time)
+    :param event: 'arrival' or 'departure'
+    :param timetable: The booked times to measure against, 'gbtt' (public) or 'wtt' (working)
+    :param thresholds: For each threshold t, a within_<t> column gives the fraction of observed calls at most
+                       t minutes late. PPM uses 5 minutes, or 10 for long distance operators.
+    :param percentiles: For each percentile p, a p<p>_delay column gives that percentile of the delay
+    :param actual_only: If True, only times actually reported count as observed, rather than forecasts
+    :param destination_only: If True, only the last location of each service is counted, as in PPM
+
+    :raises ValueError: If by, event or timetable is not recognised
+    :raises ImportError: If numpy is not installed
+
+    :return: A dict of column name to numpy array, one row per group with any booked calls. It holds a column per
+             grouping key, then count (calls booked), cancelled, observed, cancellation_rate, mean_delay, the
+             within_<t> and p<p>_delay columns. Delays are in minutes; statistics with no observed calls are NaN.
+    """
+    np = _numpy()
+
+    keys = (by,) if isinstance(by, str) else tuple(by)
+    for key in keys:
+        if key not in _GROUP_KEYS:
+            raise ValueError("Cannot group by '{}'".format(key))
+    if event not in ('arrival', 'departure'):
+        raise ValueError("event must be 'arrival' or 'departure'")
+    if timetable not in ('gbtt', 'wtt'):
+        raise ValueError("timetable must be 'gbtt' or 'wtt'")
+
+    columns = services if isinstance(services, dict) else service_columns(services)
+
+    booked = columns['{}_booked_{}_seconds'.format(timetable, event)]
+    realtime = columns['realtime_{}_seconds'.format(event)]
+
+    rows = booked >= 0
+    if destination_only:
+        service = columns['service']
+        last = np.ones(len(service), dtype=bool)
+        last[:-1] = service[1:] != service[:-1]
+        rows &= last
+
+    cancelled = columns['cancel_reason_code'].codes >= 0
+    cancelled |= _is_any(np, columns['display_as'], _CANCELLED)
+
+    observed = ~cancelled & (realtime >= 0)
+    if actual_only:
+        observed &= columns['realtime_{}_actual'.format(event)]
+
+    rows = np.flatnonzero(rows)
+    codes = [_group_codes(np, columns, key, booked)[rows] for key in keys]
+
+    # Number each key's distinct values densely, then combine them into one integer per row so that
+    # grouping is a single 1-d np.unique
+    combined = np.zeros(len(rows), dtype=np.int64)
+    distinct = []
+    for key_codes in codes:
+        values, dense = np.unique(key_codes, return_inverse=True)
+        combined = combined * max(len(values), 1) + dense.reshape(-1)
+        distinct.append(values)
+
+    groups, inverse = np.unique(combined, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    size = len(groups)
+
+    cancelled = cancelled[rows]
+    observed = observed[rows]
+    delay = (realtime[rows] - booked[rows]) / 60.0
+
+    out = {}
+    remainder = groups
+    for key, values in reversed(list(zip(keys, distinct))):
+        remainder, dense = np.divmod(remainder, max(len(values), 1))
+        out[key] = _group_labels(np, columns, key, values[dense])
+    out = {key: out[key] for key in keys}
+
+    count = np.bincount(inverse, minlength=size)
+    cancelled_count = np.bincount(inverse, weights=cancelled, minlength=size)
+    observed_count = np.bincount(inverse, weights=observed, minlength=size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out['count'] = count
+        out['cancelled'] = cancelled_count.astype(np.int64)
+        out['observed'] = observed_count.astype(np.int64)
+        out['cancellation_rate'] = cancelled_count / count
+        out['mean_delay'] = np.bincount(inverse, weights=np.where(observed, delay, 0.0), minlength=size) / \
+            observed_count
+
+        for threshold in thresholds:
+            within = observed & (delay <= threshold)
+            out['within_{}'.format(threshold)] = np.bincount(inverse, weights=within, minlength=size) / observed_count
+
+    for percentile in percentiles:
+        out['p{}_delay'.format(_format_number(percentile))] = _grouped_percentile(
+            np, inverse[observed], delay[observed], size, percentile)
+
+    return out
+
+
+def _is_any(np, column: Categorical, values: Sequence[str]):
+    wanted = [code for code, category in enumerate(column.categories) if category in values]
+    return np.isin(column.codes, wanted)
+
+
+def _group_codes(np, columns: Dict[str, object], key: str, booked):
+    """
+    :return: An integer array identifying each row's group for the given key
+    """
+    if key == 'hour':
+        return (booked // 3600) % 24
+    column = columns[key]
+    if isinstance(column, Categorical):
+        return column.codes.astype(np.int64)
+    return column.astype('datetime64[D]').astype(np.int64)
+
+
+def _group_labels(np, columns: Dict[str, object], key: str, codes):
+    """
+    :return: The readable values of the given group codes
+    """
+    if key == 'hour':
+        return codes
+    column = columns[key]
+    if isinstance(column, Categorical):
+        return Categorical(codes.astype(np.int32), column.categories).values()
+    return codes.astype('datetime64[D]')
+
+
+def _grouped_percentile(np, groups, values, size: int, percentile: float):
+    """
+    Computes a percentile of values within each group, interpolating linearly as numpy.percentile does.
+
+    :param groups: The group index of each value
+    :param values: The values
+    :param size: The number of groups
+
+    :return: A float array with the percentile of each group, NaN for groups without values
+    """
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+
+    counts = np.bincount(groups, minlength=size)
+    starts = np.cumsum(counts) - counts
+
+    out = np.full(size, np.nan)
+    present = counts > 0
+    position = starts[present] + (counts[present] - 1) * (percentile / 100.0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    fraction = position - lower
+    out[present] = ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+    return out
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value).replace('.', '_')
@@ -1,34 +1,231 @@
 import requests
 import datetime
+import time
+import concurrent.futures
+import functools
 import rttapi.parser as parser
-from rttapi.model import SearchResult, Service
-from requests.auth import HTTPBasicAuth
-
-
-def _request_basic_auth(credentials: tuple, url: str) -> dict:
+from typing import Callable, Iterable, Iterator, Tuple
+from rttapi.model import LocationContainer, SearchResult, Service
+from rttapi.cache import ResponseCache, is_historic
+from rttapi.conditional import ValidatorCache
+from rttapi.decoder import Decoder, get_decoder
+from rttapi.metrics import Metrics, Span, current_span
+from rttapi.ratelimit import RateLimiter
+from rttapi.sharing import IdentityTable
+from rttapi.store import ServiceStore
+from rttapi.singleflight import SingleFlight
+from rttapi.stream import iter_json_array
+from rttapi.transport import Transport, PooledTransport
+
+
+def _send(credentials: tuple, url: str, transport: Transport = None, headers: dict = None,
+          limiter: RateLimiter = None, span: Span = None) -> requests.Response:
     """
     Initiates a request to the given url. Authenticated using credentials pair via HTTPBasicAuth.
 
     :param credentials: A username/password pair used for the HTTPBasicAuth challenge
     :param url: The URL to call
+    :param transport: The rttapi.transport.Transport to send the request through.
+                      Defaults to a new connection per call if not set.
+    :param headers: Optional extra request headers
+    :param limiter: Optional rttapi.ratelimit.RateLimiter pacing the request and retrying it if throttled
+    :param span: Optional rttapi.metrics.Span to record the request's phases, status and size on
 
     :raises requests.HTTPError: If the network request fails
 
-    :return:A dict representation of the JSON body of the reply
+    :return: The successful requests.Response
     """
 
     username, password = credentials
 
-    auth = HTTPBasicAuth(username, password)
-
-    response = requests.get(url, auth=auth)
+    # Transports are given a plain pair, which requests turns into HTTPBasicAuth itself
+    auth = (username, password)
+
+    attempt = 0
+    while True:
+        if limiter is not None:
+            if span is None:
+                limiter.acquire()
+            else:
+                started = time.perf_counter()
+                limiter.acquire()
+                span.add_phase('throttle', time.perf_counter() - started)
+
+        if span is not None:
+            started = time.perf_counter()
+
+        if transport is None:
+            response = requests.get(url, auth=auth, headers=headers)
+        else:
+            response = transport.get(url, auth, headers)
+
+        if span is not None:
+            _record_response(span, response, time.perf_counter() - started)
+
+        if limiter is None:
+            break
+
+        limiter.on_response(response.status_code, response.headers.get('Retry-After'))
+        delay = limiter.retry_delay(response.status_code, attempt)
+        if delay is None:
+            break
+        response.close()
+        if span is not None:
+            span.add_phase('throttle', delay)
+        limiter.sleep(delay)
+        attempt += 1
 
     if response.ok:
-        return response.json()
+        return response
     else:
         raise requests.HTTPError("Request to {} failed ({}, {})".format(url, response.status_code, response.reason))
 
 
+def _record_response(span: Span, response: requests.Response, seconds: float):
+    """
+    Records the status and size of a response on a span, splitting the time taken to receive it into the wait
+    for the headers and the download of the body.
+    """
+    elapsed = getattr(response, 'elapsed', None)
+    wait = min(seconds, elapsed.total_seconds()) if isinstance(elapsed, datetime.timedelta) else seconds
+    span.add_phase('wait', wait)
+    span.add_phase('download', seconds - wait)
+    span.attributes['status'] = response.status_code
+    span.attributes['size'] = len(response.content)
+
+
+def _request_basic_auth(credentials: tuple, url: str, transport: Transport = None, decoder: Decoder = None,
+                        limiter: RateLimiter = None) -> dict:
+    """
+    Initiates a request to the given url. Authenticated using credentials pair via HTTPBasicAuth.
+
+    :param credentials: A username/password pair used for the HTTPBasicAuth challenge
+    :param url: The URL to call
+    :param transport: The rttapi.transport.Transport to send the request through.
+                      Defaults to a new connection per call if not set.
+    :param decoder: The function used to decode the raw body. Defaults to response.json().
+    :param limiter: Optional rttapi.ratelimit.RateLimiter pacing the request and retrying it if throttled
+
+    :raises requests.HTTPError: If the network request fails
+
+    :return:A dict representation of the JSON body of the reply
+    """
+    response = _send(credentials, url, transport, limiter=limiter)
+    return response.json() if decoder is None else decoder(response.content)
+
+
+_URL_BASE = "https://api.rtt.io/api/v1"
+
+
+def _search_url(base: str, station_code: str, arrivals: bool = False) -> str:
+    """
+    Builds the URL for a station search.
+
+    :param base: The API root URL
+    :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
+    :param arrivals: True to search for arrivals rather than departures
+
+    :return: The search URL
+    """
+    url = "{base}/json/search/{station}".format(base=base, station=station_code)
+    return url + "/arrivals" if arrivals else url
+
+
+def _service_url(base: str, service_uid: str, year: str, month: str, day: str) -> str:
+    """
+    Builds the URL for a service information request.
+
+    :param base: The API root URL
+    :param service_uid: The unique identifier for the train service
+    :param year: Year of the service running date
+    :param month: Month of the service running date
+    :param day: Day of the service running date
+
+    :return: The service URL
+    """
+    return "{base}/json/service/{service_uid}/{year}/{month}/{day}".format(
+        base=base,
+        service_uid=service_uid,
+        year=year,
+        month=month,
+        day=day
+    )
+
+
+class BatchResult:
+    """
+    The outcome of a single item within a batch request made via RttApi.search_many or RttApi.fetch_services
+    """
+    def __init__(self, key, result=None, error: Exception = None):
+        """
+        Constructor
+
+        :param key: The item that was requested, e.g. a station code or a (service_uid, date) pair
+        :param result: The parsed result, or None if the request failed
+        :param error: The exception raised while requesting this item, or None if it succeeded
+        """
+        self.key = key
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _fan_out(func: Callable, keys: Iterable, max_workers: int) -> Iterator[BatchResult]:
+    """
+    Runs func over every key on a bounded thread pool, yielding a BatchResult for each key as it completes.
+    At most max_workers * 2 keys are pending at once, so keys may be a lazy or very long iterable.
+
+    :param func: Called with each key
+    :param keys: The keys to process
+    :param max_workers: The number of worker threads
+
+    :return: A generator of rttapi.api.BatchResult objects in completion order
+    """
+    keys = iter(keys)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+
+    def submit_next() -> bool:
+        for key in keys:
+            pending[executor.submit(func, key)] = key
+            return True
+        return False
+
+    try:
+        while len(pending) < max_workers * 2 and submit_next():
+            pass
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                submit_next()
+                error = future.exception()
+                if error is None:
+                    yield BatchResult(key, future.result())
+                else:
+                    yield BatchResult(key, error=error)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _timed_parse(parse: Callable, json: dict):
+    """
+    Calls parse(json), recording the time taken as the parse phase of the current span.
+    """
+    started = time.perf_counter()
+    parsed = parse(json)
+    span = current_span()
+    if span is not None:
+        span.add_phase('parse', time.perf_counter() - started)
+    return parsed
+
+
 class _Api:
     """
     Internal API. Makes network requests to the Realtime Trains API and returns the resulting dict data.
@@ -36,7 +233,110 @@ class _Api:
     Requests are authenticated via HTTPBasicAuth, with credentials passed in as a pair(username, password).
     """
 
-    __urlBase = "https://api.rtt.io/api/v1"
+    def __init__(self, transport: Transport = None, base_url: str = None, cache: ResponseCache = None,
+                 store: ServiceStore = None, validators: ValidatorCache = None, decoder: Decoder = None,
+                 limiter: RateLimiter = None, metrics: Metrics = None):
+        """
+        Constructor for the internal API object.
+
+        :param transport: The rttapi.transport.Transport used for all requests. Defaults to a PooledTransport.
+        :param base_url: Overrides the API root URL, e.g. to point at a local stub server
+        :param cache: Optional rttapi.cache.ResponseCache consulted before making a request
+        :param store: Optional rttapi.store.ServiceStore holding services that can no longer change
+        :param validators: Optional rttapi.conditional.ValidatorCache used to make conditional requests
+        :param decoder: The function used to decode raw response bodies.
+                        Defaults to the fastest backend found by rttapi.decoder.get_decoder.
+        :param limiter: Optional rttapi.ratelimit.RateLimiter pacing every request sent
+        :param metrics: Optional rttapi.metrics.Metrics. When set, each request is recorded on the current span.
+        """
+        self.transport = transport if transport is not None else PooledTransport()
+        self.decoder = decoder if decoder is not None else get_decoder()
+        self.url_base = base_url.rstrip('/') if base_url is not None else _URL_BASE
+        self.cache = cache
+        self.store = store
+        self.validators = validators
+        self.limiter = limiter
+        self.metrics = metrics
+
+    def __get(self, credentials: tuple, url: str, service_uid: str = None, service_date: datetime.date = None) -> dict:
+        """
+        Returns the JSON body for the given url, from the cache or service store if possible.
+
+        :param credentials: A username/password pair used for the HTTPBasicAuth challenge
+        :param url: The URL to call
+        :param service_uid: The unique identifier for service requests. None for station searches.
+        :param service_date: The running date for service requests, used to choose the cache lifetime.
+                             None for station searches.
+
+        :raises requests.HTTPError: If the network request fails
+
+        :return: A dict representation of the JSON body of the reply
+        """
+        span = current_span() if self.metrics is not None else None
+
+        if self.cache is None and self.store is None and self.validators is None:
+            if span is None:
+                return _request_basic_auth(credentials, url, self.transport, self.decoder, self.limiter)
+            return self.__fetch(credentials, url, span)[1]
+
+        if self.cache is not None:
+            json = self.cache.get(url)
+            if json is not None:
+                if span is not None:
+                    span.attributes['cache'] = 'hit'
+                return json
+
+        use_store = self.store is not None and service_date is not None and is_historic(service_date)
+        raw = self.store.get(service_uid, service_date) if use_store else None
+
+        if raw is not None:
+            json = self.__decode(raw, span)
+            if span is not None:
+                span.attributes['cache'] = 'store'
+        else:
+            response, json = self.__fetch(credentials, url, span)
+            raw = response.content
+            if use_store and response.status_code != 304:
+                self.store.put(service_uid, service_date, raw)
+            if span is not None:
+                span.attributes['cache'] = 'not_modified' if response.status_code == 304 else 'miss'
+
+        if self.cache is not None:
+            # A 304 has no body of its own, so is measured by the remembered body it stands for
+            size = len(raw) if raw else self.validators.size(url)
+            self.cache.put(url, json, size, self.cache.ttl_for(service_date))
+
+        return json
+
+    def __fetch(self, credentials: tuple, url: str, span: Span = None) -> tuple:
+        """
+        Sends the request, made conditional on the validators remembered for this url if enabled.
+
+        :param span: Optional rttapi.metrics.Span to record the request on
+
+        :return: The response and its decoded JSON body
+        """
+        if self.validators is None:
+            response = _send(credentials, url, self.transport, limiter=self.limiter, span=span)
+            return response, self.__decode(response.content, span)
+
+        decoder = self.decoder if span is None else functools.partial(self.__decode, span=span)
+        response = _send(credentials, url, self.transport, self.validators.headers(url), self.limiter, span)
+        json = self.validators.resolve(url, response, decoder)
+        if json is None:
+            # 304, but the remembered body was evicted while the request was in flight
+            response = _send(credentials, url, self.transport, limiter=self.limiter, span=span)
+            json = self.validators.resolve(url, response, decoder)
+        return response, json
+
+    def __decode(self, raw: bytes, span: Span = None):
+        if span is None:
+            return self.decoder(raw)
+
+        started = time.perf_counter()
+        json = self.decoder(raw)
+        span.add_phase('decode', time.perf_counter() - started)
+        return json
 
     def fetch_station_departure_info(self, credentials: tuple, station_code: str) -> dict:
         """
@@ -47,21 +347,53 @@ class _Api:
 
         :return: A rttapi.model.SearchResult object mirroring the JSON reply
         """
-        url = "{base}/json/search/{station}".format(base=self.__urlBase, station=station_code)
-        return _request_basic_auth(credentials, url)
+        url = _search_url(self.url_base, station_code)
+        return self.__get(credentials, url)
 
     def fetch_station_arrival_info(self, credentials, station_code) -> dict:
         """
-        Requests the list of upcoming departures from a given station.
+        Requests the list of upcoming arrivals at a given station.
 
         :param credentials: A username/password pair used for the HTTPBasicAuth challenge
         :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
 
         :return: A rttapi.model.SearchResult object mirroring the JSON reply
         """
-        url = "{base}/json/search/{station}/arrivals".format(base=self.__urlBase, station=station_code)
-        return _request_basic_auth(credentials, url)
+        url = _search_url(self.url_base, station_code, arrivals=True)
+        return self.__get(credentials, url)
+
 
+    def stream_station_services(self, credentials: tuple, station_code: str, arrivals: bool = False,
+                                chunk_size: int = 16384) -> Iterator[dict]:
+        """
+        Requests the list of departures or arrivals at a given station, yielding each service's JSON as soon as
+        it has been received. Bypasses the cache and conditional requests.
+
+        :param credentials: A username/password pair used for the HTTPBasicAuth challenge
+        :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
+        :param arrivals: True to request arrivals rather than departures
+        :param chunk_size: The number of bytes to read from the network at a time
+
+        :raises requests.HTTPError: If the network request fails
+
+        :return: A generator of the dicts within the reply's services array
+        """
+        url = _search_url(self.url_base, station_code, arrivals)
+        username, password = credentials
+        if self.limiter is not None:
+            self.limiter.acquire()
+        response = self.transport.stream(url, (username, password))
+        if self.limiter is not None:
+            self.limiter.on_response(response.status_code, response.headers.get('Retry-After'))
+
+        try:
+            if not response.ok:
+                raise requests.HTTPError(
+                    "Request to {} failed ({}, {})".format(url, response.status_code, response.reason)
+                )
+            yield from iter_json_array(response.iter_content(chunk_size), 'services')
+        finally:
+            response.close()
 
     def fetch_service_info_datetime(self, credentials: tuple, service_uid: str, service_date: datetime.date) -> dict:
         """
@@ -94,14 +426,14 @@ class _Api:
         :return: A rttapi.model.SearchResult object mirroring the JSON reply
         """
 
-        url = "{base}/json/service/{service_uid}/{year}/{month}/{day}".format(
-            base=self.__urlBase,
-            service_uid=service_uid,
-            year=year,
-            month=month,
-            day=day
-        )
-        return _request_basic_auth(credentials, url)
+        url = _service_url(self.url_base, service_uid, year, month, day)
+
+        try:
+            service_date = datetime.date(int(year), int(month), int(day))
+        except ValueError:
+            service_date = None
+
+        return self.__get(credentials, url, service_uid, service_date)
 
 
 class RttApi:
@@ -110,15 +442,140 @@ class RttApi:
     Reponsible for initiating requests to the RealtimeTrains API and parsing the response into the model
     """
 
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, transport: Transport = None, base_url: str = None,
+                 cache: ResponseCache = None, single_flight: SingleFlight = None, store: ServiceStore = None,
+                 validators: ValidatorCache = None, lazy: bool = False, decoder: Decoder = None,
+                 rate_limiter: RateLimiter = None, metrics: Metrics = None, identity_table: IdentityTable = None):
         """
         Constructor for the RttApi object.
 
         :param username: The RealtimeTrains API username to authenticate with
         :param password: The password matching the RealtimeTrains API username
+        :param transport: Optional rttapi.transport.Transport to send requests through.
+                          Defaults to a PooledTransport which keeps connections alive between calls.
+        :param base_url: Optional override of the API root URL, e.g. to point at a local stub server
+        :param cache: Optional rttapi.cache.ResponseCache used to answer repeated requests without
+                      going to the network
+        :param single_flight: Optional rttapi.singleflight.SingleFlight. When set, concurrent calls for the same
+                              URL share one request and receive the same parsed object.
+        :param store: Optional rttapi.store.ServiceStore. Services that can no longer change are read from and
+                      saved to this store, so they are only downloaded once.
+        :param validators: Optional rttapi.conditional.ValidatorCache. When set, repeated requests are made
+                           conditional on the previous response, and an unchanged response returns the previously
+                           parsed object without parsing it again.
+        :param lazy: If True, SearchResult.services and Service.locations are rttapi.lazy.LazyList sequences
+                     which parse each entry on first access
+        :param decoder: Optional function used to decode raw response bodies, see rttapi.decoder.get_decoder.
+                        Defaults to the fastest installed backend.
+        :param rate_limiter: Optional rttapi.ratelimit.RateLimiter. When set, requests are paced to stay within
+                             its rate, which backs off on 429 and 5xx responses, and such responses are retried.
+                             One limiter may be shared by several clients, threads and AsyncRttApi objects.
+        :param metrics: Optional rttapi.metrics.Metrics recording counts, phase latencies, sizes and cache
+                        outcomes for every call. Nothing is measured if not set.
+        :param identity_table: Optional rttapi.sharing.IdentityTable. When set, services and locations unchanged
+                               since an earlier call are returned as the same objects rather than parsed again.
+                               Treat results as read-only when using this.
         """
         self.credentials = (username, password)
-        self.__api = _Api()
+        self.__api = _Api(transport, base_url, cache, store, validators, decoder, rate_limiter, metrics)
+        self.__single_flight = single_flight
+        self.__metrics = metrics
+        self.__parse_search = functools.partial(parser.parse_search, lazy=lazy, table=identity_table)
+        self.__parse_service = functools.partial(parser.parse_service, lazy=lazy, table=identity_table)
+
+    def __request(self, endpoint: str, url: str, fetch: Callable[[], dict], parse: Callable):
+        """
+        Fetches and parses a response, sharing the work with concurrent calls for the same url if single-flight
+        is enabled, and reusing the previous parse if the response is unchanged.
+
+        :param endpoint: The name the call is recorded under if metrics are enabled
+        :param url: The URL being requested
+        :param fetch: Returns the decoded JSON for url
+        :param parse: Parses the decoded JSON into the model
+        """
+        if self.__metrics is None:
+            return self.__run(url, fetch, parse)
+
+        span = self.__metrics.start(endpoint, url)
+        if self.__single_flight is not None:
+            # Cleared by run() if this call turns out to be the one doing the work
+            span.attributes['coalesced'] = True
+        try:
+            result = self.__run(url, fetch, functools.partial(_timed_parse, parse))
+        except Exception as e:
+            self.__metrics.finish(span, e)
+            raise
+        self.__metrics.finish(span)
+        return result
+
+    def __run(self, url: str, fetch: Callable[[], dict], parse: Callable):
+        def run():
+            span = current_span() if self.__metrics is not None else None
+            if span is not None:
+                span.attributes['coalesced'] = False
+
+            json = fetch()
+            validators = self.__api.validators
+            if validators is None:
+                return parse(json)
+
+            parsed = validators.parsed(url, json)
+            if parsed is None:
+                parsed = parse(json)
+                validators.set_parsed(url, json, parsed)
+            elif span is not None:
+                span.attributes['reused'] = True
+            return parsed
+
+        if self.__single_flight is None:
+            return run()
+        return self.__single_flight.do(url, run)
+
+    def close(self):
+        """
+        Releases any pooled connections held by this object's transport.
+        """
+        self.__api.transport.close()
+
+    def search_many(self, station_codes: Iterable[str], kind: str = 'departures',
+                    max_workers: int = 8) -> Iterator[BatchResult]:
+        """
+        Requests departures or arrivals for many stations concurrently.
+
+        A failure for one station does not stop the batch; it is reported on that station's BatchResult instead.
+
+        :param station_codes: CRS or TIPLOC codes to search for
+        :param kind: Either 'departures' or 'arrivals'
+        :param max_workers: The maximum number of requests in flight at once
+
+        :raises ValueError: If kind is not recognised
+
+        :return: A generator of rttapi.api.BatchResult objects, keyed by station code, yielded as each request
+                 completes. Each successful result is a rttapi.model.SearchResult.
+        """
+        if kind == 'departures':
+            search = self.search_station_departures
+        elif kind == 'arrivals':
+            search = self.search_station_arrivals
+        else:
+            raise ValueError("kind must be 'departures' or 'arrivals'")
+
+        return _fan_out(search, station_codes, max_workers)
+
+    def fetch_services(self, services: Iterable[Tuple[str, datetime.date]],
+                       max_workers: int = 8) -> Iterator[BatchResult]:
+        """
+        Requests detailed information about many services concurrently.
+
+        A failure for one service does not stop the batch; it is reported on that service's BatchResult instead.
+
+        :param services: (service_uid, running date) pairs, with the date as a datetime.date object
+        :param max_workers: The maximum number of requests in flight at once
+
+        :return: A generator of rttapi.api.BatchResult objects, keyed by (service_uid, date), yielded as each
+                 request completes. Each successful result is a rttapi.model.Service.
+        """
+        return _fan_out(lambda key: self.fetch_service_info_datetime(*key), services, max_workers)
 
     def search_station_departures(self, station_code: str) -> SearchResult:
         """
@@ -128,8 +585,12 @@ class RttApi:
 
         :return: A rttapi.model.SearchResult object mirroring the JSON reply
         """
-        json = self.__api.fetch_station_departure_info(self.credentials, station_code)
-        return parser.parse_search(json)
+        return self.__request(
+            'search_departures',
+            _search_url(self.__api.url_base, station_code),
+            lambda: self.__api.fetch_station_departure_info(self.credentials, station_code),
+            self.__parse_search
+        )
 
     def search_station_arrivals(self, station_code: str) -> SearchResult:
         """
@@ -139,8 +600,38 @@ class RttApi:
 
         :return: A rttapi.model.SearchResult object mirroring the JSON reply
         """
-        json = self.__api.fetch_station_departure_info(self.credentials, station_code)
-        return parser.parse_search(json)
+        return self.__request(
+            'search_arrivals',
+            _search_url(self.__api.url_base, station_code, arrivals=True),
+            lambda: self.__api.fetch_station_arrival_info(self.credentials, station_code),
+            self.__parse_search
+        )
+
+    def iter_station_departures(self, station_code: str) -> Iterator[LocationContainer]:
+        """
+        Requests the list of upcoming departures from a given station, yielding each service as soon as it has been
+        received rather than waiting for the whole reply. Stopping iteration early abandons the rest of the download.
+
+        Responses are always read from the network; the cache, single-flight and conditional requests are not used.
+
+        :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
+
+        :return: A generator of rttapi.model.LocationContainer objects
+        """
+        for json in self.__api.stream_station_services(self.credentials, station_code):
+            yield parser.parse_location_container(json)
+
+    def iter_station_arrivals(self, station_code: str) -> Iterator[LocationContainer]:
+        """
+        Requests the list of upcoming arrivals at a given station, yielding each service as soon as it has been
+        received. See iter_station_departures.
+
+        :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
+
+        :return: A generator of rttapi.model.LocationContainer objects
+        """
+        for json in self.__api.stream_station_services(self.credentials, station_code, arrivals=True):
+            yield parser.parse_location_container(json)
 
     def fetch_service_info_datetime(self, service_uid: str, service_date: datetime.date) -> Service:
         """
@@ -151,9 +642,12 @@ class RttApi:
 
         :return: A model.Service object representing this service's details
         """
-        json = self.__api.fetch_service_info_datetime(self.credentials, service_uid, service_date)
-        return parser.parse_service(json)
-
+        return self.fetch_service_info_ymd(
+            service_uid,
+            service_date.strftime('%Y'),
+            service_date.strftime('%m'),
+            service_date.strftime('%d')
+        )
 
     def fetch_service_info_ymd(self, service_uid: str, service_year: str, service_month: str, service_day: str) -> Service:
         """
@@ -166,5 +660,11 @@ class RttApi:
 
         :return: A model.Service object representing this service's details
         """
-        json = self.__api.fetch_service_info_ymd(self.credentials, service_uid, service_year, service_month, service_day)
-        return parser.parse_service(json)
\ No newline at end of file
+        return self.__request(
+            'service',
+            _service_url(self.__api.url_base, service_uid, service_year, service_month, service_day),
+            lambda: self.__api.fetch_service_info_ymd(
+                self.credentials, service_uid, service_year, service_month, service_day
+            ),
+            self.__parse_service
+        )
\ No newline at end of file
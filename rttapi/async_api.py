@@ -0,0 +1,304 @@
+import asyncio
+import datetime
+import functools
+import json as _json
+import requests
+import rttapi.parser as parser
+from rttapi.api import _URL_BASE, _search_url, _service_url
+from rttapi.decoder import Decoder, get_decoder
+from rttapi.model import SearchResult, Service
+from rttapi.ratelimit import RateLimiter
+from rttapi.sharing import IdentityTable
+from rttapi.singleflight import AsyncSingleFlight
+
+
+class AsyncResponse:
+    """
+    A fully-read HTTP response returned by an rttapi.async_api.AsyncTransport
+    """
+
+    def __init__(self, status_code: int, reason: str, headers: dict, content: bytes):
+        """
+        Constructor
+
+        :param status_code: The HTTP status code
+        :param reason: The HTTP reason phrase
+        :param headers: The response headers
+        :param content: The raw response body
+        """
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return _json.loads(self.content)
+
+
+class AsyncTransport:
+    """
+    Base class for the asynchronous HTTP transport used by AsyncRttApi.
+    """
+
+    async def get(self, url: str, credentials: tuple, headers: dict = None) -> AsyncResponse:
+        """
+        Performs a GET request against the given URL and reads the full body.
+
+        :param url: The URL to call
+        :param credentials: A username/password pair used for the HTTP basic auth challenge
+        :param headers: Optional extra request headers
+
+        :return: An rttapi.async_api.AsyncResponse for this call
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """
+        Releases any resources (e.g. pooled connections) held by this transport.
+        """
+        pass
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    AsyncTransport backed by a shared aiohttp.ClientSession. Requires the optional 'aiohttp' dependency.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 0, keep_alive: bool = True,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0):
+        """
+        Constructor for the AiohttpTransport object.
+
+        :param limit: The maximum number of open connections
+        :param limit_per_host: The maximum number of open connections to a single host. 0 for no limit.
+        :param keep_alive: Whether to keep connections open between requests
+        :param connect_timeout: Seconds to wait for a connection to be established
+        :param read_timeout: Seconds to wait between bytes received from the server
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("AiohttpTransport requires aiohttp. Install it with 'pip install rttapi[async]'")
+
+        self.__aiohttp = aiohttp
+        self.__connector_args = dict(limit=limit, limit_per_host=limit_per_host, force_close=not keep_alive)
+        self.__timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.__session = None
+
+    def __get_session(self):
+        # The session must be created inside a running event loop
+        if self.__session is None or self.__session.closed:
+            self.__session = self.__aiohttp.ClientSession(
+                connector=self.__aiohttp.TCPConnector(**self.__connector_args),
+                timeout=self.__timeout
+            )
+        return self.__session
+
+    async def get(self, url: str, credentials: tuple, headers: dict = None) -> AsyncResponse:
+        username, password = credentials
+        auth = self.__aiohttp.BasicAuth(username, password)
+
+        async with self.__get_session().get(url, auth=auth, headers=headers) as response:
+            content = await response.read()
+            return AsyncResponse(response.status, response.reason, dict(response.headers), content)
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+
+class _AsyncApi:
+    """
+    Internal asynchronous API. Makes network requests to the Realtime Trains API and returns the resulting dict data.
+
+    At most max_concurrency requests are in flight at once; further calls wait their turn.
+    """
+
+    def __init__(self, transport: AsyncTransport = None, base_url: str = None, max_concurrency: int = 100,
+                 decoder: Decoder = None, limiter: RateLimiter = None):
+        """
+        Constructor for the internal asynchronous API object.
+
+        :param transport: The rttapi.async_api.AsyncTransport used for all requests. Defaults to an AiohttpTransport.
+        :param base_url: Overrides the API root URL, e.g. to point at a local stub server
+        :param max_concurrency: The maximum number of requests in flight at once
+        :param decoder: The function used to decode raw response bodies.
+                        Defaults to the fastest backend found by rttapi.decoder.get_decoder.
+        :param limiter: Optional rttapi.ratelimit.RateLimiter pacing every request sent
+        """
+        self.transport = transport if transport is not None else AiohttpTransport(limit=max_concurrency)
+        self.decoder = decoder if decoder is not None else get_decoder()
+        self.url_base = base_url.rstrip('/') if base_url is not None else _URL_BASE
+        self.limiter = limiter
+        self.__semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def request(self, credentials: tuple, url: str) -> dict:
+        """
+        Initiates a request to the given url, waiting for a free concurrency slot first.
+
+        :param credentials: A username/password pair used for the HTTP basic auth challenge
+        :param url: The URL to call
+
+        :raises requests.HTTPError: If the network request fails
+
+        :return: A dict representation of the JSON body of the reply
+        """
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+
+            async with self.__semaphore:
+                response = await self.transport.get(url, credentials)
+
+            if self.limiter is None:
+                break
+
+            self.limiter.on_response(response.status_code, response.headers.get('Retry-After'))
+            delay = self.limiter.retry_delay(response.status_code, attempt)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if response.ok:
+            return self.decoder(response.content)
+        else:
+            raise requests.HTTPError("Request to {} failed ({}, {})".format(url, response.status_code, response.reason))
+
+    async def fetch_station_departure_info(self, credentials: tuple, station_code: str) -> dict:
+        """ Coroutine version of rttapi.api._Api.fetch_station_departure_info """
+        return await self.request(credentials, _search_url(self.url_base, station_code))
+
+    async def fetch_station_arrival_info(self, credentials: tuple, station_code: str) -> dict:
+        """ Coroutine version of rttapi.api._Api.fetch_station_arrival_info """
+        return await self.request(credentials, _search_url(self.url_base, station_code, arrivals=True))
+
+    async def fetch_service_info_ymd(self, credentials: tuple, service_uid: str,
+                                     year: str, month: str, day: str) -> dict:
+        """ Coroutine version of rttapi.api._Api.fetch_service_info_ymd """
+        return await self.request(credentials, _service_url(self.url_base, service_uid, year, month, day))
+
+
+class AsyncRttApi:
+    """
+    asyncio counterpart to rttapi.api.RttApi. Every request method is a coroutine, allowing one event loop
+    to keep many requests in flight. Responses are parsed with the same rttapi.parser functions as RttApi.
+    """
+
+    def __init__(self, username: str, password: str, transport: AsyncTransport = None, base_url: str = None,
+                 max_concurrency: int = 100, single_flight: AsyncSingleFlight = None, lazy: bool = False,
+                 decoder: Decoder = None, rate_limiter: RateLimiter = None, identity_table: IdentityTable = None):
+        """
+        Constructor for the AsyncRttApi object.
+
+        :param username: The RealtimeTrains API username to authenticate with
+        :param password: The password matching the RealtimeTrains API username
+        :param transport: Optional rttapi.async_api.AsyncTransport to send requests through.
+                          Defaults to an AiohttpTransport.
+        :param base_url: Optional override of the API root URL, e.g. to point at a local stub server
+        :param max_concurrency: The maximum number of requests in flight at once
+        :param single_flight: Optional rttapi.singleflight.AsyncSingleFlight. When set, concurrent calls for the
+                              same URL share one request and receive the same parsed object.
+        :param lazy: If True, SearchResult.services and Service.locations are rttapi.lazy.LazyList sequences
+                     which parse each entry on first access
+        :param decoder: Optional function used to decode raw response bodies, see rttapi.decoder.get_decoder.
+                        Defaults to the fastest installed backend.
+        :param rate_limiter: Optional rttapi.ratelimit.RateLimiter, see rttapi.api.RttApi. Waiting for the limiter
+                             never blocks the event loop.
+        :param identity_table: Optional rttapi.sharing.IdentityTable, see rttapi.api.RttApi
+        """
+        self.credentials = (username, password)
+        self.__api = _AsyncApi(transport, base_url, max_concurrency, decoder, rate_limiter)
+        self.__single_flight = single_flight
+        self.__parse_search = functools.partial(parser.parse_search, lazy=lazy, table=identity_table)
+        self.__parse_service = functools.partial(parser.parse_service, lazy=lazy, table=identity_table)
+
+    async def __coalesce(self, url: str, func):
+        """
+        Awaits func(), sharing its result with concurrent calls for the same url if single-flight is enabled.
+        """
+        if self.__single_flight is None:
+            return await func()
+        return await self.__single_flight.do(url, func)
+
+    async def close(self):
+        """
+        Releases any pooled connections held by this object's transport.
+        """
+        await self.__api.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def search_station_departures(self, station_code: str) -> SearchResult:
+        """
+        Requests the list of upcoming departures from a given station.
+
+        :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
+
+        :return: A rttapi.model.SearchResult object mirroring the JSON reply
+        """
+        async def fetch():
+            return self.__parse_search(await self.__api.fetch_station_departure_info(self.credentials, station_code))
+
+        return await self.__coalesce(_search_url(self.__api.url_base, station_code), fetch)
+
+    async def search_station_arrivals(self, station_code: str) -> SearchResult:
+        """
+        Requests the list of upcoming arrivals at a given station.
+
+        :param station_code: Either the three-letter CRS station code (CRS, e.g. 'CLJ') or the longer TIPLOC code (e.g. 'CLPHMJC')
+
+        :return: A rttapi.model.SearchResult object mirroring the JSON reply
+        """
+        async def fetch():
+            return self.__parse_search(await self.__api.fetch_station_arrival_info(self.credentials, station_code))
+
+        return await self.__coalesce(_search_url(self.__api.url_base, station_code, arrivals=True), fetch)
+
+    async def fetch_service_info_datetime(self, service_uid: str, service_date: datetime.date) -> Service:
+        """
+        Requests detailed information about a given service, using a datetime.date object to specify the running date
+
+        :param service_uid: The unique ID of the service
+        :param service_date: The running date of the service as a datetime.date object
+
+        :return: A model.Service object representing this service's details
+        """
+        return await self.fetch_service_info_ymd(
+            service_uid,
+            service_date.strftime('%Y'),
+            service_date.strftime('%m'),
+            service_date.strftime('%d')
+        )
+
+    async def fetch_service_info_ymd(self, service_uid: str, service_year: str, service_month: str,
+                                     service_day: str) -> Service:
+        """
+        Requests detailed information about a given service, using year/month/day to specify the running date
+
+        :param service_uid: The unique ID of the service
+        :param service_year: The year component of the service's running date
+        :param service_month: The month component of the service's running date
+        :param service_day: The day component of the service's running date
+
+        :return: A model.Service object representing this service's details
+        """
+        async def fetch():
+            return self.__parse_service(await self.__api.fetch_service_info_ymd(
+                self.credentials, service_uid, service_year, service_month, service_day
+            ))
+
+        return await self.__coalesce(
+            _service_url(self.__api.url_base, service_uid, service_year, service_month, service_day),
+            fetch
+        )
@@ -0,0 +1,182 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+def is_historic(service_date: datetime.date) -> bool:
+    """
+    Determines whether a service's details can no longer change.
+
+    Services that ran before yesterday are final. Yesterday is excluded because services running past midnight
+    are still reported against the previous day.
+
+    :param service_date: The running date of the service
+
+    :return: True if the service ran before yesterday
+    """
+    return service_date < datetime.date.today() - datetime.timedelta(days=1)
+
+
+class CacheStats:
+    """
+    Counters describing how a rttapi.cache.ResponseCache has been used
+    """
+    def __init__(self, hits: int = 0, misses: int = 0, evictions: int = 0, entries: int = 0, size: int = 0):
+        self.hits = hits
+        """ Number of lookups answered from the cache """
+
+        self.misses = misses
+        """ Number of lookups that were absent or expired """
+
+        self.evictions = evictions
+        """ Number of entries dropped to stay within the entry count or byte limits """
+
+        self.entries = entries
+        """ Number of entries currently held """
+
+        self.size = size
+        """ Approximate size in bytes of the entries currently held """
+
+
+class ResponseCache:
+    """
+    Thread-safe, in-memory cache of decoded API responses, keyed by request URL.
+
+    Each entry carries its own expiry time. Once either max_entries or max_bytes is exceeded,
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 max_bytes: int = 32 * 1024 * 1024,
+                 search_ttl: float = 30,
+                 service_ttl: float = 30,
+                 historic_service_ttl: float = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Constructor for the ResponseCache object.
+
+        :param max_entries: The maximum number of responses held
+        :param max_bytes: The maximum total size of responses held, measured by the size of the response body
+        :param search_ttl: Seconds to keep station search responses
+        :param service_ttl: Seconds to keep service information for services running today or later
+        :param historic_service_ttl: Seconds to keep service information for services that ran before yesterday.
+                                     None keeps them until evicted.
+        :param clock: Source of the current time in seconds, used for expiry
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.search_ttl = search_ttl
+        self.service_ttl = service_ttl
+        self.historic_service_ttl = historic_service_ttl
+
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def ttl_for(self, service_date: datetime.date = None) -> float:
+        """
+        Chooses the lifetime for a response. Services that can no longer change use historic_service_ttl.
+
+        :param service_date: The running date of a service request, or None for a station search
+
+        :return: The number of seconds to keep the response for, or None to keep it until evicted
+        """
+        if service_date is None:
+            return self.search_ttl
+
+        if is_historic(service_date):
+            return self.historic_service_ttl
+
+        return self.service_ttl
+
+    def get(self, key: str):
+        """
+        Looks up a cached response.
+
+        :param key: The request URL
+
+        :return: The cached value, or None if absent or expired
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+
+            value, size, expires = entry
+            if expires is not None and expires <= self.__clock():
+                self.__remove(key)
+                self.__misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return value
+
+    def put(self, key: str, value, size: int, ttl: float = None):
+        """
+        Stores a response, evicting the least recently used entries if the cache is over its limits.
+
+        :param key: The request URL
+        :param value: The value to cache
+        :param size: The approximate size of the value in bytes
+        :param ttl: Seconds until this entry expires. None never expires.
+        """
+        if ttl is not None and ttl <= 0:
+            return
+
+        if size > self.max_bytes:
+            return
+
+        expires = self.__clock() + ttl if ttl is not None else None
+
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+            self.__entries[key] = (value, size, expires)
+            self.__size += size
+
+            while len(self.__entries) > self.max_entries or self.__size > self.max_bytes:
+                oldest = next(iter(self.__entries))
+                self.__remove(oldest)
+                self.__evictions += 1
+
+    def invalidate(self, key: str):
+        """
+        Removes a single entry, if present.
+
+        :param key: The request URL
+        """
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+    def clear(self):
+        """
+        Removes every entry. Counters are left untouched.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def stats(self) -> CacheStats:
+        """
+        :return: A snapshot of this cache's counters as a rttapi.cache.CacheStats object
+        """
+        with self.__lock:
+            return CacheStats(self.__hits, self.__misses, self.__evictions, len(self.__entries), self.__size)
+
+    def __remove(self, key: str):
+        _, size, _ = self.__entries.pop(key)
+        self.__size -= size
+
+    def __len__(self):
+        return len(self.__entries)
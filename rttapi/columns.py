@@ -0,0 +1,289 @@
+from operator import attrgetter
+from typing import Dict, Iterable, List
+
+from rttapi.lazy import LazyList
+from rttapi.model import Location, LocationContainer, Service
+from rttapi.parser import _reference_time
+from rttapi.timing import rollover, time_to_seconds
+
+MISSING_TIME = -1
+""" The value of a time column where the location has no such time """
+
+_TIME = 'time'
+_INT = 'int'
+_BOOL = 'bool'
+_CATEGORY = 'category'
+_DATE = 'date'
+
+# (column and attribute name, JSON key, kind)
+_LOCATION_COLUMNS = (
+    ('tiploc', 'tiploc', _CATEGORY),
+    ('crs', 'crs', _CATEGORY),
+    ('realtime_activated', 'realtimeActivated', _BOOL),
+
+    ('wtt_booked_arrival_seconds', 'wttBookedArrival', _TIME),
+    ('wtt_booked_departure_seconds', 'wttBookedDeparture', _TIME),
+    ('wtt_booked_pass_seconds', 'wttBookedPass', _TIME),
+    ('gbtt_booked_arrival_seconds', 'gbttBookedArrival', _TIME),
+    ('gbtt_booked_departure_seconds', 'gbttBookedDeparture', _TIME),
+    ('realtime_arrival_seconds', 'realtimeArrival', _TIME),
+    ('realtime_departure_seconds', 'realtimeDeparture', _TIME),
+
+    ('realtime_arrival_actual', 'realtimeArrivalActual', _BOOL),
+    ('realtime_arrival_no_report', 'realtimeArrivalNoReport', _BOOL),
+    ('realtime_wtt_arrival_lateness', 'realtimeWttArrivalLateness', _INT),
+    ('realtime_gbtt_arrival_lateness', 'realtimeGbttArrivalLateness', _INT),
+    ('realtime_departure_actual', 'realtimeDepartureActual', _BOOL),
+    ('realtime_departure_no_report', 'realtimeDepartureNoReport', _BOOL),
+    ('realtime_wtt_departure_lateness', 'realtimeWttDepartureLateness', _INT),
+    ('realtime_gbtt_departure_lateness', 'realtimeGbttDepartureLateness', _INT),
+
+    ('platform', 'platform', _CATEGORY),
+    ('platform_changed', 'platformChanged', _BOOL),
+    ('cancel_reason_code', 'cancelReasonCode', _CATEGORY),
+    ('display_as', 'displayAs', _CATEGORY),
+)
+
+_CONTAINER_COLUMNS = (
+    ('service_uid', 'serviceUid', _CATEGORY),
+    ('run_date', 'runDate', _DATE),
+    ('train_identity', 'trainIdentity', _CATEGORY),
+    ('atoc_code', 'atocCode', _CATEGORY),
+    ('service_type', 'serviceType', _CATEGORY),
+    ('is_passenger', 'isPassenger', _BOOL),
+    ('planned_cancel', 'plannedCancel', _BOOL),
+    ('countdown_minutes', 'countdownMinutes', _INT),
+)
+
+_SERVICE_COLUMNS = (
+    ('service_uid', 'serviceUid', _CATEGORY),
+    ('run_date', 'runDate', _DATE),
+    ('train_identity', 'trainIdentity', _CATEGORY),
+    ('atoc_code', 'atocCode', _CATEGORY),
+    ('service_type', 'serviceType', _CATEGORY),
+)
+
+_PAIR_COLUMNS = (
+    ('origin_tiploc', 'origin', _CATEGORY),
+    ('destination_tiploc', 'destination', _CATEGORY),
+)
+
+
+class Categorical:
+    """
+    A column of repeated strings, stored as integer codes into a list of distinct categories.
+
+    Convert to pandas with pandas.Categorical.from_codes(column.codes, column.categories).
+    """
+    __slots__ = ('codes', 'categories')
+
+    def __init__(self, codes, categories: List[str]):
+        """
+        Constructor
+
+        :param codes: numpy int32 array of indices into categories, -1 where the value is missing
+        :param categories: The distinct values, in order of first appearance
+        """
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_values(cls, values: list) -> 'Categorical':
+        """
+        :param values: A list of strings or None
+
+        :return: The values encoded as a Categorical
+        """
+        np = _numpy()
+        categories = [value for value in dict.fromkeys(values) if value is not None]
+        index = {value: code for code, value in enumerate(categories)}
+        index[None] = -1
+        return cls(np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=len(values)), categories)
+
+    def values(self):
+        """
+        :return: The decoded column as a numpy object array, with None where the value is missing
+        """
+        np = _numpy()
+        lookup = np.array(self.categories + [None], dtype=object)
+        return lookup[self.codes]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __repr__(self):
+        return '<Categorical {} values, {} categories>'.format(len(self.codes), len(self.categories))
+
+
+def search_columns(results: Iterable) -> Dict[str, object]:
+    """
+    Converts the services of one or more search results into columns, one row per service.
+
+    Services that have not been parsed yet (see RttApi's lazy option) are read straight from their raw JSON, so
+    exporting never builds model objects that were not already built.
+
+    Columns are the LocationContainer fields service_uid, run_date, train_identity, atoc_code, service_type,
+    is_passenger, planned_cancel and countdown_minutes; origin_tiploc and destination_tiploc, taken from the
+    service or else its location_detail; the fields of the service's location_detail (tiploc, crs, the *_seconds
+    times, lateness, platform...); and 'search', the index of the SearchResult each row came from.
+
+    :param results: The rttapi.model.SearchResult objects
+
+    :raises ImportError: If numpy is not installed
+
+    :return: A dict of column name to a numpy array or Categorical
+    """
+    columns = _empty(_CONTAINER_COLUMNS + _PAIR_COLUMNS + _LOCATION_COLUMNS)
+    search = []
+
+    for i, result in enumerate(results):
+        services = result.services
+        if isinstance(services, LazyList):
+            rows = services.raw
+            _extend_raw(columns, _CONTAINER_COLUMNS, rows, _CONTAINER_DEFAULTS)
+            details = [row.get('locationDetail') or {} for row in rows]
+            for name, key, _ in _PAIR_COLUMNS:
+                columns[name].extend(_first_raw_tiploc(row.get(key) or detail.get(key))
+                                     for row, detail in zip(rows, details))
+            references = [_raw_reference(row.get('origin') or detail.get('origin'))
+                          for row, detail in zip(rows, details)]
+            _extend_raw(columns, _LOCATION_COLUMNS, details, _LOCATION_DEFAULTS, references)
+        else:
+            _extend_objects(columns, _CONTAINER_COLUMNS, services)
+            details = [_EMPTY_LOCATION if service.location_detail is None else service.location_detail
+                       for service in services]
+            for name, key, _ in _PAIR_COLUMNS:
+                get = attrgetter(key)
+                columns[name].extend(_first_tiploc(get(service) or get(detail))
+                                     for service, detail in zip(services, details))
+            _extend_objects(columns, _LOCATION_COLUMNS, details)
+        search.extend([i] * len(services))
+
+    columns['search'] = search
+    return _finish(columns, _CONTAINER_COLUMNS + _PAIR_COLUMNS + _LOCATION_COLUMNS, {'search': _INT})
+
+
+def service_columns(services: Iterable[Service]) -> Dict[str, object]:
+    """
+    Converts the locations of one or more services into columns, one row per location.
+
+    Locations that have not been parsed yet (see RttApi's lazy option) are read straight from their raw JSON, so
+    exporting never builds model objects that were not already built.
+
+    Columns are the Location fields tiploc, crs, realtime_activated, the *_seconds times, the realtime flags and
+    lateness, platform, platform_changed, cancel_reason_code and display_as; the owning service's service_uid,
+    run_date, train_identity, atoc_code and service_type, repeated on each of its rows; and 'service', the index
+    of the Service each row came from.
+
+    :param services: The rttapi.model.Service objects
+
+    :raises ImportError: If numpy is not installed
+
+    :return: A dict of column name to a numpy array or Categorical
+    """
+    columns = _empty(_SERVICE_COLUMNS + _LOCATION_COLUMNS)
+    index = []
+
+    for i, service in enumerate(services):
+        locations = service.locations
+        count = len(locations)
+
+        for name, _, _ in _SERVICE_COLUMNS:
+            columns[name].extend([getattr(service, name)] * count)
+
+        if isinstance(locations, LazyList):
+            reference = _reference_time(service.origin, locations.raw)
+            _extend_raw(columns, _LOCATION_COLUMNS, locations.raw, _LOCATION_DEFAULTS, [reference] * count)
+        else:
+            _extend_objects(columns, _LOCATION_COLUMNS, locations)
+        index.extend([i] * count)
+
+    columns['service'] = index
+    return _finish(columns, _SERVICE_COLUMNS + _LOCATION_COLUMNS, {'service': _INT})
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Columnar export requires numpy. Install it with 'pip install rttapi[columns]'")
+    return numpy
+
+
+def _empty(spec: tuple) -> Dict[str, list]:
+    return {name: [] for name, _, _ in spec}
+
+
+def _extend_objects(columns: Dict[str, list], spec: tuple, objects: list):
+    for name, _, _ in spec:
+        columns[name].extend(map(attrgetter(name), objects))
+
+
+def _extend_raw(columns: Dict[str, list], spec: tuple, rows: list, defaults: dict, references: list = None):
+    """
+    Appends the values of the given JSON objects, converted as the parser would convert them.
+
+    :param references: The start time of the service each row belongs to, used to place times after midnight
+    """
+    for name, key, kind in spec:
+        values = [row.get(key) for row in rows]
+        if kind == _TIME:
+            if references is None:
+                values = [time_to_seconds(value) for value in values]
+            else:
+                values = [rollover(time_to_seconds(value), reference) for value, reference in zip(values, references)]
+        else:
+            default = defaults[name]
+            values = [default if value is None else value for value in values]
+        columns[name].extend(values)
+
+
+def _raw_reference(origin: list) -> int:
+    for pair in origin or ():
+        seconds = time_to_seconds(pair.get('workingTime'))
+        if seconds is not None:
+            return seconds
+    return None
+
+
+def _first_raw_tiploc(pairs: list) -> str:
+    return pairs[0].get('tiploc') if pairs else None
+
+
+def _first_tiploc(pairs: list) -> str:
+    return pairs[0].tiploc if pairs else None
+
+
+def _finish(columns: Dict[str, list], spec: tuple, extra: dict) -> Dict[str, object]:
+    np = _numpy()
+    kinds = {name: kind for name, _, kind in spec}
+    kinds.update(extra)
+
+    out = {}
+    for name, values in columns.items():
+        kind = kinds[name]
+        if kind == _TIME:
+            out[name] = np.fromiter((MISSING_TIME if value is None else value for value in values),
+                                    dtype=np.int32, count=len(values))
+        elif kind == _INT:
+            out[name] = np.fromiter(values, dtype=np.int32, count=len(values))
+        elif kind == _BOOL:
+            out[name] = np.fromiter(values, dtype=bool, count=len(values))
+        elif kind == _DATE:
+            # A handful of distinct dates: convert each once, then index
+            dates = Categorical.from_values(values)
+            lookup = np.array(dates.categories + [None], dtype='datetime64[D]')
+            out[name] = lookup[dates.codes]
+        else:
+            out[name] = Categorical.from_values(values)
+    return out
+
+
+def _defaults(model: type, spec: tuple) -> dict:
+    prototype = model()
+    return {name: getattr(prototype, name) for name, _, _ in spec}
+
+
+_EMPTY_LOCATION = Location()
+_LOCATION_DEFAULTS = _defaults(Location, _LOCATION_COLUMNS)
+_CONTAINER_DEFAULTS = _defaults(LocationContainer, _CONTAINER_COLUMNS)
@@ -0,0 +1,150 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+
+class _Entry:
+    __slots__ = ('etag', 'last_modified', 'digest', 'size', 'json', 'parsed')
+
+    def __init__(self, etag: str, last_modified: str, digest: bytes, size: int, json):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.size = size
+        self.json = json
+        self.parsed = None
+
+
+class ValidatorCache:
+    """
+    Remembers the validators (ETag / Last-Modified) and decoded body of the last response for each URL,
+    so that repeated polls can be made as conditional requests.
+
+    When the server answers 304 Not Modified, or sends no validators but a byte-identical body, the previously
+    decoded JSON object is returned again. Because it is the very same object, the parsed model built from it can
+    be reused as well, skipping rttapi.parser entirely.
+
+    Thread-safe. Entries are evicted least recently used once max_entries is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Constructor for the ValidatorCache object.
+
+        :param max_entries: The maximum number of URLs to remember
+        """
+        self.max_entries = max_entries
+        self.not_modified = 0
+        """ Number of responses answered with 304 Not Modified """
+
+        self.unchanged = 0
+        """ Number of 200 responses without validators whose body was identical to the previous one """
+
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+
+    def headers(self, url: str) -> dict:
+        """
+        Builds the conditional request headers for a URL.
+
+        :param url: The request URL
+
+        :return: A dict of request headers, or None if nothing is known about this URL
+        """
+        with self.__lock:
+            entry = self.__entries.get(url)
+
+        if entry is None:
+            return None
+
+        headers = {}
+        if entry.etag is not None:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified is not None:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers or None
+
+    def resolve(self, url: str, response, decoder: Callable[[bytes], object] = None):
+        """
+        Returns the decoded JSON for a response, reusing the previous object if the body has not changed.
+
+        :param url: The request URL
+        :param response: The successful (2xx or 304) response
+        :param decoder: The function used to decode the raw body. Defaults to response.json().
+
+        :return: The decoded JSON, or None if the response was 304 but nothing is remembered for this URL
+        """
+        with self.__lock:
+            entry = self.__entries.get(url)
+            if entry is not None:
+                self.__entries.move_to_end(url)
+
+        if response.status_code == 304:
+            if entry is None:
+                return None
+            self.not_modified += 1
+            return entry.json
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        digest = None
+
+        if etag is None and last_modified is None:
+            digest = hashlib.blake2b(response.content, digest_size=16).digest()
+            if entry is not None and entry.digest == digest:
+                self.unchanged += 1
+                return entry.json
+
+        json = response.json() if decoder is None else decoder(response.content)
+
+        with self.__lock:
+            self.__entries[url] = _Entry(etag, last_modified, digest, len(response.content), json)
+            self.__entries.move_to_end(url)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+        return json
+
+    def size(self, url: str) -> int:
+        """
+        :param url: The request URL
+
+        :return: The size in bytes of the body remembered for this URL, or 0 if nothing is remembered
+        """
+        with self.__lock:
+            entry = self.__entries.get(url)
+        return entry.size if entry is not None else 0
+
+    def parsed(self, url: str, json):
+        """
+        Looks up the model previously parsed from exactly this JSON object.
+
+        :param url: The request URL
+        :param json: The decoded JSON returned by resolve()
+
+        :return: The parsed model, or None if json has not been parsed before
+        """
+        with self.__lock:
+            entry = self.__entries.get(url)
+
+        if entry is not None and entry.json is json:
+            return entry.parsed
+        return None
+
+    def set_parsed(self, url: str, json, parsed):
+        """
+        Remembers the model parsed from a JSON object returned by resolve().
+
+        :param url: The request URL
+        :param json: The decoded JSON the model was parsed from
+        :param parsed: The parsed model
+        """
+        with self.__lock:
+            entry = self.__entries.get(url)
+
+        if entry is not None and entry.json is json:
+            entry.parsed = parsed
+
+    def __len__(self):
+        return len(self.__entries)
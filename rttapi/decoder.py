@@ -0,0 +1,67 @@
+import json
+from typing import Callable, List
+
+Decoder = Callable[[bytes], object]
+""" A function turning a raw JSON response body into Python dicts and lists """
+
+
+def _stdlib_decoder() -> Decoder:
+    # json.loads accepts bytes directly, detecting the encoding itself
+    return json.loads
+
+
+def _orjson_decoder() -> Decoder:
+    import orjson
+    return orjson.loads
+
+
+def _simdjson_decoder() -> Decoder:
+    import simdjson
+    return simdjson.loads
+
+
+_BACKENDS = {
+    'orjson': _orjson_decoder,
+    'simdjson': _simdjson_decoder,
+    'json': _stdlib_decoder,
+}
+
+_PREFERENCE = ('orjson', 'simdjson', 'json')
+
+
+def available_decoders() -> List[str]:
+    """
+    :return: The names of the JSON backends that can be imported, fastest first
+    """
+    out = []
+    for name in _PREFERENCE:
+        try:
+            _BACKENDS[name]()
+        except ImportError:
+            continue
+        out.append(name)
+    return out
+
+
+def get_decoder(name: str = None) -> Decoder:
+    """
+    Returns a function decoding raw JSON bytes, without first copying them into a str.
+
+    :param name: One of 'orjson', 'simdjson' or 'json' (the standard library).
+                 If None, the fastest installed backend is chosen.
+
+    :raises ValueError: If name is not a known backend
+    :raises ImportError: If the named backend is not installed
+
+    :return: The decoder function
+    """
+    if name is not None:
+        if name not in _BACKENDS:
+            raise ValueError("Unknown JSON backend '{}'".format(name))
+        return _BACKENDS[name]()
+
+    for name in _PREFERENCE:
+        try:
+            return _BACKENDS[name]()
+        except ImportError:
+            continue
@@ -0,0 +1,238 @@
+import bisect
+import operator
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from rttapi.model import LocationContainer, SearchResult
+
+DETAIL_FIELDS = (
+    'platform',
+    'platform_confirmed',
+    'platform_changed',
+    'realtime_arrival',
+    'realtime_arrival_actual',
+    'realtime_arrival_no_report',
+    'realtime_gbtt_arrival_lateness',
+    'realtime_departure',
+    'realtime_departure_actual',
+    'realtime_departure_no_report',
+    'realtime_gbtt_departure_lateness',
+    'cancel_reason_code',
+    'cancel_reason_short_text',
+    'cancel_reason_long_text',
+    'display_as',
+    'service_location',
+)
+""" The fields of LocationContainer.location_detail compared by default: everything a departure board shows """
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+MOVED = 'moved'
+
+
+class ServiceChange:
+    """
+    One difference between two polls of a station board.
+    """
+    __slots__ = ('kind', 'key', 'index', 'service', 'fields')
+
+    def __init__(self, kind: str, key: Tuple, index: int, service: LocationContainer,
+                 fields: Dict[str, Tuple] = None):
+        self.kind = kind
+        """ ADDED, REMOVED, CHANGED or MOVED """
+
+        self.key = key
+        """ The (service_uid, run_date) of the service """
+
+        self.index = index
+        """ The service's position in the new board, or in the old board if it was removed """
+
+        self.service = service
+        """ The rttapi.model.LocationContainer from the new board, or from the old board if it was removed """
+
+        self.fields = fields if fields is not None else {}
+        """ For CHANGED, the location_detail fields which changed, as field name to (old value, new value) """
+
+    def __repr__(self):
+        return 'ServiceChange({!r}, {!r}, {!r}, {!r})'.format(self.kind, self.key, self.index, self.fields)
+
+
+class SearchDiff:
+    """
+    The differences between two polls of a station board, grouped by kind.
+    """
+
+    def __init__(self, changes: Iterable[ServiceChange] = ()):
+        self.added: List[ServiceChange] = []
+        self.removed: List[ServiceChange] = []
+        self.changed: List[ServiceChange] = []
+        self.moved: List[ServiceChange] = []
+
+        groups = {ADDED: self.added, REMOVED: self.removed, CHANGED: self.changed, MOVED: self.moved}
+        for change in changes:
+            groups[change.kind].append(change)
+
+    def __iter__(self) -> Iterator[ServiceChange]:
+        yield from self.added
+        yield from self.changed
+        yield from self.moved
+        yield from self.removed
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed) + len(self.moved)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+def service_key(service: LocationContainer) -> Tuple:
+    """
+    :return: The key a service is matched on between polls, (service_uid, run_date)
+    """
+    return service.service_uid, service.run_date
+
+
+def iter_changes(old: SearchResult, new: SearchResult,
+                 fields: Sequence[str] = DETAIL_FIELDS) -> Iterator[ServiceChange]:
+    """
+    Compares two polls of the same station board, yielding each difference as it is found.
+
+    Services are matched on (service_uid, run_date). Added and changed services are yielded in the order of the
+    new board. Then services which are otherwise unchanged but have moved relative to the others are yielded as
+    MOVED, as few as are needed to reproduce the new order. Removed services come last, in the order of the old
+    board. Services whose container or location_detail is the very same object in both polls are skipped without
+    comparing any fields. The API lists each service once per board; if a key does appear twice, each entry is
+    compared against the last one with that key.
+
+    :param old: The previous poll, or None to report every service as added
+    :param new: The latest poll
+    :param fields: The location_detail attributes to compare
+
+    :return: A generator of rttapi.diff.ServiceChange
+    """
+    fields = tuple(fields)
+    values = operator.attrgetter(*fields) if len(fields) > 1 else lambda detail: (getattr(detail, fields[0]),)
+
+    previous = {service_key(service): (index, service) for index, service in enumerate(old.services)} \
+        if old is not None else {}
+    seen = set()
+    # (new index, old index, key, service, changed) of every service on both boards, in the new board's order
+    matched = []
+
+    for index, service in enumerate(new.services):
+        key = service_key(service)
+        before = previous.get(key)
+
+        if before is None:
+            yield ServiceChange(ADDED, key, index, service)
+            continue
+        seen.add(key)
+        old_index, before = before
+        changed = None
+
+        if before is not service and before.location_detail is not service.location_detail:
+            old_detail, new_detail = before.location_detail, service.location_detail
+            if old_detail is None or new_detail is None:
+                old_values = values(old_detail) if old_detail is not None else (None,) * len(fields)
+                new_values = values(new_detail) if new_detail is not None else (None,) * len(fields)
+            else:
+                old_values, new_values = values(old_detail), values(new_detail)
+            if old_values != new_values:
+                changed = {field: (a, b) for field, a, b in zip(fields, old_values, new_values) if a != b}
+
+        if changed:
+            yield ServiceChange(CHANGED, key, index, service, changed)
+        matched.append((index, old_index, key, service, bool(changed)))
+
+    yield from _moves(matched)
+
+    # Everything on the old board is still there unless fewer services were matched than it had
+    if len(seen) != len(previous):
+        for index, service in enumerate(old.services):
+            key = service_key(service)
+            if key not in seen:
+                yield ServiceChange(REMOVED, key, index, service)
+
+
+def _moves(matched: list) -> Iterator[ServiceChange]:
+    """
+    Finds the services on both boards which must be moved to turn the old order into the new one: every service
+    outside the longest run, in the new order, whose old positions are increasing. Changed services are placed
+    by their index anyway, so are not reported again.
+    """
+    old_indexes = [old_index for _, old_index, _, _, _ in matched]
+    if all(a < b for a, b in zip(old_indexes, old_indexes[1:])):
+        return
+
+    # Longest increasing subsequence by patience sorting, in O(n log n)
+    tails, tail_at, parents = [], [], [-1] * len(old_indexes)
+    for i, value in enumerate(old_indexes):
+        length = bisect.bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_at.append(i)
+        else:
+            tails[length] = value
+            tail_at[length] = i
+        parents[i] = tail_at[length - 1] if length > 0 else -1
+
+    keep = set()
+    i = tail_at[-1]
+    while i != -1:
+        keep.add(i)
+        i = parents[i]
+
+    for i, (index, _, key, service, changed) in enumerate(matched):
+        if i not in keep and not changed:
+            yield ServiceChange(MOVED, key, index, service)
+
+
+def diff_searches(old: SearchResult, new: SearchResult, fields: Sequence[str] = DETAIL_FIELDS) -> SearchDiff:
+    """
+    Compares two polls of the same station board. See rttapi.diff.iter_changes.
+
+    :param old: The previous poll, or None to report every service as added
+    :param new: The latest poll
+    :param fields: The location_detail attributes to compare
+
+    :return: A rttapi.diff.SearchDiff holding every difference
+    """
+    return SearchDiff(iter_changes(old, new, fields))
+
+
+def apply_changes(result: SearchResult, changes: Iterable[ServiceChange]) -> SearchResult:
+    """
+    Applies changes to a board, e.g. to keep a copy up to date from the deltas sent by another process.
+
+    result is not modified. Added, changed and moved services are taken from the changes, and placed at their
+    index, while services without a change are shared with the new result in their existing order. Changes may
+    be given in any order, but every change between two polls must be applied at once to reproduce the new board.
+
+    :param result: The board the changes were computed from
+    :param changes: The rttapi.diff.ServiceChange objects, e.g. from iter_changes
+
+    :raises ValueError: If a change refers to a service not on the board, or the changes do not fit together
+
+    :return: A new rttapi.model.SearchResult
+    """
+    services = {service_key(service): service for service in result.services}
+    placed = {}
+
+    for change in changes:
+        if change.kind == REMOVED:
+            services.pop(change.key, None)
+            continue
+        if change.kind != ADDED and services.pop(change.key, None) is None:
+            raise ValueError("Service {} is not on the board".format(change.key))
+        placed[change.index] = change.service
+
+    remaining = iter(services.values())
+    out = SearchResult()
+    out.location = result.location
+    out.filter = result.filter
+    try:
+        out.services = [placed[index] if index in placed else next(remaining)
+                        for index in range(len(services) + len(placed))]
+    except StopIteration:
+        raise ValueError("The changes do not describe a complete board") from None
+    return out
@@ -0,0 +1,305 @@
+import bisect
+import datetime
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rttapi.model import Location, Service
+from rttapi.timing import SECONDS_PER_DAY
+
+
+class Call:
+    """
+    One stop of an indexed service at a station.
+    """
+    __slots__ = ('service', 'location', 'position', 'seconds')
+
+    def __init__(self, service: Service, location: Location, position: int, seconds: int):
+        self.service = service
+        """ The rttapi.model.Service calling """
+
+        self.location = location
+        """ The rttapi.model.Location of the call within service.locations """
+
+        self.position = position
+        """ The index of location within service.locations """
+
+        self.seconds = seconds
+        """ The time the call was indexed under, in seconds since the start of the service's run_date """
+
+    @property
+    def time(self) -> datetime.datetime:
+        """ The time the call was indexed under, as a datetime """
+        return datetime.datetime.combine(self.service.run_date, datetime.time()) + \
+            datetime.timedelta(seconds=self.seconds)
+
+    def __repr__(self):
+        return 'Call({!r}, {!r}, {!r})'.format(self.service.service_uid, self.location.tiploc, self.seconds)
+
+
+class Journey:
+    """
+    A service calling at an origin and then, later in the same run, at a destination.
+    """
+    __slots__ = ('service', 'origin', 'destination')
+
+    def __init__(self, service: Service, origin: Call, destination: Call):
+        self.service = service
+        """ The rttapi.model.Service """
+
+        self.origin = origin
+        """ The rttapi.index.Call at the origin """
+
+        self.destination = destination
+        """ The first rttapi.index.Call at the destination after the origin """
+
+    def __repr__(self):
+        return 'Journey({!r}, {!r}, {!r})'.format(self.service.service_uid, self.origin, self.destination)
+
+
+class _Entry:
+    __slots__ = ('service', 'postings', 'positions', 'calls')
+
+    def __init__(self, service: Service):
+        self.service = service
+        self.postings: List[Tuple[str, tuple]] = []
+        self.positions: Dict[str, List[int]] = {}
+        self.calls: Dict[int, tuple] = {}
+
+
+def call_seconds(location: Location, realtime: bool = True) -> Optional[int]:
+    """
+    :param location: A rttapi.model.Location
+    :param realtime: If True, prefers the realtime times to the booked ones
+
+    :return: The time a service calls at a location: its departure, or its arrival if it terminates there, in
+             seconds since the start of the run_date. None for locations passed without stopping.
+    """
+    if realtime:
+        values = (location.realtime_departure_seconds, location.gbtt_booked_departure_seconds,
+                  location.wtt_booked_departure_seconds, location.realtime_arrival_seconds,
+                  location.gbtt_booked_arrival_seconds, location.wtt_booked_arrival_seconds)
+    else:
+        values = (location.gbtt_booked_departure_seconds, location.wtt_booked_departure_seconds,
+                  location.gbtt_booked_arrival_seconds, location.wtt_booked_arrival_seconds)
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+class TimetableIndex:
+    """
+    Answers which services call at a station within a time window, and which go from one station to another,
+    across many rttapi.model.Service objects without scanning their locations.
+
+    Each station code, TIPLOC and CRS alike, has a list of postings sorted by time, one per call, so a window is
+    found by bisection and only the calls within it are visited. Times are kept on one timeline across run dates,
+    so services running past midnight and services on different days order correctly. Passing points are not
+    indexed.
+
+    Services are added and removed one at a time as they update; adding a service already indexed replaces it.
+    Each insertion or removal finds its place by bisection, then shifts the later postings for that station along,
+    which is a single memory move and cheap for the few thousand calls a station sees in a day. add_all() builds
+    in bulk by sorting once per station instead. Thread-safe.
+    """
+
+    def __init__(self, services: Iterable[Service] = (), realtime: bool = True):
+        """
+        Constructor for the TimetableIndex object.
+
+        :param services: rttapi.model.Service objects to index straight away
+        :param realtime: If True, calls are indexed under their realtime times where known, so re-adding a
+                         service after each poll keeps the index up to date with delays. If False, booked times.
+        """
+        self.realtime = realtime
+
+        self.__lock = threading.Lock()
+        self.__postings: Dict[str, List[tuple]] = {}
+        self.__entries: Dict[Tuple[str, datetime.date], _Entry] = {}
+
+        self.add_all(services)
+
+    @property
+    def codes(self) -> List[str]:
+        """ The TIPLOC and CRS codes with at least one call indexed """
+        with self.__lock:
+            return [code for code, postings in self.__postings.items() if postings]
+
+    def get(self, service_uid: str, run_date: datetime.date) -> Optional[Service]:
+        """
+        :return: The indexed rttapi.model.Service with a service_uid and run_date, or None
+        """
+        with self.__lock:
+            entry = self.__entries.get((service_uid, run_date))
+            return entry.service if entry is not None else None
+
+    def add(self, service: Service):
+        """
+        Indexes a service, replacing any indexed service with the same service_uid and run_date.
+
+        :param service: The rttapi.model.Service
+
+        :raises ValueError: If the service has no service_uid or run_date
+        """
+        entry = self.__entry(service)
+        with self.__lock:
+            self.__remove(_key(service))
+            self.__entries[_key(service)] = entry
+            for code, posting in entry.postings:
+                bisect.insort(self.__postings.setdefault(code, []), posting)
+
+    def add_all(self, services: Iterable[Service]):
+        """
+        Indexes many services at once, e.g. to build an index from a cache. Quicker than calling add() for each.
+
+        :param services: rttapi.model.Service objects
+
+        :raises ValueError: If a service has no service_uid or run_date
+        """
+        entries = {}
+        for service in services:
+            entries[_key(service)] = self.__entry(service)
+        if not entries:
+            return
+
+        with self.__lock:
+            # Removals bisect, so are all done before any unsorted postings are appended
+            for key in entries:
+                self.__remove(key)
+
+            changed = set()
+            for key, entry in entries.items():
+                self.__entries[key] = entry
+                for code, posting in entry.postings:
+                    self.__postings.setdefault(code, []).append(posting)
+                    changed.add(code)
+            # The existing postings are already sorted, so this merges two runs rather than sorting from scratch
+            for code in changed:
+                self.__postings[code].sort()
+
+    def remove(self, service_uid: str, run_date: datetime.date) -> bool:
+        """
+        Removes a service from the index.
+
+        :return: False if the service was not indexed
+        """
+        with self.__lock:
+            return self.__remove((service_uid, run_date))
+
+    def clear(self):
+        with self.__lock:
+            self.__postings.clear()
+            self.__entries.clear()
+
+    def calls_at(self, code: str, start: datetime.datetime = None, end: datetime.datetime = None) -> List[Call]:
+        """
+        Finds the services calling at a station within a time window.
+
+        :param code: A TIPLOC or CRS code
+        :param start: The earliest time, inclusive. If None, from the first call.
+        :param end: The latest time, exclusive. If None, up to the last call.
+
+        :return: The rttapi.index.Call objects in time order
+        """
+        with self.__lock:
+            postings = self.__postings.get(code)
+            if not postings:
+                return []
+            low, high = _window(postings, start, end)
+            return [self.__call(posting) for posting in postings[low:high]]
+
+    def journeys(self, origin: str, destination: str, start: datetime.datetime = None,
+                 end: datetime.datetime = None) -> List[Journey]:
+        """
+        Finds the services calling at origin within a time window and at destination later in the same run.
+
+        Only the calls at origin within the window are visited, each checked against a per-service table of where
+        it calls, so the cost grows with the number of departures in the window rather than the size of the index.
+
+        :param origin: The TIPLOC or CRS code to travel from
+        :param destination: The TIPLOC or CRS code to travel to
+        :param start: The earliest departure from origin, inclusive. If None, from the first call.
+        :param end: The latest departure from origin, exclusive. If None, up to the last call.
+
+        :return: The rttapi.index.Journey objects in order of departure from origin
+        """
+        out = []
+        with self.__lock:
+            postings = self.__postings.get(origin)
+            if not postings:
+                return out
+            low, high = _window(postings, start, end)
+            for posting in postings[low:high]:
+                entry = self.__entries[posting[1:3]]
+                positions = entry.positions.get(destination)
+                if positions is None:
+                    continue
+                after = bisect.bisect_right(positions, posting[3])
+                if after == len(positions):
+                    continue
+                arrival = entry.calls[positions[after]]
+                out.append(Journey(entry.service, self.__call(posting), self.__call(arrival)))
+        return out
+
+    def __entry(self, service: Service) -> _Entry:
+        """
+        :return: The postings of a service, built outside the lock
+        """
+        if service.service_uid is None or service.run_date is None:
+            raise ValueError("Services must have a service_uid and run_date to be indexed")
+
+        entry = _Entry(service)
+        day = service.run_date.toordinal() * SECONDS_PER_DAY
+        for position, location in enumerate(service.locations):
+            seconds = call_seconds(location, self.realtime)
+            if seconds is None:
+                continue
+            posting = entry.calls[position] = (day + seconds, service.service_uid, service.run_date, position)
+            for code in {location.tiploc, location.crs}:
+                if code is not None:
+                    entry.postings.append((code, posting))
+                    entry.positions.setdefault(code, []).append(position)
+        return entry
+
+    def __remove(self, key: Tuple[str, datetime.date]) -> bool:
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return False
+        for code, posting in entry.postings:
+            postings = self.__postings[code]
+            index = bisect.bisect_left(postings, posting)
+            del postings[index]
+            if not postings:
+                del self.__postings[code]
+        return True
+
+    def __call(self, posting: tuple) -> Call:
+        absolute, service_uid, run_date, position = posting
+        service = self.__entries[(service_uid, run_date)].service
+        return Call(service, service.locations[position], position,
+                    absolute - run_date.toordinal() * SECONDS_PER_DAY)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key: Tuple[str, datetime.date]) -> bool:
+        return key in self.__entries
+
+
+def _key(service: Service) -> Tuple[str, datetime.date]:
+    return service.service_uid, service.run_date
+
+
+def _absolute(value: datetime.datetime) -> int:
+    return value.toordinal() * SECONDS_PER_DAY + value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _window(postings: List[tuple], start: Optional[datetime.datetime],
+            end: Optional[datetime.datetime]) -> Tuple[int, int]:
+    """
+    :return: The slice of postings timed within [start, end)
+    """
+    # A 1-tuple sorts before every posting with the same time, so bisect_left finds the first posting at that time
+    low = bisect.bisect_left(postings, (_absolute(start),)) if start is not None else 0
+    high = bisect.bisect_left(postings, (_absolute(end),)) if end is not None else len(postings)
+    return low, max(low, high)
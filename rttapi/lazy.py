@@ -0,0 +1,55 @@
+from collections.abc import Sequence
+from typing import Callable
+
+
+class LazyList(Sequence):
+    """
+    A read-only sequence which parses each element from its raw JSON on first access and then keeps the result.
+
+    len() and slicing never parse more elements than are returned, so reading the first few entries of a long list
+    only pays for those entries.
+    """
+    __slots__ = ('raw', '_parse', '_items')
+
+    def __init__(self, raw: list, parse: Callable):
+        """
+        Constructor
+
+        :param raw: The list of JSON objects, as dictionaries
+        :param parse: The function used to parse a single JSON object, e.g. rttapi.parser.parse_location
+        """
+        self.raw = raw
+        """ The unparsed JSON objects backing this list """
+
+        self._parse = parse
+        self._items = [None] * len(raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.raw)))]
+
+        item = self._items[index]
+        if item is None:
+            item = self._parse(self.raw[index])
+            self._items[index] = item
+        return item
+
+    def __iter__(self):
+        for i in range(len(self.raw)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazyList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return '<LazyList {} items, {} parsed>'.format(len(self.raw), self.parsed_count)
+
+    @property
+    def parsed_count(self) -> int:
+        """ The number of elements parsed so far """
+        return sum(item is not None for item in self._items)
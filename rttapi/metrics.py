@@ -0,0 +1,306 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+""" Default histogram bucket bounds for durations, in seconds """
+
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+""" Default histogram bucket bounds for response sizes, in bytes """
+
+PHASES = ('throttle', 'wait', 'download', 'decode', 'parse')
+"""
+The phases of a request, each timed separately:
+
+- throttle: waiting for a rttapi.ratelimit.RateLimiter, including retry delays
+- wait: from sending the request until the response headers arrived, which includes DNS, connecting, TLS and
+  server time. requests reports these only as one figure, so they cannot be split further.
+- download: reading the response body
+- decode: turning the body into dicts and lists
+- parse: building the rttapi.model objects
+"""
+
+_current_span = contextvars.ContextVar('rttapi_span', default=None)
+
+
+class Span:
+    """
+    The record of one API call, in the style of an OpenTelemetry span.
+    """
+    __slots__ = ('name', 'attributes', 'start_time', 'end_time', 'phases', 'error', '_token')
+
+    def __init__(self, name: str, attributes: dict, start_time: float):
+        self.name = name
+        """ The endpoint called: 'search_departures', 'search_arrivals' or 'service' """
+
+        self.attributes = attributes
+        """
+        Details of the call: 'url', and once known 'status' (the HTTP status code), 'size' (body bytes),
+        'cache' ('hit', 'store', 'miss' or 'not_modified'), 'coalesced' (True if answered by another in-flight
+        call) and 'reused' (True if the previous parse was reused)
+        """
+
+        self.start_time = start_time
+        """ When the call started, as time.time() """
+
+        self.end_time: float = None
+        """ When the call finished, as time.time() """
+
+        self.phases: Dict[str, float] = {}
+        """ Seconds spent in each of the rttapi.metrics.PHASES that took place """
+
+        self.error: Exception = None
+        """ The exception raised by the call, if any """
+
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        """ The total length of the call in seconds """
+        return self.end_time - self.start_time
+
+    def add_phase(self, phase: str, seconds: float):
+        """
+        Adds time spent in a phase, e.g. one of several attempts at a request.
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+def current_span() -> Span:
+    """
+    :return: The span of the API call in progress in this thread or task, or None
+    """
+    return _current_span.get()
+
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled counters and histograms, exportable in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__help = {}
+        self.__types = {}
+        self.__counters = {}
+        self.__histograms = {}
+
+    def describe(self, name: str, kind: str, help: str):
+        """
+        Declares a metric, so it is exported with HELP and TYPE lines.
+
+        :param name: The metric name
+        :param kind: 'counter' or 'histogram'
+        :param help: A description of the metric
+        """
+        self.__types[name] = kind
+        self.__help[name] = help
+
+    def inc(self, name: str, labels: Tuple[Tuple[str, str], ...] = (), amount: float = 1):
+        """
+        Increases a counter.
+
+        :param name: The metric name
+        :param labels: (label, value) pairs identifying the series
+        :param amount: The amount to add
+        """
+        key = (name, labels)
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: Tuple[Tuple[str, str], ...], value: float, bounds: Sequence[float]):
+        """
+        Records a value in a histogram.
+
+        :param name: The metric name
+        :param labels: (label, value) pairs identifying the series
+        :param value: The value observed
+        :param bounds: The histogram's bucket upper bounds, used if the series is new
+        """
+        key = (name, labels)
+        with self.__lock:
+            histogram = self.__histograms.get(key)
+            if histogram is None:
+                histogram = self.__histograms[key] = _Histogram(bounds)
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels) -> float:
+        """
+        :return: The current value of a counter series, 0 if it has never been increased
+        """
+        with self.__lock:
+            return self.__counters.get((name, _labels(labels)), 0)
+
+    def histogram(self, name: str, **labels) -> Tuple[int, float]:
+        """
+        :return: The number and sum of the values recorded in a histogram series
+        """
+        with self.__lock:
+            histogram = self.__histograms.get((name, _labels(labels)))
+            return (histogram.count, histogram.sum) if histogram is not None else (0, 0.0)
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Every metric in the Prometheus text exposition format
+        """
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            histograms = sorted((key, (h.bounds, list(h.counts), h.sum, h.count))
+                                for key, h in self.__histograms.items())
+
+        lines = []
+        described = set()
+
+        def header(name):
+            if name not in described and name in self.__types:
+                described.add(name)
+                lines.append('# HELP {} {}'.format(name, self.__help[name]))
+                lines.append('# TYPE {} {}'.format(name, self.__types[name]))
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append('{}{} {}'.format(name, _format_labels(labels), _format_number(value)))
+
+        for (name, labels), (bounds, counts, total, count) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, bucket in zip(list(bounds) + ['+Inf'], counts):
+                cumulative += bucket
+                le = bound if isinstance(bound, str) else _format_number(bound)
+                lines.append('{}_bucket{} {}'.format(name, _format_labels(labels + (('le', le),)), cumulative))
+            lines.append('{}_sum{} {}'.format(name, _format_labels(labels), _format_number(total)))
+            lines.append('{}_count{} {}'.format(name, _format_labels(labels), count))
+
+        return '\n'.join(lines) + '\n'
+
+
+class Metrics:
+    """
+    Instruments every call made by a rttapi.api.RttApi: request counts by status, latency split into PHASES,
+    response sizes, and cache and single-flight outcomes. Listeners may also be given each finished Span,
+    e.g. to forward it to a tracing system.
+
+    Pass one to RttApi(metrics=...). When no Metrics object is given nothing is measured at all.
+    """
+
+    def __init__(self, registry: MetricsRegistry = None, latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+                 size_buckets: Sequence[float] = SIZE_BUCKETS):
+        """
+        Constructor for the Metrics object.
+
+        :param registry: The registry to record into. Defaults to a new one; share one between several Metrics
+                         to export them together.
+        :param latency_buckets: Histogram bucket bounds for durations, in seconds
+        :param size_buckets: Histogram bucket bounds for response sizes, in bytes
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.__listeners: List[Callable[[Span], None]] = []
+
+        self.registry.describe('rttapi_requests_total', 'counter', 'API calls by endpoint and HTTP status')
+        self.registry.describe('rttapi_request_seconds', 'histogram', 'Total duration of API calls')
+        self.registry.describe('rttapi_phase_seconds', 'histogram', 'Duration of each phase of API calls')
+        self.registry.describe('rttapi_response_bytes', 'histogram', 'Size of response bodies received')
+        self.registry.describe('rttapi_cache_total', 'counter', 'API calls by cache outcome')
+        self.registry.describe('rttapi_coalesced_total', 'counter', 'API calls answered by another in-flight call')
+        self.registry.describe('rttapi_parse_reused_total', 'counter', 'API calls which reused a previous parse')
+
+    def add_listener(self, listener: Callable[[Span], None]):
+        """
+        :param listener: Called with every finished rttapi.metrics.Span, on the thread that made the call
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]):
+        self.__listeners.remove(listener)
+
+    def start(self, name: str, url: str) -> Span:
+        """
+        Begins measuring an API call, making its span the current span until finish() is called.
+
+        :param name: The endpoint
+        :param url: The URL being requested
+
+        :return: The new span
+        """
+        span = Span(name, {'url': url}, time.time())
+        span._token = _current_span.set(span)
+        return span
+
+    def finish(self, span: Span, error: Exception = None):
+        """
+        Ends an API call begun with start(), recording its metrics and passing it to the listeners.
+
+        :param span: The span returned by start()
+        :param error: The exception the call raised, if any
+        """
+        _current_span.reset(span._token)
+        span._token = None
+        span.end_time = time.time()
+        span.error = error
+
+        registry = self.registry
+        endpoint = (('endpoint', span.name),)
+        attributes = span.attributes
+
+        status = attributes.get('status')
+        status = str(status) if status is not None else ('error' if error is not None else 'none')
+        registry.inc('rttapi_requests_total', endpoint + (('status', status),))
+        registry.observe('rttapi_request_seconds', endpoint, span.duration, self.latency_buckets)
+
+        for phase, seconds in span.phases.items():
+            registry.observe('rttapi_phase_seconds', endpoint + (('phase', phase),), seconds, self.latency_buckets)
+
+        if 'size' in attributes:
+            registry.observe('rttapi_response_bytes', endpoint, attributes['size'], self.size_buckets)
+        if 'cache' in attributes:
+            registry.inc('rttapi_cache_total', endpoint + (('outcome', attributes['cache']),))
+        if attributes.get('coalesced'):
+            registry.inc('rttapi_coalesced_total', endpoint)
+        if attributes.get('reused'):
+            registry.inc('rttapi_parse_reused_total', endpoint)
+
+        for listener in self.__listeners:
+            listener(span)
+
+    def to_prometheus(self) -> str:
+        """
+        :return: The recorded metrics in the Prometheus text exposition format
+        """
+        return self.registry.to_prometheus()
+
+
+def _labels(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(key, _escape(value)) for key, value in labels) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
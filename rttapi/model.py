@@ -5,6 +5,12 @@ class LocationDetail:
     """
     Detail of the queried station
     """
+    __slots__ = (
+        'name',
+        'crs',
+        'tiploc',
+    )
+
     def __init__(self, name: str, crs: str, tiploc: List[str]):
         """
         Constructor
@@ -17,6 +23,22 @@ class LocationDetail:
         self.tiploc = tiploc
 
 class LocationContainer:
+    __slots__ = (
+        'location_detail',
+        'service_uid',
+        'run_date',
+        'train_identity',
+        'running_identity',
+        'atoc_code',
+        'atoc_name',
+        'service_type',
+        'is_passenger',
+        'planned_cancel',
+        'origin',
+        'destination',
+        'countdown_minutes',
+    )
+
     def __init__(self):
         self.location_detail: Location = None
         self.service_uid: str = None
@@ -41,6 +63,12 @@ class SearchResult:
     This class isn't defined in the RTT API but forms the first part
     of all search API calls
     """
+    __slots__ = (
+        'location',
+        'filter',
+        'services',
+    )
+
     def __init__(self):
         self.location: LocationDetail = None
         """ rttapi.model.LocationDetail object detailing the location searched for """
@@ -51,10 +79,29 @@ class SearchResult:
         self.services: List[LocationContainer] = []
         """" Array of rttapi.model.LocationContainer containing the location information and service metadata """
 
+    def to_columns(self) -> dict:
+        """
+        Exports services as column arrays, one row per service. Requires numpy.
+        See rttapi.columns.search_columns, which also accepts many results at once.
+
+        :return: A dict of column name to a numpy array or rttapi.columns.Categorical
+        """
+        from rttapi.columns import search_columns
+        return search_columns([self])
+
 class Pair:
     """
      A TIPLOC/timing pair for a location
     """
+    __slots__ = (
+        'tiploc',
+        'description',
+        'working_time',
+        'public_time',
+        'working_time_seconds',
+        'public_time_seconds',
+    )
+
     def __init__(self):
         self.tiploc: str = None
         """ The TIPLOC code for this timing point"""
@@ -72,11 +119,62 @@ class Pair:
         self.public_time: str = None
         """ As working_time but for the advertised public times. In format HHmm e.g. 1503 """
 
+        self.working_time_seconds: int = None
+        """ working_time in seconds since the start of the service's run_date, past 86400 after midnight """
+
+        self.public_time_seconds: int = None
+        """ As working_time_seconds but for public_time """
+
 
 class Location:
     """
     See https://www.realtimetrains.co.uk/about/developer/pull/docs/locationlist/ - This class is a mirror of the API
     """
+    __slots__ = (
+        'realtime_activated',
+        'tiploc',
+        'crs',
+        'description',
+        'wtt_booked_arrival',
+        'wtt_booked_departure',
+        'wtt_booked_pass',
+        'gbtt_booked_arrival',
+        'gbtt_booked_departure',
+        'origin',
+        'destination',
+        'is_call',
+        'is_call_public_simple',
+        'realtime_arrival',
+        'realtime_arrival_actual',
+        'realtime_arrival_no_report',
+        'realtime_wtt_arrival_lateness',
+        'realtime_gbtt_arrival_lateness',
+        'realtime_departure',
+        'realtime_departure_actual',
+        'realtime_departure_no_report',
+        'realtime_wtt_departure_lateness',
+        'realtime_gbtt_departure_lateness',
+        'platform',
+        'platform_confirmed',
+        'platform_changed',
+        'line',
+        'line_confirmed',
+        'path',
+        'path_confirmed',
+        'cancel_reason_code',
+        'cancel_reason_short_text',
+        'cancel_reason_long_text',
+        'display_as',
+        'service_location',
+        'wtt_booked_arrival_seconds',
+        'wtt_booked_departure_seconds',
+        'wtt_booked_pass_seconds',
+        'gbtt_booked_arrival_seconds',
+        'gbtt_booked_departure_seconds',
+        'realtime_arrival_seconds',
+        'realtime_departure_seconds',
+    )
+
     def __init__(self):
         self.realtime_activated: bool = False
         self.tiploc: str = None
@@ -126,11 +224,41 @@ class Location:
 
         self.service_location: str = None
 
+        # The times above in seconds since the start of the service's run_date. Times after midnight on a service
+        # which started the day before are past 86400, so they compare and subtract correctly.
+        # See rttapi.timing for helpers.
+        self.wtt_booked_arrival_seconds: int = None
+        self.wtt_booked_departure_seconds: int = None
+        self.wtt_booked_pass_seconds: int = None
+        self.gbtt_booked_arrival_seconds: int = None
+        self.gbtt_booked_departure_seconds: int = None
+        self.realtime_arrival_seconds: int = None
+        self.realtime_departure_seconds: int = None
+
 
 class Service:
     """
     See https://www.realtimetrains.co.uk/about/developer/pull/docs/locationlist/ - This class is a mirror of the API
     """
+    __slots__ = (
+        'service_uid',
+        'run_date',
+        'service_type',
+        'is_passenger',
+        'train_identity',
+        'power_type',
+        'train_class',
+        'sleeper',
+        'atoc_code',
+        'atoc_name',
+        'performance_monitored',
+        'origin',
+        'destination',
+        'locations',
+        'realtime_activated',
+        'running_identity',
+    )
+
     def __init__(self):
         self.service_uid: str = None
         self.run_date: datetime.date = None
@@ -150,4 +278,14 @@ class Service:
         self.locations: List[Location] = []
 
         self.realtime_activated: bool = False
-        self.running_identity: str = None
\ No newline at end of file
+        self.running_identity: str = None
+
+    def to_columns(self) -> dict:
+        """
+        Exports locations as column arrays, one row per location. Requires numpy.
+        See rttapi.columns.service_columns, which also accepts many services at once.
+
+        :return: A dict of column name to a numpy array or rttapi.columns.Categorical
+        """
+        from rttapi.columns import service_columns
+        return service_columns([self])
@@ -1,11 +1,19 @@
+import functools
+
 from rttapi.model import *
+from rttapi.lazy import LazyList
+from rttapi.sharing import IdentityTable
+from rttapi.timing import ROLLOVER_TOLERANCE, SECONDS_PER_DAY, time_to_seconds
 
 
-def parse_search(json: dict) -> SearchResult:
+def parse_search(json: dict, lazy: bool = False, table: IdentityTable = None) -> SearchResult:
     """
     Parses the root JSON object from a station search into a rttapi.model.SearchResult representation of the JSON data.
 
     :param json: The JSON data retrieved from the API, as a dictionary
+    :param lazy: If True, services is a rttapi.lazy.LazyList which parses each service on first access
+    :param table: Optional rttapi.sharing.IdentityTable. Services unchanged since they were last parsed with the
+                  same table are returned as the same rttapi.model.LocationContainer objects.
 
     :raises ValueError: When an expected key is missing
 
@@ -26,7 +34,11 @@ def parse_search(json: dict) -> SearchResult:
 
     service_json = __assign_if_set(out.services, json, 'services')
     if service_json is not None:
-        out.services = list(map(parse_location_container, service_json))
+        parse = parse_location_container if table is None else functools.partial(_shared_container, table=table)
+        if lazy:
+            out.services = LazyList(service_json, parse)
+        else:
+            out.services = [parse(service) for service in service_json]
 
 
     return out
@@ -63,13 +75,7 @@ def parse_pair(json: dict) -> Pair:
     if not all(key in json for key in ('tiploc', 'description', 'workingTime', 'publicTime')):
         raise ValueError("JSON object missing required keys")
 
-    out = Pair()
-    out.tiploc = json['tiploc']
-    out.description = json['description']
-    out.working_time = json['workingTime']
-    out.public_time = json['publicTime']
-
-    return out
+    return _build_pair(json)
 
 def parse_location(json: dict) -> Location:
     """
@@ -84,64 +90,7 @@ def parse_location(json: dict) -> Location:
     if 'crs' not in json:
         raise ValueError("JSON object missing required keys")
 
-    out = Location()
-
-    out.realtime_activated = __assign_if_set(out.realtime_activated, json, 'realtimeActivated')
-    out.tiploc = __assign_if_set(out.tiploc, json, 'tiploc')
-    out.crs = json['crs']
-    out.description = __assign_if_set(out.description, json, 'description')
-
-    out.wtt_booked_arrival = __assign_if_set(out.wtt_booked_arrival, json, 'wttBookedArrival')
-    out.wtt_booked_departure = __assign_if_set(out.wtt_booked_departure, json, 'wttBookedDeparture')
-    out.wtt_booked_pass = __assign_if_set(out.wtt_booked_pass, json, 'wttBookedPass')
-
-    out.gbtt_booked_arrival = __assign_if_set(out.gbtt_booked_arrival, json, 'gbttBookedArrival')
-    out.gbtt_booked_departure = __assign_if_set(out.gbtt_booked_departure, json, 'gbttBookedDeparture')
-
-    if _has_value(json, 'origin'):
-        out.origin = list(map(parse_pair, json['origin']))
-
-    if _has_value(json, 'destination'):
-        out.destination = list(map(parse_pair, json['destination']))
-
-    out.realtime_arrival = __assign_if_set(out.realtime_arrival, json, 'realtimeArrival')
-    out.realtime_arrival_actual = __assign_if_set(out.realtime_arrival_actual, json, 'realtimeArrivalActual')
-    out.realtime_arrival_no_report = __assign_if_set(out.realtime_arrival_no_report, json, 'realtimeArrivalNoReport')
-    out.realtime_wtt_arrival_lateness = __assign_if_set(out.realtime_wtt_arrival_lateness, json, 'realtimeWttArrivalLateness')
-    out.realtime_gbtt_arrival_lateness = __assign_if_set(out.realtime_gbtt_arrival_lateness, json, 'realtimeGbttArrivalLateness')
-
-    out.realtime_departure = __assign_if_set(out.realtime_departure, json, 'realtimeDeparture')
-    out.realtime_departure_actual = __assign_if_set(out.realtime_departure_actual, json, 'realtimeDepartureActual')
-    out.realtime_departure_no_report = __assign_if_set(out.realtime_departure_no_report, json, 'realtimeDepartureNoReport')
-    out.realtime_wtt_departure_lateness = __assign_if_set(out.realtime_wtt_departure_lateness, json, 'realtimeWttDepartureLateness')
-    out.realtime_gbtt_departure_lateness = __assign_if_set(out.realtime_gbtt_departure_lateness, json, 'realtimeGbttDepartureLateness')
-
-    out.platform = __assign_if_set(out.platform, json, 'platform')
-    out.platform_confirmed = __assign_if_set(out.platform_confirmed, json, 'platformConfirmed')
-    out.platform_changed = __assign_if_set(out.platform_changed, json, 'platformChanged')
-
-    out.line = __assign_if_set(out.line, json, 'line')
-    out.line_confirmed = __assign_if_set(out.line_confirmed, json, 'lineConfirmed')
-
-    out.path = __assign_if_set(out.path, json, 'path')
-    out.path_confirmed = __assign_if_set(out.path_confirmed, json, 'pathConfirmed')
-
-    out.cancel_reason_code = __assign_if_set(out.cancel_reason_code, json, 'cancelReasonCode')
-    out.cancel_reason_short_text = __assign_if_set(
-        out.cancel_reason_short_text,
-        json,
-        'cancelReasonShortText'
-    )
-    out.cancel_reason_long_text = __assign_if_set(
-        out.cancel_reason_long_text,
-        json,
-        'cancelReasonLongText'
-    )
-
-    out.display_as = __assign_if_set(out.display_as, json, 'displayAs')
-    out.service_location = __assign_if_set(out.service_location, json, 'serviceLocation')
-
-    return out
+    return _build_location(json)
 
 def parse_location_container(json: dict) -> LocationContainer:
     """
@@ -153,53 +102,33 @@ def parse_location_container(json: dict) -> LocationContainer:
 
     :return: A rttapi.model.LocationContainer representation of this data
     """
-    if not all(key in json for key in ('serviceUid', 'atocCode', 'atocName', 'serviceType', 'isPassenger')):
+    if not all(key in json for key in ('locationDetail', 'serviceUid', 'runDate', 'atocCode', 'atocName',
+                                       'serviceType', 'isPassenger')):
         raise ValueError("JSON object missing required keys")
 
-    out = LocationContainer()
-
-    out.location_detail = parse_location(json['locationDetail'])
-    out.service_uid = json['serviceUid']
-    out.run_date = datetime.datetime.strptime(json['runDate'], "%Y-%m-%d").date()
-
-    out.train_identity = __assign_if_set(out.train_identity, json, 'trainIdentity')
-
-    out.running_identity = __assign_if_set(
-        out.running_identity,
-        json,
-        'runningIdentity'
-    )
+    out = _build_location_container(json)
 
-    out.atoc_code = json['atocCode']
-    out.atoc_name = json['atocName']
-    out.service_type = json['serviceType']
-    out.is_passenger = json['isPassenger']
-
-    out.planned_cancel = __assign_if_set(
-        out.planned_cancel,
-        json,
-        'plannedCancel'
-    )
-
-    out.countdown_minutes = __assign_if_set(
-        out.countdown_minutes,
-        json,
-        'countdownMinutes'
-    )
-
-    if _has_value(json, 'origin'):
-        out.origin = list(map(parse_pair, json['origin']))
-
-    if _has_value(json, 'destination'):
-        out.destination = list(map(parse_pair, json['destination']))
+    # Search results usually carry the origin inside locationDetail rather than on the service itself
+    reference = _reference_time(out.origin)
+    if reference is None and out.location_detail is not None:
+        reference = _reference_time(out.location_detail.origin)
+    if reference is not None:
+        if out.location_detail is not None:
+            _roll_location(out.location_detail, reference)
+        _roll_pairs(out.origin, reference)
+        _roll_pairs(out.destination, reference)
 
     return out
 
-def parse_service(json: dict):
+def parse_service(json: dict, lazy: bool = False, table: IdentityTable = None):
     """
     Parses a given dictionary (converted from JSON) into a rttapi.model.Service object
 
     :param json: The dictionary data to parse
+    :param lazy: If True, locations is a rttapi.lazy.LazyList which parses each location on first access
+    :param table: Optional rttapi.sharing.IdentityTable. If the service is unchanged since it was last parsed with
+                  the same table, the same rttapi.model.Service object is returned; otherwise its unchanged
+                  locations are the same rttapi.model.Location objects as before.
 
     :raises ValueError: When an expected key is missing
 
@@ -209,47 +138,110 @@ def parse_service(json: dict):
     if 'error' in json:
         raise ValueError(json['error'])
 
-    out = Service()
+    if not all(key in json for key in ('serviceUid', 'runDate', 'serviceType', 'isPassenger', 'trainIdentity',
+                                       'atocCode', 'atocName')):
+        raise ValueError("JSON object missing required keys")
 
-    out.service_uid = json['serviceUid']
-    out.run_date = datetime.datetime.strptime(json['runDate'], "%Y-%m-%d").date()
-    out.service_type = json['serviceType']
-    out.is_passenger = json['isPassenger']
-    out.train_identity = json['trainIdentity']
-    out.atoc_code = json['atocCode']
-    out.atoc_name = json['atocName']
+    if table is None:
+        return _parse_service(json, lazy)
+    return table.share(('service', json.get('serviceUid'), json.get('runDate')), json,
+                       _parse_service, json, lazy, table)
+
+def _parse_service(json: dict, lazy: bool, table: IdentityTable = None) -> Service:
+    out = _build_service(json)
+    locations = json.get('locations')
+    reference = _reference_time(out.origin, locations)
+
+    if reference is not None:
+        _roll_pairs(out.origin, reference)
+        _roll_pairs(out.destination, reference)
+
+    if locations is not None:
+        if table is not None:
+            parse = functools.partial(_shared_location, table=table, service=(out.service_uid, json.get('runDate')),
+                                      reference=reference)
+        else:
+            parse = functools.partial(_parse_location_on_day, reference=reference)
+
+        if lazy:
+            out.locations = LazyList(locations, parse)
+        elif table is not None:
+            out.locations = [parse(location) for location in locations]
+        else:
+            out.locations = [_parse_location_on_day(location, reference) for location in locations]
 
-    out.power_type = __assign_if_set(
-        out.power_type, json, 'powerType'
-    )
-    out.train_class = __assign_if_set(
-        out.train_class, json, 'trainClass'
-    )
-    out.sleeper = __assign_if_set(
-        out.sleeper, json, 'sleeper'
-    )
-    out.performance_monitored = __assign_if_set(
-        out.performance_monitored, json, 'performanceMonitored'
-    )
+    return out
 
-    if _has_value(json, 'origin'):
-        out.origin = list(map(parse_pair, json['origin']))
 
-    if _has_value(json, 'destination'):
-        out.destination = list(map(parse_pair, json['destination']))
+class InternPool:
+    """
+    A bounded pool of canonical strings. Codes and names such as TIPLOCs, CRS codes and operator names repeat across
+    thousands of parsed objects; passing each through the pool makes all equal values share one str object, which
+    saves memory in long-lived caches and lets equality checks and dict lookups succeed on identity.
 
-    if _has_value(json, 'locations'):
-        out.locations = list(map(parse_location, json['locations']))
+    Once max_size distinct strings are held, further new strings are returned as they are rather than added.
+    Thread-safe.
+    """
 
-    out.realtime_activated = __assign_if_set(
-        out.realtime_activated, json, 'realtimeActivated'
-    )
+    def __init__(self, max_size: int = 65536):
+        """
+        Constructor for the InternPool object.
 
-    out.running_identity = __assign_if_set(
-        out.realtime_activated, json, 'runningIdentity'
-    )
+        :param max_size: The maximum number of distinct strings to hold
+        """
+        self.max_size = max_size
+        self.__strings = {}
 
-    return out
+    def intern(self, value: str) -> str:
+        """
+        :param value: The string to canonicalise
+
+        :return: The pooled string equal to value, or value itself if it is new and the pool is full,
+                 or is not a string (e.g. a list of TIPLOCs)
+        """
+        try:
+            return self.__strings[value]
+        except KeyError:
+            if len(self.__strings) >= self.max_size:
+                return value
+            return self.__strings.setdefault(value, value)
+        except TypeError:
+            return value
+
+    def clear(self):
+        """
+        Empties the pool. Strings already handed out are unaffected.
+        """
+        self.__strings.clear()
+
+    def __len__(self):
+        return len(self.__strings)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.__strings
+
+
+_intern_pool = InternPool()
+
+
+def get_intern_pool() -> InternPool:
+    """
+    :return: The pool shared by every parse and every client, or None if interning is disabled
+    """
+    return _intern_pool
+
+def set_intern_pool(pool: InternPool):
+    """
+    Replaces the pool used by all subsequent parses.
+
+    :param pool: The new pool, or None to disable interning
+    """
+    global _intern_pool
+    _intern_pool = pool
+
+def _intern(value: str) -> str:
+    pool = _intern_pool
+    return value if pool is None else pool.intern(value)
 
 
 def _has_value(json, key):
@@ -279,4 +271,251 @@ def __assign_if_set(old_val, json, key):
     if key in json and json[key] is not None:
         return json[key]
     else:
-        return old_val
\ No newline at end of file
+        return old_val
+
+def _compile_parser(model: type, fields: tuple):
+    """
+    Generates a function that builds a model object from a JSON object, assigning every slot exactly once.
+
+    The generated code is straight-line: one dict lookup per mapped field, with the converter applied to any
+    non-null value. Attributes that are absent, null or unmapped take the default assigned by the model's
+    constructor, so the result is identical to constructing the model and assigning each value that is set.
+
+    :param model: The model class to build, which must declare __slots__
+    :param fields: (camelCase JSON key, attribute name, converter or None) triples
+
+    :return: A function taking a JSON dict and returning a populated model object
+    """
+    prototype = model()
+    mapped = {attribute: (key, convert) for key, attribute, convert in fields}
+    namespace = {'_new': object.__new__, '_model': model}
+    lines = ['def populate(json):', '    out = _new(_model)', '    get = json.get']
+
+    # Keys feeding more than one attribute are looked up once, up front
+    keys = [key for key, _, _ in fields]
+    shared = {}
+    for key in keys:
+        if keys.count(key) > 1 and key not in shared:
+            shared[key] = '_shared{}'.format(len(shared))
+            lines.append('    {} = get({!r})'.format(shared[key], key))
+
+    for attribute in model.__slots__:
+        default = getattr(prototype, attribute)
+        if isinstance(default, list):
+            default_expr = '[]'
+        else:
+            default_expr = '_default_' + attribute
+            namespace[default_expr] = default
+
+        if attribute not in mapped:
+            lines.append('    out.{} = {}'.format(attribute, default_expr))
+            continue
+
+        key, convert = mapped[attribute]
+        value_expr = 'value'
+        if convert is not None:
+            value_expr = '_convert_{}(value)'.format(attribute)
+            namespace['_convert_' + attribute] = convert
+
+        if key in shared:
+            lines.append('    value = {}'.format(shared[key]))
+        else:
+            lines.append('    value = get({!r})'.format(key))
+        lines.append('    out.{} = {} if value is None else {}'.format(attribute, default_expr, value_expr))
+
+    lines.append('    return out')
+    exec('\n'.join(lines), namespace)
+    return namespace['populate']
+
+def _parse_pairs(json: list) -> List[Pair]:
+    return [parse_pair(pair) for pair in json]
+
+def _parse_location_on_day(json: dict, reference: int = None) -> Location:
+    location = parse_location(json)
+    if reference is not None:
+        _roll_location(location, reference)
+    return location
+
+def _shared_container(json: dict, table: IdentityTable) -> LocationContainer:
+    # The same service has a different locationDetail on each station's board
+    detail = json.get('locationDetail') or {}
+    key = ('container', json.get('serviceUid'), json.get('runDate'), detail.get('tiploc'))
+    return table.share(key, json, parse_location_container, json)
+
+def _shared_location(json: dict, table: IdentityTable, service: tuple, reference: int) -> Location:
+    # A service may call at the same TIPLOC more than once, so its booked times are part of the key
+    key = ('location',) + service + (json.get('tiploc'), json.get('wttBookedArrival'),
+                                     json.get('wttBookedDeparture'), json.get('wttBookedPass'))
+    return table.share(key, (json, reference), _parse_location_on_day, json, reference)
+
+def _reference_time(origin: List[Pair], locations: list = None) -> int:
+    """
+    Finds the time a service starts, against which later times are checked for having passed midnight.
+
+    :param origin: The parsed origin pairs of the service
+    :param locations: The raw location list of the service, used if the origin has no working time
+
+    :return: Seconds since midnight on the run date, or None if the service has no known start time
+    """
+    for pair in origin:
+        if pair.working_time_seconds is not None:
+            return pair.working_time_seconds
+    if locations:
+        return time_to_seconds(locations[0].get('wttBookedDeparture'))
+    return None
+
+def _roll_pairs(pairs: List[Pair], reference: int):
+    limit = reference - ROLLOVER_TOLERANCE
+    for pair in pairs:
+        if pair.working_time_seconds is not None and pair.working_time_seconds < limit:
+            pair.working_time_seconds += SECONDS_PER_DAY
+        if pair.public_time_seconds is not None and pair.public_time_seconds < limit:
+            pair.public_time_seconds += SECONDS_PER_DAY
+
+def _roll_location(location: Location, reference: int):
+    """
+    Moves the *_seconds times of a location which fall after midnight onto the following day.
+    """
+    limit = reference - ROLLOVER_TOLERANCE
+    for attribute in _LOCATION_SECONDS:
+        value = getattr(location, attribute)
+        if value is not None and value < limit:
+            setattr(location, attribute, value + SECONDS_PER_DAY)
+    _roll_pairs(location.origin, reference)
+    _roll_pairs(location.destination, reference)
+
+def _parse_run_date(value: str) -> datetime.date:
+    """
+    Parses a YYYY-MM-DD run date. A search result holds only a handful of distinct dates, so each date string is
+    remembered and every service running on the same day shares one datetime.date object.
+
+    :raises ValueError: If value is not a valid date
+    """
+    date = _run_dates.get(value)
+    if date is None:
+        date = _parse_iso_date(value)
+        if len(_run_dates) >= _RUN_DATE_MEMO_SIZE:
+            _run_dates.clear()
+        _run_dates[value] = date
+    return date
+
+def _parse_iso_date(value: str) -> datetime.date:
+    if len(value) == 10 and value[4] == '-' and value[7] == '-' and (value[:4] + value[5:7] + value[8:]).isdigit():
+        try:
+            return datetime.date(int(value[:4]), int(value[5:7]), int(value[8:]))
+        except ValueError:
+            pass
+    # Not in the expected form; let strptime decide, and produce its usual error
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+_RUN_DATE_MEMO_SIZE = 64
+_run_dates = {}
+
+
+_build_pair = _compile_parser(Pair, (
+    ('tiploc', 'tiploc', _intern),
+    ('description', 'description', _intern),
+    ('workingTime', 'working_time', None),
+    ('publicTime', 'public_time', None),
+    ('workingTime', 'working_time_seconds', time_to_seconds),
+    ('publicTime', 'public_time_seconds', time_to_seconds),
+))
+
+_build_location = _compile_parser(Location, (
+    ('realtimeActivated', 'realtime_activated', None),
+    ('tiploc', 'tiploc', _intern),
+    ('crs', 'crs', _intern),
+    ('description', 'description', _intern),
+
+    ('wttBookedArrival', 'wtt_booked_arrival', None),
+    ('wttBookedDeparture', 'wtt_booked_departure', None),
+    ('wttBookedPass', 'wtt_booked_pass', None),
+
+    ('gbttBookedArrival', 'gbtt_booked_arrival', None),
+    ('gbttBookedDeparture', 'gbtt_booked_departure', None),
+
+    ('origin', 'origin', _parse_pairs),
+    ('destination', 'destination', _parse_pairs),
+
+    ('realtimeArrival', 'realtime_arrival', None),
+    ('realtimeArrivalActual', 'realtime_arrival_actual', None),
+    ('realtimeArrivalNoReport', 'realtime_arrival_no_report', None),
+    ('realtimeWttArrivalLateness', 'realtime_wtt_arrival_lateness', None),
+    ('realtimeGbttArrivalLateness', 'realtime_gbtt_arrival_lateness', None),
+
+    ('realtimeDeparture', 'realtime_departure', None),
+    ('realtimeDepartureActual', 'realtime_departure_actual', None),
+    ('realtimeDepartureNoReport', 'realtime_departure_no_report', None),
+    ('realtimeWttDepartureLateness', 'realtime_wtt_departure_lateness', None),
+    ('realtimeGbttDepartureLateness', 'realtime_gbtt_departure_lateness', None),
+
+    ('platform', 'platform', _intern),
+    ('platformConfirmed', 'platform_confirmed', None),
+    ('platformChanged', 'platform_changed', None),
+
+    ('line', 'line', None),
+    ('lineConfirmed', 'line_confirmed', None),
+
+    ('path', 'path', None),
+    ('pathConfirmed', 'path_confirmed', None),
+
+    ('cancelReasonCode', 'cancel_reason_code', None),
+    ('cancelReasonShortText', 'cancel_reason_short_text', None),
+    ('cancelReasonLongText', 'cancel_reason_long_text', None),
+
+    ('displayAs', 'display_as', None),
+    ('serviceLocation', 'service_location', None),
+
+    ('wttBookedArrival', 'wtt_booked_arrival_seconds', time_to_seconds),
+    ('wttBookedDeparture', 'wtt_booked_departure_seconds', time_to_seconds),
+    ('wttBookedPass', 'wtt_booked_pass_seconds', time_to_seconds),
+    ('gbttBookedArrival', 'gbtt_booked_arrival_seconds', time_to_seconds),
+    ('gbttBookedDeparture', 'gbtt_booked_departure_seconds', time_to_seconds),
+    ('realtimeArrival', 'realtime_arrival_seconds', time_to_seconds),
+    ('realtimeDeparture', 'realtime_departure_seconds', time_to_seconds),
+))
+
+_LOCATION_SECONDS = (
+    'wtt_booked_arrival_seconds',
+    'wtt_booked_departure_seconds',
+    'wtt_booked_pass_seconds',
+    'gbtt_booked_arrival_seconds',
+    'gbtt_booked_departure_seconds',
+    'realtime_arrival_seconds',
+    'realtime_departure_seconds',
+)
+
+_build_location_container = _compile_parser(LocationContainer, (
+    ('locationDetail', 'location_detail', parse_location),
+    ('serviceUid', 'service_uid', None),
+    ('runDate', 'run_date', _parse_run_date),
+    ('trainIdentity', 'train_identity', None),
+    ('runningIdentity', 'running_identity', None),
+    ('atocCode', 'atoc_code', _intern),
+    ('atocName', 'atoc_name', _intern),
+    ('serviceType', 'service_type', _intern),
+    ('isPassenger', 'is_passenger', None),
+    ('plannedCancel', 'planned_cancel', None),
+    ('countdownMinutes', 'countdown_minutes', None),
+    ('origin', 'origin', _parse_pairs),
+    ('destination', 'destination', _parse_pairs),
+))
+
+# locations are parsed by parse_service, once the service's start time is known
+_build_service = _compile_parser(Service, (
+    ('serviceUid', 'service_uid', None),
+    ('runDate', 'run_date', _parse_run_date),
+    ('serviceType', 'service_type', _intern),
+    ('isPassenger', 'is_passenger', None),
+    ('trainIdentity', 'train_identity', None),
+    ('powerType', 'power_type', None),
+    ('trainClass', 'train_class', None),
+    ('sleeper', 'sleeper', None),
+    ('atocCode', 'atoc_code', _intern),
+    ('atocName', 'atoc_name', _intern),
+    ('performanceMonitored', 'performance_monitored', None),
+    ('origin', 'origin', _parse_pairs),
+    ('destination', 'destination', _parse_pairs),
+    ('realtimeActivated', 'realtime_activated', None),
+    ('runningIdentity', 'running_identity', None),
+))
@@ -0,0 +1,219 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    A token bucket allowing rate requests per second on average, with bursts of up to burst requests.
+
+    Callers reserve a token and are told how long to wait before using it, so the bucket itself never blocks
+    while holding its lock. This lets one bucket be shared by any number of threads and asyncio tasks, even
+    across event loops.
+    """
+
+    def __init__(self, rate: float, burst: int = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Constructor for the TokenBucket object.
+
+        :param rate: The number of tokens added per second
+        :param burst: The maximum number of tokens held. Defaults to one second's worth, and at least 1.
+        :param clock: Returns the current time in seconds. Overridable for testing.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.__rate = float(rate)
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__tokens = float(self.burst)
+        self.__updated = clock()
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    @rate.setter
+    def rate(self, rate: float):
+        with self.__lock:
+            self.__refill()
+            self.__rate = float(rate)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        Takes tokens from the bucket, going into debt if there are not enough.
+
+        :param tokens: The number of tokens to take
+
+        :return: The number of seconds the caller must wait before going ahead, 0 if it may go immediately
+        """
+        with self.__lock:
+            now = self.__refill()
+            self.__tokens -= tokens
+            wait = max(0.0, self.__updated - now)
+            if self.__tokens < 0:
+                wait += -self.__tokens / self.__rate
+            return wait
+
+    def pause(self, seconds: float):
+        """
+        Stops the bucket handing out tokens for the given time, and empties it so requests resume gradually
+        afterwards rather than in one burst.
+
+        :param seconds: The number of seconds to pause for
+        """
+        with self.__lock:
+            now = self.__refill()
+            self.__updated = max(self.__updated, now + seconds)
+            self.__tokens = min(self.__tokens, 0.0)
+
+    def __refill(self) -> float:
+        now = self.__clock()
+        if now > self.__updated:
+            self.__tokens = min(float(self.burst), self.__tokens + (now - self.__updated) * self.__rate)
+            self.__updated = now
+        return now
+
+
+class RateLimiter:
+    """
+    Keeps requests within the API's usage limits, shared by every thread and asyncio task using it.
+
+    Requests are paced by a TokenBucket. The rate adapts additive-increase/multiplicative-decrease: each
+    successful response raises it by increase requests per second, up to the configured rate, and each throttled
+    or failed response (429 or 5xx) multiplies it by decrease, down to min_rate. A 429 or 503 with a Retry-After
+    header pauses all requests for that long.
+
+    Throttled and failed requests are retried up to max_retries times, waiting an exponentially growing,
+    randomly jittered delay in addition to any pause.
+    """
+
+    def __init__(self, rate: float, burst: int = None, min_rate: float = None, increase: float = None,
+                 decrease: float = 0.5, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 retry_statuses: tuple = (429, 500, 502, 503, 504),
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 jitter: Callable[[], float] = random.random):
+        """
+        Constructor for the RateLimiter object.
+
+        :param rate: The maximum sustained number of requests per second, e.g. the API quota
+        :param burst: The number of requests that may be made at once after a quiet period. Defaults to one
+                      second's worth.
+        :param min_rate: The lowest rate backing off may reach. Defaults to a tenth of rate.
+        :param increase: Requests per second added to the rate after each success. Defaults to 5% of rate.
+        :param decrease: Factor the rate is multiplied by after each throttled or failed response
+        :param max_retries: The number of times a throttled or failed request is retried. 0 to never retry.
+        :param base_delay: Seconds to wait before the first retry, doubling for each further retry
+        :param max_delay: The longest wait between retries, and the longest Retry-After honoured
+        :param retry_statuses: The HTTP status codes which are retried and slow the rate down
+        :param clock: Returns the current time in seconds. Overridable for testing.
+        :param sleep: Blocks for a number of seconds. Overridable for testing.
+        :param jitter: Returns a random number between 0 and 1. Overridable for testing.
+        """
+        self.max_rate = float(rate)
+        self.min_rate = min_rate if min_rate is not None else self.max_rate / 10
+        self.increase = increase if increase is not None else self.max_rate / 20
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+        self.throttled = 0
+        """ Number of responses which slowed the rate down """
+
+        self.retries = 0
+        """ Number of requests retried """
+
+        self.__bucket = TokenBucket(rate, burst, clock)
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__jitter = jitter
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """ The current number of requests allowed per second """
+        return self.__bucket.rate
+
+    def acquire(self):
+        """
+        Blocks the calling thread until it may send a request.
+        """
+        wait = self.__bucket.reserve()
+        if wait > 0:
+            self.__sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Waits, without blocking the event loop, until the calling task may send a request.
+        """
+        wait = self.__bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, status_code: int, retry_after: str = None):
+        """
+        Adapts the rate to the outcome of a request.
+
+        :param status_code: The HTTP status code of the response
+        :param retry_after: The value of the response's Retry-After header, if any
+        """
+        if status_code in self.retry_statuses:
+            with self.__lock:
+                self.throttled += 1
+                self.__bucket.rate = max(self.min_rate, self.__bucket.rate * self.decrease)
+
+            pause = _parse_retry_after(retry_after) if status_code in (429, 503) else None
+            if pause is not None:
+                self.__bucket.pause(min(pause, self.max_delay))
+        elif status_code < 400 and self.__bucket.rate < self.max_rate:
+            with self.__lock:
+                self.__bucket.rate = min(self.max_rate, self.__bucket.rate + self.increase)
+
+    def retry_delay(self, status_code: int, attempt: int) -> float:
+        """
+        Decides whether a response should be retried.
+
+        :param status_code: The HTTP status code of the response
+        :param attempt: The number of retries already made for this request
+
+        :return: The number of seconds to wait before retrying, or None if the response should not be retried
+        """
+        if status_code not in self.retry_statuses or attempt >= self.max_retries:
+            return None
+
+        with self.__lock:
+            self.retries += 1
+        # "Full jitter": spreads retries out so clients throttled together do not retry together
+        return self.__jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+    def sleep(self, seconds: float):
+        """
+        Blocks the calling thread for the given time, using the sleep function this limiter was created with.
+        """
+        if seconds > 0:
+            self.__sleep(seconds)
+
+
+def _parse_retry_after(value: str) -> float:
+    """
+    :param value: A Retry-After header, either a number of seconds or an HTTP date
+
+    :return: The number of seconds to wait, or None if value is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -0,0 +1,331 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import math
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Sequence
+
+from rttapi.diff import DETAIL_FIELDS, SearchDiff, diff_searches
+from rttapi.model import SearchResult
+
+
+class StationUpdate:
+    """
+    The outcome of one poll of a watched station.
+    """
+    __slots__ = ('code', 'result', 'changes', 'error', 'interval', 'polled_at')
+
+    def __init__(self, code: str, result: SearchResult, changes: SearchDiff, error: Exception, interval: float,
+                 polled_at: float):
+        self.code = code
+        """ The CRS or TIPLOC code polled """
+
+        self.result = result
+        """ The latest rttapi.model.SearchResult for the station, the previous one if this poll failed """
+
+        self.changes = changes
+        """ The rttapi.diff.SearchDiff from the previous poll, every service added on the first. None on error. """
+
+        self.error = error
+        """ The exception raised by the poll, if it failed """
+
+        self.interval = interval
+        """ Seconds until the station is next due """
+
+        self.polled_at = polled_at
+        """ When the poll completed, on the scheduler's clock """
+
+
+class _Station:
+    __slots__ = ('code', 'result', 'polled_at', 'rate', 'interval', 'deadline', 'in_flight', 'failures')
+
+    def __init__(self, code: str, deadline: float):
+        self.code = code
+        self.result: SearchResult = None
+        self.polled_at: float = None
+        self.rate: float = None
+        self.interval: float = None
+        self.deadline = deadline
+        self.in_flight = False
+        self.failures = 0
+
+
+class PollScheduler:
+    """
+    Keeps a set of station boards fresh within a fixed request budget.
+
+    Each watched station has a deadline for its next poll. Polls are started earliest deadline first, and never
+    more often than budget per second, so requests are spread evenly rather than sent in bursts; a station which is
+    overdue simply waits for the next free slot.
+
+    After each poll the station's change rate is estimated from the number of services which changed since the
+    previous poll (see rttapi.diff), smoothed over successive polls. The budget is then shared between stations in
+    proportion to the square root of their change rates, which keeps boards fresher on average than sharing it
+    equally or in proportion to the rates themselves. A station is also polled again no later than its nearest
+    departure's countdown_minutes, so services leaving are noticed promptly. Failed polls back off exponentially.
+
+    Updates are delivered to listeners, from whichever thread or task ran the poll, or by iterating updates() in
+    asyncio. Thread-safe.
+    """
+
+    def __init__(self, api, budget: float, min_interval: float = 15.0, max_interval: float = 300.0,
+                 kind: str = 'departures', fields: Sequence[str] = DETAIL_FIELDS, smoothing: float = 0.3,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Constructor for the PollScheduler object.
+
+        :param api: The rttapi.api.RttApi or rttapi.async_api.AsyncRttApi to poll through
+        :param budget: The number of requests per second to spend across all stations
+        :param min_interval: The shortest time between polls of one station, in seconds
+        :param max_interval: The longest time between polls of one station, in seconds
+        :param kind: Either 'departures' or 'arrivals'
+        :param fields: The location_detail attributes which count as changes, see rttapi.diff.iter_changes
+        :param smoothing: The weight of the latest poll in each station's change rate, between 0 and 1
+        :param clock: Returns the current time in seconds. Overridable for testing.
+        :param sleep: Blocks for a number of seconds. Overridable for testing.
+
+        :raises ValueError: If budget is not positive or kind is not recognised
+        """
+        if budget <= 0:
+            raise ValueError("budget must be positive")
+        if kind == 'departures':
+            self.__search = api.search_station_departures
+        elif kind == 'arrivals':
+            self.__search = api.search_station_arrivals
+        else:
+            raise ValueError("kind must be 'departures' or 'arrivals'")
+
+        self.budget = float(budget)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fields = tuple(fields)
+        self.smoothing = smoothing
+
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__stations: Dict[str, _Station] = {}
+        self.__queue = []
+        self.__sequence = itertools.count()
+        self.__next_slot = clock()
+        self.__listeners: List[Callable[[StationUpdate], None]] = []
+
+    @property
+    def codes(self) -> List[str]:
+        """ The codes of the stations being watched """
+        with self.__lock:
+            return list(self.__stations)
+
+    def watch(self, codes: Iterable[str]):
+        """
+        Starts polling stations. Each is first polled as soon as the budget allows.
+
+        :param codes: CRS or TIPLOC codes
+        """
+        with self.__lock:
+            now = self.__clock()
+            for code in codes:
+                if code not in self.__stations:
+                    station = self.__stations[code] = _Station(code, now)
+                    self.__push(station)
+
+    def unwatch(self, codes: Iterable[str]):
+        """
+        Stops polling stations. A poll already in flight still completes and is delivered.
+
+        :param codes: CRS or TIPLOC codes
+        """
+        with self.__lock:
+            for code in codes:
+                self.__stations.pop(code, None)
+
+    def result(self, code: str) -> SearchResult:
+        """
+        :return: The latest result for a watched station, or None if it has not been polled successfully yet
+        """
+        with self.__lock:
+            station = self.__stations.get(code)
+            return station.result if station is not None else None
+
+    def add_listener(self, listener: Callable[[StationUpdate], None]):
+        """
+        :param listener: Called with every rttapi.scheduler.StationUpdate
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[StationUpdate], None]):
+        self.__listeners.remove(listener)
+
+    def poll_next(self) -> StationUpdate:
+        """
+        Waits until the next station is due, then polls it.
+
+        :return: The rttapi.scheduler.StationUpdate, or None if nothing was due within max_interval
+        """
+        code, wait = self.__next_due()
+        if wait > 0:
+            self.__sleep(min(wait, self.max_interval))
+            code, wait = self.__next_due()
+            if wait > 0:
+                return None
+        return self.__poll(code)
+
+    def run(self, stop: threading.Event = None):
+        """
+        Polls watched stations until stop is set, delivering updates to the listeners.
+
+        :param stop: Ends the loop when set. If None, runs forever.
+        """
+        while stop is None or not stop.is_set():
+            code, wait = self.__next_due()
+            if wait > 0:
+                if stop is not None:
+                    stop.wait(min(wait, self.max_interval))
+                else:
+                    self.__sleep(min(wait, self.max_interval))
+                continue
+            self.__poll(code)
+
+    async def updates(self) -> AsyncIterator[StationUpdate]:
+        """
+        Polls watched stations for as long as it is iterated, yielding each update as it arrives.
+
+        Several polls may be in flight at once, so slow responses do not hold up the stations due after them.
+        Coroutine methods of an AsyncRttApi are awaited; blocking RttApi calls run in the loop's default executor.
+
+        :return: An async iterator of rttapi.scheduler.StationUpdate
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        tasks = set()
+        try:
+            while True:
+                code, wait = self.__next_due()
+                if wait <= 0:
+                    self.__begin(code)
+                    task = loop.create_task(self.__poll_async(code, queue, loop))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    continue
+
+                try:
+                    update = await asyncio.wait_for(queue.get(), min(wait, self.max_interval))
+                except asyncio.TimeoutError:
+                    continue
+                yield update
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def __poll(self, code: str) -> StationUpdate:
+        self.__begin(code)
+        try:
+            result = self.__search(code)
+        except Exception as e:
+            return self.__complete(code, None, e)
+        return self.__complete(code, result, None)
+
+    async def __poll_async(self, code: str, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        try:
+            if inspect.iscoroutinefunction(self.__search):
+                result = await self.__search(code)
+            else:
+                result = await loop.run_in_executor(None, self.__search, code)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            queue.put_nowait(self.__complete(code, None, e))
+        else:
+            queue.put_nowait(self.__complete(code, result, None))
+
+    def __next_due(self) -> tuple:
+        """
+        :return: The code of the station with the earliest deadline, and how long until it may be polled.
+                 (None, infinity) if no station is waiting.
+        """
+        with self.__lock:
+            while self.__queue:
+                deadline, _, code = self.__queue[0]
+                station = self.__stations.get(code)
+                if station is None or station.in_flight or station.deadline != deadline:
+                    # Unwatched or rescheduled since this entry was pushed
+                    heapq.heappop(self.__queue)
+                    continue
+                return code, max(deadline, self.__next_slot) - self.__clock()
+            return None, math.inf
+
+    def __begin(self, code: str):
+        with self.__lock:
+            now = self.__clock()
+            self.__next_slot = max(now, self.__next_slot) + 1 / self.budget
+            station = self.__stations.get(code)
+            if station is not None:
+                station.in_flight = True
+
+    def __complete(self, code: str, result: SearchResult, error: Exception) -> StationUpdate:
+        now = self.__clock()
+        with self.__lock:
+            station = self.__stations.get(code)
+        if station is None:
+            station = _Station(code, now)
+
+        if error is not None:
+            station.failures += 1
+            interval = min(self.max_interval, self.min_interval * 2 ** station.failures)
+            changes = None
+        else:
+            changes = diff_searches(station.result, result, self.fields)
+            if station.result is not None and now > station.polled_at:
+                # Services only moving relative to others have not changed themselves, so do not count
+                changed = len(changes.added) + len(changes.removed) + len(changes.changed)
+                observed = changed / (now - station.polled_at)
+                station.rate = observed if station.rate is None else \
+                    station.rate + self.smoothing * (observed - station.rate)
+            station.result = result
+            station.polled_at = now
+            station.failures = 0
+            interval = self.__interval(station)
+
+        with self.__lock:
+            station.interval = interval
+            station.deadline = now + interval
+            station.in_flight = False
+            if self.__stations.get(code) is station:
+                self.__push(station)
+
+        update = StationUpdate(code, station.result, changes, error, interval, now)
+        for listener in self.__listeners:
+            listener(update)
+        return update
+
+    def __interval(self, station: _Station) -> float:
+        """
+        :return: The time until the station should next be polled
+        """
+        with self.__lock:
+            rates = [s.rate for s in self.__stations.values() if s.rate is not None]
+            count = len(self.__stations)
+
+        # Stations without an estimate yet are assumed to change at the average rate
+        default = sum(rates) / len(rates) if rates else 0.0
+        total = sum(math.sqrt(rate) for rate in rates) + (count - len(rates)) * math.sqrt(default)
+        weight = math.sqrt(station.rate if station.rate is not None else default)
+
+        if total > 0 and weight > 0:
+            interval = total / (self.budget * weight)
+        elif total > 0:
+            interval = self.max_interval
+        else:
+            interval = count / self.budget
+
+        nearest = min((service.countdown_minutes for service in station.result.services
+                       if service.countdown_minutes >= 0), default=None)
+        if nearest is not None:
+            interval = min(interval, nearest * 60)
+
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def __push(self, station: _Station):
+        heapq.heappush(self.__queue, (station.deadline, next(self.__sequence), station.code))
@@ -0,0 +1,367 @@
+import json
+import multiprocessing
+import os
+import pickle
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Dict, List, Sequence, Tuple
+
+from rttapi.model import SearchResult
+
+_MAGIC = b'RTTS'
+_PREFIX = struct.Struct('<4sIIQ')
+""" Magic, slot size, directory length and the creator's resource tracker at the start of the block """
+
+_SLOT = struct.Struct('<QIId')
+""" Sequence number, payload length, payload CRC-32 and publish time at the start of each slot """
+
+_OVERFLOW = 0xFFFFFFFF
+""" Payload length recorded when a result did not fit in its slot """
+
+
+def _tracker() -> int:
+    """
+    :return: An identifier for the resource tracker process this process reports shared memory to, shared by
+             every process multiprocessing starts from it. 0 where blocks are not tracked, i.e. on Windows.
+    """
+    if os.name == 'nt':
+        return 0
+    from multiprocessing import resource_tracker
+    # The tracker is reached through a pipe, which is the same pipe in every process sharing it
+    return os.fstat(resource_tracker.getfd()).st_ino
+
+
+def _attach(name: str) -> Tuple[shared_memory.SharedMemory, bool]:
+    """
+    Opens an existing block.
+
+    :return: The block, and whether attaching registered it with this process's resource tracker
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False), False
+    except TypeError:
+        # Before Python 3.13 attaching always registers the block
+        return shared_memory.SharedMemory(name), os.name != 'nt'
+
+
+def _untrack(block: shared_memory.SharedMemory):
+    """
+    Stops this process's resource tracker unlinking a block it did not create when the process exits.
+    """
+    from multiprocessing import resource_tracker
+    resource_tracker.unregister(getattr(block, '_name', block.name), 'shared_memory')
+
+
+class SharedStore:
+    """
+    A shared memory block holding the latest pickled rttapi.model.SearchResult for each of a fixed set of stations,
+    written by poller processes and read by any number of other processes without messages between them.
+
+    Each station has a fixed-size slot guarded by a sequence lock: the single writer of a slot makes its sequence
+    number odd, writes, then makes it even again, and readers retry if the number was odd or changed while they
+    copied, or if the copy does not match the CRC-32 written with it. Readers never block writers. Each reader
+    unpickles a station's result once per new version and then returns the same object until the next is published,
+    so repeated reads cost a few struct lookups.
+
+    Slots are allocated up front but the operating system only backs the pages written to, so a generous
+    slot_size costs little for small boards.
+    """
+
+    def __init__(self, codes: Sequence[str], slot_size: int = 1 << 20, name: str = None):
+        """
+        Creates a new store. Other processes open it with SharedStore.attach(store.name).
+
+        :param codes: The CRS or TIPLOC codes of the stations, one slot each
+        :param slot_size: The largest pickled result in bytes a slot can hold. Larger results are not published.
+        :param name: The name of the shared memory block. Defaults to a random name.
+        """
+        directory = json.dumps(list(codes)).encode('utf-8')
+        header = _PREFIX.size + len(directory)
+        header += -header % 8
+        size = header + len(codes) * (_SLOT.size + slot_size)
+
+        self.__block = shared_memory.SharedMemory(name, create=True, size=size)
+        _PREFIX.pack_into(self.__block.buf, 0, _MAGIC, slot_size, len(directory), _tracker())
+        self.__block.buf[_PREFIX.size:_PREFIX.size + len(directory)] = directory
+        self.__owner = True
+        self.__setup(list(codes), slot_size, header)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedStore':
+        """
+        Opens a store created by another process.
+
+        :param name: The store's name
+
+        :raises ValueError: If the block is not a SharedStore
+        """
+        block, tracked = _attach(name)
+        magic, slot_size, length, tracker = _PREFIX.unpack_from(block.buf, 0)
+        if magic != _MAGIC:
+            block.close()
+            raise ValueError("{} is not a SharedStore".format(name))
+
+        # A process sharing the creator's tracker, e.g. one started by multiprocessing, has only repeated the
+        # creator's registration, and unregistering would remove that too
+        if tracked and tracker != _tracker():
+            _untrack(block)
+
+        header = _PREFIX.size + length
+        header += -header % 8
+        store = cls.__new__(cls)
+        store.__block = block
+        store.__owner = False
+        store.__setup(json.loads(bytes(block.buf[_PREFIX.size:_PREFIX.size + length])), slot_size, header)
+        return store
+
+    def __setup(self, codes: List[str], slot_size: int, header: int):
+        self.codes = codes
+        self.slot_size = slot_size
+        self.__offsets: Dict[str, int] = {code: header + i * (_SLOT.size + slot_size) for i, code in enumerate(codes)}
+        self.__cache: Dict[str, Tuple[int, SearchResult]] = {}
+
+    @property
+    def name(self) -> str:
+        return self.__block.name
+
+    def publish(self, code: str, result: SearchResult) -> bool:
+        """
+        Stores the latest result for a station. Each slot must only be written by one process.
+
+        :param code: The station's code
+        :param result: The parsed result
+
+        :raises KeyError: If the code is not in the store
+
+        :return: False if the pickled result was larger than slot_size and so was not stored
+        """
+        return self.publish_raw(code, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def publish_raw(self, code: str, payload: bytes) -> bool:
+        """
+        As publish, for a result already pickled.
+        """
+        offset = self.__offsets[code]
+        buf = self.__block.buf
+        sequence = _SLOT.unpack_from(buf, offset)[0]
+        fits = len(payload) <= self.slot_size
+
+        struct.pack_into('<Q', buf, offset, sequence + 1)
+        if fits:
+            start = offset + _SLOT.size
+            buf[start:start + len(payload)] = payload
+        _SLOT.pack_into(buf, offset, sequence + 1, len(payload) if fits else _OVERFLOW,
+                        zlib.crc32(payload) if fits else 0, time.time())
+        struct.pack_into('<Q', buf, offset, sequence + 2)
+        return fits
+
+    def read_raw(self, code: str, retries: int = 1000) -> Tuple[int, float, bytes]:
+        """
+        Copies a station's latest pickled result out of the store.
+
+        The sequence number alone only detects a concurrent write where stores become visible to other cores in
+        the order they were made, as on x86-64. The copy is also checked against the CRC-32 written with it, so a
+        copy torn by a write seen out of order elsewhere, e.g. on ARM, is retried rather than returned.
+
+        :param code: The station's code
+        :param retries: The number of times to retry while the slot is being written
+
+        :raises KeyError: If the code is not in the store
+        :raises TimeoutError: If no consistent copy could be made in that many attempts
+
+        :return: The version (0 if nothing has been published yet), the time.time() it was published, and the
+                 pickled result, or None if nothing has been published or the last result did not fit
+        """
+        offset = self.__offsets[code]
+        buf = self.__block.buf
+        for attempt in range(retries):
+            sequence, length, crc, published = _SLOT.unpack_from(buf, offset)
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            if sequence == 0 or length == _OVERFLOW:
+                payload = None
+            elif length > self.slot_size:
+                continue
+            else:
+                start = offset + _SLOT.size
+                payload = bytes(buf[start:start + length])
+                if zlib.crc32(payload) != crc:
+                    time.sleep(0)
+                    continue
+            if struct.unpack_from('<Q', buf, offset)[0] == sequence:
+                return sequence // 2, published, payload
+        raise TimeoutError("No consistent copy of the slot for {} in {} attempts".format(code, retries))
+
+    def version(self, code: str) -> int:
+        """
+        :return: The number of results published for a station, a cheap way to see if it has changed
+        """
+        return struct.unpack_from('<Q', self.__block.buf, self.__offsets[code])[0] // 2
+
+    def get(self, code: str) -> SearchResult:
+        """
+        :param code: The station's code
+
+        :raises KeyError: If the code is not in the store
+
+        :return: The station's latest rttapi.model.SearchResult, or None if none has been published. The same
+                 object is returned until a new version is published, so treat it as read-only.
+        """
+        cached = self.__cache.get(code)
+        if cached is not None and cached[0] == self.version(code):
+            return cached[1]
+
+        version, _, payload = self.read_raw(code)
+        result = pickle.loads(payload) if payload is not None else None
+        self.__cache[code] = (version, result)
+        return result
+
+    def close(self):
+        """
+        Detaches from the store. The creator also frees it, after which no process can attach.
+        """
+        self.__cache.clear()
+        self.__block.close()
+        if self.__owner:
+            self.__block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _poll_shard(store_name: str, codes: List[str], credentials: Tuple[str, str], options: dict, stop):
+    """
+    Worker process: polls a shard of stations with its own RttApi and publishes every result to the store.
+    """
+    from rttapi.api import RttApi
+    from rttapi.scheduler import PollScheduler
+
+    store = SharedStore.attach(store_name)
+    api = RttApi(*credentials, base_url=options['base_url'])
+    scheduler = PollScheduler(api, options['budget'], options['min_interval'], options['max_interval'],
+                              options['kind'])
+
+    def publish(update):
+        # An unchanged board is left as it is, unless it is the first poll of the station
+        if update.error is None and (update.changes or store.version(update.code) == 0):
+            store.publish(update.code, update.result)
+
+    scheduler.add_listener(publish)
+    scheduler.watch(codes)
+    try:
+        scheduler.run(stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+        store.close()
+
+
+class ShardedPoller:
+    """
+    Polls many stations from several worker processes, so that parsing is spread across CPU cores rather than
+    limited by one process's GIL.
+
+    The stations are split into one shard per process. Each worker polls its shard with its own rttapi.api.RttApi
+    and rttapi.scheduler.PollScheduler, getting an equal share of the request budget, and publishes every result
+    to a SharedStore, which any process can read with SharedStore.attach(poller.store.name).
+    """
+
+    def __init__(self, username: str, password: str, codes: Sequence[str], processes: int = None,
+                 budget: float = 1.0, min_interval: float = 15.0, max_interval: float = 300.0,
+                 kind: str = 'departures', base_url: str = None, slot_size: int = 1 << 20, context=None):
+        """
+        Constructor for the ShardedPoller object.
+
+        :param username: The RealtimeTrains API username to authenticate with
+        :param password: The password matching the RealtimeTrains API username
+        :param codes: The CRS or TIPLOC codes of the stations to poll
+        :param processes: The number of worker processes. Defaults to the number of CPUs.
+        :param budget: The number of requests per second to spend across all workers
+        :param min_interval: See rttapi.scheduler.PollScheduler
+        :param max_interval: See rttapi.scheduler.PollScheduler
+        :param kind: Either 'departures' or 'arrivals'
+        :param base_url: Optional override of the API root URL, e.g. to point at a local stub server
+        :param slot_size: See rttapi.sharded.SharedStore
+        :param context: The multiprocessing context to start workers with. Defaults to the platform default.
+        """
+        codes = list(codes)
+        processes = min(processes or multiprocessing.cpu_count(), len(codes)) or 1
+
+        self.shards: List[List[str]] = [codes[i::processes] for i in range(processes)]
+        """ The codes polled by each worker """
+
+        self.store = SharedStore(codes, slot_size)
+        """ The rttapi.sharded.SharedStore results are published to """
+
+        self.__context = context or multiprocessing.get_context()
+        self.__credentials = (username, password)
+        self.__options = {
+            'base_url': base_url,
+            'budget': budget / processes,
+            'min_interval': min_interval,
+            'max_interval': max_interval,
+            'kind': kind,
+        }
+        self.__stop = self.__context.Event()
+        self.__workers: List[multiprocessing.Process] = [None] * processes
+
+    def start(self) -> 'ShardedPoller':
+        """
+        Starts the worker processes.
+        """
+        for i in range(len(self.shards)):
+            self.__start_worker(i)
+        return self
+
+    def restart_failed(self) -> int:
+        """
+        Restarts any worker process which has exited, e.g. after a crash.
+
+        :return: The number of workers restarted
+        """
+        restarted = 0
+        for i, worker in enumerate(self.__workers):
+            if worker is not None and not worker.is_alive() and not self.__stop.is_set():
+                worker.join()
+                self.__start_worker(i)
+                restarted += 1
+        return restarted
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Stops the workers and frees the store.
+
+        :param timeout: Seconds to wait for each worker to finish its current poll before terminating it
+        """
+        self.__stop.set()
+        for worker in self.__workers:
+            if worker is None:
+                continue
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self.store.close()
+
+    def __start_worker(self, index: int):
+        worker = self.__context.Process(
+            target=_poll_shard,
+            args=(self.store.name, self.shards[index], self.__credentials, self.__options, self.__stop),
+            name='rttapi-shard-{}'.format(index),
+            daemon=True,
+        )
+        worker.start()
+        self.__workers[index] = worker
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class IdentityTable:
+    """
+    Remembers the objects built from each service and location, so that parsing the same data again returns the
+    very same objects instead of new ones.
+
+    Each entry is found by the identity of what it describes, e.g. (service_uid, run_date), and reused only if the
+    raw JSON it was built from is equal to the new JSON. Most services on a board are unchanged from one poll to
+    the next, so sharing them saves building and later collecting thousands of objects per poll, and callers can
+    tell what changed with an `is` check.
+
+    Shared objects must be treated as read-only, since a change made through one result shows in every other.
+    The table keeps the decoded JSON of each entry to compare against, roughly doubling the memory held per
+    entry. Thread-safe. Entries are evicted least recently used once max_entries is exceeded.
+
+    Pass one to rttapi.api.RttApi(identity_table=...), or to rttapi.parser.parse_search and parse_service.
+    """
+
+    def __init__(self, max_entries: int = 65536):
+        """
+        Constructor for the IdentityTable object.
+
+        :param max_entries: The maximum number of objects to remember. A board of n services uses n entries,
+                            a service of n locations n + 1.
+        """
+        self.max_entries = max_entries
+
+        self.hits = 0
+        """ Number of objects reused """
+
+        self.misses = 0
+        """ Number of objects built because they were new or had changed """
+
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+
+    def share(self, key: Hashable, fingerprint, build: Callable, *args):
+        """
+        Returns the object previously built for key if its fingerprint is unchanged, otherwise builds a new one.
+
+        :param key: Identifies what the object describes
+        :param fingerprint: The data the object is built from, compared with == against the remembered data
+        :param build: Builds the object, called with args
+        :param args: The arguments to build
+
+        :return: The shared or newly built object
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+
+        # Compared outside the lock: a deep comparison of a large service should not hold up other threads
+        if entry is not None and (entry[0] is fingerprint or entry[0] == fingerprint):
+            with self.__lock:
+                self.hits += 1
+            return entry[1]
+
+        out = build(*args)
+        with self.__lock:
+            self.misses += 1
+            self.__entries[key] = (fingerprint, out)
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+        return out
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
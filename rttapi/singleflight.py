@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls made from multiple threads into one.
+
+    While a call for a given key is in progress, any other thread calling do() with the same key waits for it
+    and receives the same result (or exception) instead of repeating the work.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.calls = 0
+        """ Number of calls made via do() """
+
+        self.coalesced = 0
+        """ Number of calls that were answered by another in-flight call """
+
+    def do(self, key, func: Callable):
+        """
+        Calls func, unless a call with the same key is already in flight, in which case its result is shared.
+
+        :param key: Identifies the work, e.g. the request URL
+        :param func: Performs the work. Called with no arguments.
+
+        :return: The return value of func
+        """
+        with self.__lock:
+            self.calls += 1
+            call = self.__calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self.__calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.done.set()
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart to rttapi.singleflight.SingleFlight, collapsing concurrent identical coroutine calls
+    within one event loop into one.
+
+    The work runs in a task owned by the flight rather than by the first caller, so cancelling any one caller
+    only stops that caller waiting. The work itself is cancelled once every caller waiting for it is cancelled.
+    """
+
+    def __init__(self):
+        self.__calls = {}
+        self.calls = 0
+        """ Number of calls made via do() """
+
+        self.coalesced = 0
+        """ Number of calls that were answered by another in-flight call """
+
+    async def do(self, key, func: Callable[[], Awaitable]):
+        """
+        Awaits func(), unless a call with the same key is already in flight, in which case its result is shared.
+
+        :param key: Identifies the work, e.g. the request URL
+        :param func: Returns an awaitable performing the work. Called with no arguments.
+
+        :return: The result of awaiting func()
+        """
+        self.calls += 1
+        call = self.__calls.get(key)
+        if call is not None and not call.task.done():
+            self.coalesced += 1
+        else:
+            call = self.__calls[key] = _AsyncCall(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda task: self.__finished(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller has been cancelled, so nobody wants the result
+                call.task.cancel()
+
+    def __finished(self, key, call: _AsyncCall):
+        if self.__calls.get(key) is call:
+            del self.__calls[key]
+        # Mark the outcome as retrieved in case every caller was cancelled before it arrived
+        if not call.task.cancelled():
+            call.task.exception()
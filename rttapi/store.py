@@ -0,0 +1,229 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class ServiceStore:
+    """
+    Persistent on-disk store of raw service JSON, keyed by (service_uid, run_date).
+
+    Each response is saved gzip-compressed in its own file, named after its key, so lookups open the file
+    directly. Files are replaced atomically, so any number of processes may read from the same directory while
+    another writes to it.
+
+    Writers also append a line to an index log recording each file saved or removed. This keeps track of the
+    total compressed size and of which entries are oldest, without listing the directory. Each instance reads
+    only the lines appended since it last looked. Once most of the log describes entries which have since been
+    replaced or removed, it is compacted into a new file. Writers on POSIX systems serialise updates to the log
+    with a lock file.
+
+    Once the total compressed size exceeds max_bytes, the oldest entries are removed first.
+
+    Only services that can no longer change should be stored, see rttapi.cache.is_historic.
+    """
+
+    __LOG = 'index.log'
+    __LOCK = 'index.lock'
+    __COMPACT_MIN_LINES = 1024
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, compress_level: int = 6):
+        """
+        Constructor for the ServiceStore object.
+
+        :param directory: The directory to store files in. Created if it does not exist.
+        :param max_bytes: The maximum total size of the compressed files
+        :param compress_level: gzip compression level, from 1 (fastest) to 9 (smallest)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__reset(None)
+
+    def get(self, service_uid: str, run_date: datetime.date) -> bytes:
+        """
+        Looks up the raw JSON for a service.
+
+        :param service_uid: The unique ID of the service
+        :param run_date: The running date of the service
+
+        :return: The raw JSON body as bytes, or None if it is not stored
+        """
+        try:
+            with gzip.open(os.path.join(self.directory, self.__filename(service_uid, run_date)), 'rb') as f:
+                return f.read()
+        except (OSError, EOFError):
+            # Never stored, or evicted by another process
+            return None
+
+    def put(self, service_uid: str, run_date: datetime.date, raw: bytes):
+        """
+        Saves the raw JSON for a service, evicting the oldest entries if the store is over max_bytes.
+
+        :param service_uid: The unique ID of the service
+        :param run_date: The running date of the service
+        :param raw: The raw JSON body
+        """
+        key = self.__key(service_uid, run_date)
+        data = gzip.compress(raw, self.compress_level)
+
+        with self.__lock, self.__log_lock():
+            # Written under the lock, so another process evicting an older copy cannot remove this one
+            size = self.__write_atomic(self.__filename(service_uid, run_date), data)
+            self.__refresh()
+            records = [['put', key, size]]
+            self.__apply(records[0])
+
+            # Entries are kept in the order they were saved, so the oldest are at the front
+            evicted = []
+            while self.__total > self.max_bytes and len(self.__entries) > 1:
+                old_key = next(iter(self.__entries))
+                records.append(['del', old_key])
+                self.__apply(records[-1])
+                evicted.append(old_key)
+
+            self.__append(records)
+            for old_key in evicted:
+                self.__remove_file(old_key.replace('/', '_') + '.json.gz')
+
+            if self.__lines > max(self.__COMPACT_MIN_LINES, 2 * len(self.__entries)):
+                self.__compact()
+
+    def __contains__(self, item: tuple) -> bool:
+        service_uid, run_date = item
+        return os.path.exists(os.path.join(self.directory, self.__filename(service_uid, run_date)))
+
+    def __len__(self):
+        with self.__lock:
+            self.__refresh()
+            return len(self.__entries)
+
+    @staticmethod
+    def __key(service_uid: str, run_date: datetime.date) -> str:
+        return '{}/{}'.format(service_uid, run_date.isoformat())
+
+    @classmethod
+    def __filename(cls, service_uid: str, run_date: datetime.date) -> str:
+        return cls.__key(service_uid, run_date).replace('/', '_') + '.json.gz'
+
+    def __reset(self, inode):
+        self.__entries = OrderedDict()
+        self.__total = 0
+        self.__lines = 0
+        self.__offset = 0
+        self.__inode = inode
+
+    def __apply(self, record: list):
+        """
+        Updates the in-memory view of the index with one line of the log.
+        """
+        old = self.__entries.pop(record[1], None)
+        if old is not None:
+            self.__total -= old
+        if record[0] == 'put':
+            self.__entries[record[1]] = record[2]
+            self.__total += record[2]
+        self.__lines += 1
+
+    def __refresh(self):
+        """
+        Reads any lines appended to the log since it was last read, or the whole log if it has been compacted.
+        """
+        path = os.path.join(self.directory, self.__LOG)
+        try:
+            with open(path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if inode != self.__inode:
+                    # Compacted into a new file since it was last read
+                    self.__reset(inode)
+                f.seek(self.__offset)
+                data = f.read()
+        except FileNotFoundError:
+            self.__reset(None)
+            return
+
+        # A line still being appended by another process is left for the next refresh
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                self.__apply(json.loads(line))
+            except (ValueError, IndexError, TypeError):
+                pass
+        self.__offset += end
+
+    def __append(self, records: list):
+        data = b''.join(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n' for record in records)
+        fd = os.open(os.path.join(self.directory, self.__LOG), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            inode = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+        if inode != self.__inode:
+            # The log was just created, so this process has read everything in it
+            self.__inode = inode
+        self.__offset += len(data)
+
+    def __compact(self):
+        """
+        Replaces the log with one line per current entry, oldest first.
+        """
+        data = b''.join(json.dumps(['put', key, size], separators=(',', ':')).encode('utf-8') + b'\n'
+                        for key, size in self.__entries.items())
+        self.__write_atomic(self.__LOG, data)
+        self.__inode = os.stat(os.path.join(self.directory, self.__LOG)).st_ino
+        self.__offset = len(data)
+        self.__lines = len(self.__entries)
+
+    def __write_atomic(self, filename: str, data: bytes) -> int:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self.directory, filename))
+        except BaseException:
+            self.__remove_file(tmp)
+            raise
+        return len(data)
+
+    def __remove_file(self, filename: str):
+        try:
+            os.remove(os.path.join(self.directory, filename))
+        except FileNotFoundError:
+            pass
+
+    def __log_lock(self):
+        return _FileLock(os.path.join(self.directory, self.__LOCK))
+
+
+class _FileLock:
+    """
+    Exclusive advisory lock on a file, held for the duration of a with block. A no-op where fcntl is unavailable.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.__file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.__file = open(self.path, 'a')
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.__file is not None:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+            self.__file.close()
+            self.__file = None
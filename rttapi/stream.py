@@ -0,0 +1,134 @@
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = ' \t\r\n'
+_NUMBER = '0123456789+-.eE'
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """
+    A growing text buffer over an iterable of byte chunks, from which JSON values are decoded one at a time.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder(encoding)()
+        self.__eof = False
+        self.buf = ''
+        self.pos = 0
+
+    def fill(self) -> bool:
+        """
+        Appends the next chunk to the buffer, discarding what has already been consumed.
+
+        :return: False if the input is exhausted
+        """
+        while not self.__eof:
+            chunk = next(self.__chunks, None)
+            if chunk is None:
+                self.__eof = True
+                text = self.__decoder.decode(b'', final=True)
+            else:
+                text = self.__decoder.decode(chunk)
+
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+
+        :raises ValueError: If the input ends first
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str):
+        """
+        Consumes the next non-whitespace character, which must be char.
+
+        :raises ValueError: If a different character is found
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError("Expected '{}' at offset {} but found '{}'".format(char, self.pos, found))
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes the next complete JSON value, reading more input as needed.
+
+        :raises ValueError: If the value is malformed or the input ends first
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise ValueError("Malformed or truncated JSON document")
+
+            # A number followed by nothing but a partial fraction or exponent, e.g. "5." or "5e", may continue in
+            # the next chunk
+            if isinstance(value, (int, float)) and not self.buf[end:].strip(_NUMBER) and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str, encoding: str = 'utf-8') -> Iterator:
+    """
+    Incrementally parses a JSON document of the form {..., "key": [item, item, ...], ...}, yielding each item of
+    the array as soon as it has been read in full.
+
+    Only the array's items, plus whichever single value is being decoded, are ever held in memory. Reading stops
+    at the end of the array, so the caller may stop early and discard the rest of the response.
+
+    :param chunks: The raw response body, as an iterable of byte chunks
+    :param key: The top-level key holding the array
+    :param encoding: The text encoding of the body
+
+    :raises ValueError: If the document is malformed
+
+    :return: A generator of decoded items. Yields nothing if key is absent or null.
+    """
+    reader = _Reader(chunks, encoding)
+    reader.expect('{')
+
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+
+        if name != key:
+            reader.value()
+        elif reader.peek() == 'n':
+            reader.value()
+            return
+        else:
+            reader.expect('[')
+            if reader.peek() == ']':
+                return
+            while True:
+                yield reader.value()
+                if reader.peek() == ']':
+                    return
+                reader.expect(',')
+
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
@@ -0,0 +1,139 @@
+from typing import Optional
+
+SECONDS_PER_DAY = 86400
+
+ROLLOVER_TOLERANCE = 6 * 3600
+"""
+How far a time may fall before the start of its service and still be taken to be on the same day, in seconds.
+Allows for early running and for stops timed shortly before the origin's working time.
+"""
+
+
+def time_to_seconds(value: str) -> Optional[int]:
+    """
+    Converts an API time string into seconds since midnight.
+
+    :param value: A time in format HHmm (e.g. 1503) or HHmmss (e.g. 150330)
+
+    :return: The number of seconds since midnight, or None if value is not a valid time
+    """
+    seconds = _KNOWN_TIMES.get(value)
+    if seconds is None:
+        seconds = _parse_time(value)
+    return seconds
+
+
+def _parse_time(value: str) -> Optional[int]:
+    try:
+        if len(value) == 4:
+            return int(value[:2]) * 3600 + int(value[2:]) * 60
+        if len(value) == 6:
+            return int(value[:2]) * 3600 + int(value[2:4]) * 60 + int(value[4:])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+# Every HHmm time, and every HHmmss time on the whole or half minute as used in working timetables
+_KNOWN_TIMES = {}
+for _minute in range(24 * 60):
+    _hhmm = '{:02d}{:02d}'.format(*divmod(_minute, 60))
+    _KNOWN_TIMES[_hhmm] = _minute * 60
+    _KNOWN_TIMES[_hhmm + '00'] = _minute * 60
+    _KNOWN_TIMES[_hhmm + '30'] = _minute * 60 + 30
+del _minute, _hhmm
+
+
+def rollover(seconds: Optional[int], reference: Optional[int]) -> Optional[int]:
+    """
+    Places a time of day on the correct day of a service which may run past midnight.
+
+    :param seconds: Seconds since midnight, as returned by time_to_seconds
+    :param reference: Seconds since midnight at which the service starts, on its run_date
+
+    :return: Seconds since the start of the service's run_date, i.e. seconds + 86400 if the time belongs to the
+             following day. None if seconds is None.
+    """
+    if seconds is None or reference is None:
+        return seconds
+    if seconds < reference - ROLLOVER_TOLERANCE:
+        return seconds + SECONDS_PER_DAY
+    return seconds
+
+
+def seconds_to_time(seconds: int, with_seconds: bool = False) -> str:
+    """
+    Converts seconds since the start of a service day back into an API time string.
+
+    :param seconds: Seconds since the start of the run_date. Values past midnight wrap around.
+    :param with_seconds: If True, returns HHmmss rather than HHmm
+
+    :return: The time as a string
+    """
+    seconds %= SECONDS_PER_DAY
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if with_seconds:
+        return '{:02d}{:02d}{:02d}'.format(hours, minutes, secs)
+    return '{:02d}{:02d}'.format(hours, minutes)
+
+
+def delay_seconds(booked: Optional[int], actual: Optional[int]) -> Optional[int]:
+    """
+    :param booked: The booked time, in seconds since the start of the run_date
+    :param actual: The realtime (expected or actual) time, in seconds since the start of the run_date
+
+    :return: How late actual is against booked in seconds, negative if early. None if either time is unknown.
+    """
+    if booked is None or actual is None:
+        return None
+    return actual - booked
+
+
+def compare_times(a: Optional[int], b: Optional[int]) -> int:
+    """
+    Three-way comparison of two times, with unknown times ordered after all known ones.
+
+    :return: A negative number if a is earlier than b, 0 if they are equal and a positive number if a is later
+    """
+    if a is None or b is None:
+        return (a is None) - (b is None)
+    return a - b
+
+
+def departure_seconds(location) -> Optional[int]:
+    """
+    :param location: A rttapi.model.Location
+
+    :return: The best known departure time of a location: realtime, then public, then working, then the pass time.
+             None if the location has no departure.
+    """
+    for value in (location.realtime_departure_seconds, location.gbtt_booked_departure_seconds,
+                  location.wtt_booked_departure_seconds, location.wtt_booked_pass_seconds):
+        if value is not None:
+            return value
+    return None
+
+
+def arrival_seconds(location) -> Optional[int]:
+    """
+    :param location: A rttapi.model.Location
+
+    :return: The best known arrival time of a location: realtime, then public, then working, then the pass time.
+             None if the location has no arrival.
+    """
+    for value in (location.realtime_arrival_seconds, location.gbtt_booked_arrival_seconds,
+                  location.wtt_booked_arrival_seconds, location.wtt_booked_pass_seconds):
+        if value is not None:
+            return value
+    return None
+
+
+def departure_sort_key(location) -> tuple:
+    """
+    A key for sorted() ordering locations by departure time, with locations without one last.
+
+    :param location: A rttapi.model.Location
+    """
+    seconds = departure_seconds(location)
+    return (seconds is None, seconds or 0)
@@ -0,0 +1,157 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport:
+    """
+    Base class for the HTTP transport used by the internal API.
+
+    A transport is responsible for performing a single GET request and returning the raw response.
+    Subclass this to swap in a different HTTP stack (e.g. a stub for benchmarking or testing).
+    """
+
+    def get(self, url: str, auth: tuple, headers: dict = None) -> requests.Response:
+        """
+        Performs a GET request against the given URL.
+
+        :param url: The URL to call
+        :param auth: A username/password pair used for the HTTPBasicAuth challenge
+        :param headers: Optional extra request headers
+
+        :return: The requests.Response for this call
+        """
+        raise NotImplementedError
+
+    def stream(self, url: str, auth: tuple, headers: dict = None) -> requests.Response:
+        """
+        Performs a GET request against the given URL without reading the body up front,
+        so that it can be consumed incrementally via response.iter_content().
+
+        The default implementation falls back to get(), reading the whole body.
+
+        :param url: The URL to call
+        :param auth: A username/password pair used for the HTTPBasicAuth challenge
+        :param headers: Optional extra request headers
+
+        :return: The requests.Response for this call
+        """
+        return self.get(url, auth, headers)
+
+    def close(self):
+        """
+        Releases any resources (e.g. pooled connections) held by this transport.
+        """
+        pass
+
+
+class PooledTransport(Transport):
+    """
+    Transport backed by a shared requests.Session, reusing keep-alive connections between calls
+    so that subsequent requests to api.rtt.io skip the TCP and TLS handshake.
+
+    The underlying urllib3 connection pool is thread-safe, so one instance may be shared across threads.
+    """
+
+    def __init__(self,
+                 pool_connections: int = 4,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 keep_alive: bool = True,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0):
+        """
+        Constructor for the PooledTransport object.
+
+        :param pool_connections: The number of per-host connection pools to keep
+        :param pool_maxsize: The maximum number of connections kept open to a single host
+        :param pool_block: If True, callers wait for a free connection once pool_maxsize is reached
+                           instead of opening (and then discarding) a new one
+        :param keep_alive: Whether to keep connections open between requests
+        :param connect_timeout: Seconds to wait for a connection to be established
+        :param read_timeout: Seconds to wait between bytes received from the server
+        """
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.__adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+
+        self.__session = requests.Session()
+        self.__session.mount('https://', self.__adapter)
+        self.__session.mount('http://', self.__adapter)
+
+        if not keep_alive:
+            self.__session.headers['Connection'] = 'close'
+
+    def get(self, url: str, auth: tuple, headers: dict = None) -> requests.Response:
+        """
+        Performs a GET request against the given URL using a pooled connection.
+
+        :param url: The URL to call
+        :param auth: A username/password pair used for the HTTPBasicAuth challenge
+        :param headers: Optional extra request headers
+
+        :return: The requests.Response for this call
+        """
+        return self.__session.get(url, auth=auth, headers=headers, timeout=self.timeout)
+
+    def stream(self, url: str, auth: tuple, headers: dict = None) -> requests.Response:
+        """
+        Performs a GET request using a pooled connection, leaving the body unread.
+        The connection returns to the pool once the body is exhausted or the response is closed.
+
+        :param url: The URL to call
+        :param auth: A username/password pair used for the HTTPBasicAuth challenge
+        :param headers: Optional extra request headers
+
+        :return: The requests.Response for this call
+        """
+        return self.__session.get(url, auth=auth, headers=headers, timeout=self.timeout, stream=True)
+
+    def close(self):
+        """
+        Closes all pooled connections.
+        """
+        self.__session.close()
+
+
+class SimpleTransport(Transport):
+    """
+    Transport that opens a new connection for every request, matching the library's original behaviour.
+    Mainly useful as a baseline when benchmarking PooledTransport.
+    """
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0):
+        """
+        Constructor for the SimpleTransport object.
+
+        :param connect_timeout: Seconds to wait for a connection to be established
+        :param read_timeout: Seconds to wait between bytes received from the server
+        """
+        self.timeout = (connect_timeout, read_timeout)
+
+    def get(self, url: str, auth: tuple, headers: dict = None) -> requests.Response:
+        """
+        Performs a GET request against the given URL on a fresh connection.
+
+        :param url: The URL to call
+        :param auth: A username/password pair used for the HTTPBasicAuth challenge
+        :param headers: Optional extra request headers
+
+        :return: The requests.Response for this call
+        """
+        return requests.get(url, auth=auth, headers=headers, timeout=self.timeout)
+
+    def stream(self, url: str, auth: tuple, headers: dict = None) -> requests.Response:
+        """
+        Performs a GET request against the given URL on a fresh connection, leaving the body unread.
+
+        :param url: The URL to call
+        :param auth: A username/password pair used for the HTTPBasicAuth challenge
+        :param headers: Optional extra request headers
+
+        :return: The requests.Response for this call
+        """
+        return requests.get(url, auth=auth, headers=headers, timeout=self.timeout, stream=True)
@@ -9,12 +9,18 @@ README = (HERE / "README.md").read_text()
 
 setup(
     name='rttapi',
-    packages=find_packages(),
+    packages=find_packages(exclude=('benchmarks', 'benchmarks.*')),
     version='0.1.0',
     description='Python wrapper for the Realtime Trains API',
     long_description=README,
     long_description_content_type="text/markdown",
     author='Michael Dodd',
     license='MIT',
+    install_requires=['requests'],
+    extras_require={
+        'async': ['aiohttp'],
+        'fast': ['orjson'],
+        'columns': ['numpy'],
+    },
     test_suite='test'
 )
\ No newline at end of file
@@ -0,0 +1,69 @@
+import json as _json
+
+from rttapi.transport import Transport
+
+
+def search_json(crs='CLJ'):
+    return {
+        'location': {'name': 'Clapham Junction', 'crs': crs, 'tiploc': 'CLPHMJC'},
+        'filter': None,
+        'services': []
+    }
+
+
+class FakeResponse:
+    def __init__(self, json, status_code=200, reason='OK', headers=None):
+        self._json = json
+        self.status_code = status_code
+        self.reason = reason
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.content = _json.dumps(json).encode('utf-8') if status_code != 304 else b''
+
+    def json(self):
+        return self._json
+
+    def iter_content(self, chunk_size=1):
+        return (self.content[i:i + chunk_size] for i in range(0, len(self.content), chunk_size))
+
+    def close(self):
+        pass
+
+
+class FakeTransport(Transport):
+    def __init__(self, json=None, status_code=200):
+        self.json = json if json is not None else search_json()
+        self.status_code = status_code
+        self.calls = []
+
+    def get(self, url, auth, headers=None):
+        self.calls.append((url, auth))
+        return FakeResponse(self.json, self.status_code)
+
+
+class ETagTransport(Transport):
+    """ Answers 304 when the client's If-None-Match matches the current ETag """
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.json = search_json()
+        self.headers = []
+
+    def get(self, url, auth, headers=None):
+        self.headers.append(headers)
+        if headers and headers.get('If-None-Match') == self.etag:
+            return FakeResponse(None, 304, 'Not Modified')
+        return FakeResponse(self.json, headers={'ETag': self.etag})
+
+
+class Clock:
+    """ A clock that only moves when told to, or when slept on """
+    def __init__(self, now=100.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
@@ -0,0 +1,141 @@
+import unittest
+
+import rttapi.parser as parser
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from rttapi.analytics import punctuality
+    from rttapi.columns import service_columns
+
+
+def _location(crs, booked, realtime=None, actual=False, display_as='CALL', cancel_reason=None):
+    out = {'tiploc': crs + 'TIP', 'crs': crs, 'gbttBookedArrival': booked, 'realtimeArrivalActual': actual,
+           'displayAs': display_as}
+    if realtime is not None:
+        out['realtimeArrival'] = realtime
+    if cancel_reason is not None:
+        out['cancelReasonCode'] = cancel_reason
+    return out
+
+
+def _service(uid, atoc_code, locations):
+    return parser.parse_service({
+        'serviceUid': uid,
+        'runDate': '2021-03-27',
+        'serviceType': 'train',
+        'isPassenger': True,
+        'trainIdentity': '1A23',
+        'atocCode': atoc_code,
+        'atocName': atoc_code,
+        'origin': [{'tiploc': 'WATTIP', 'description': 'London Waterloo', 'workingTime': '080000',
+                    'publicTime': '0800'}],
+        'locations': locations
+    })
+
+
+def _services():
+    return [
+        _service('W00001', 'SW', [
+            _location('CLJ', '0810', '0810', actual=True),
+            _location('WOK', '0840', '0846', actual=True),
+            _location('SOU', '0930', '0942'),
+        ]),
+        _service('W00002', 'SW', [
+            _location('CLJ', '0910', '0913', actual=True),
+            _location('WOK', '0940', display_as='CANCELLED_CALL', cancel_reason='TG'),
+            _location('SOU', '1030', display_as='CANCELLED_CALL'),
+        ]),
+        _service('W00003', 'SN', [
+            _location('CLJ', '0815', '0814', actual=True),
+            _location('VIC', '0825'),
+        ]),
+    ]
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class PunctualityTest(unittest.TestCase):
+
+    def test_by_operator(self):
+        actual = punctuality(_services(), by='atoc_code')
+
+        self.assertEqual(['SW', 'SN'], actual['atoc_code'].tolist())
+        self.assertEqual([6, 2], actual['count'].tolist())
+        self.assertEqual([2, 0], actual['cancelled'].tolist())
+        self.assertEqual([4, 1], actual['observed'].tolist())
+        self.assertEqual([2 / 6, 0], actual['cancellation_rate'].tolist())
+        self.assertEqual([(0 + 6 + 12 + 3) / 4, -1], actual['mean_delay'].tolist())
+        self.assertEqual([0.25, 1], actual['within_0'].tolist())
+        self.assertEqual([0.5, 1], actual['within_5'].tolist())
+        self.assertEqual([numpy.percentile([0, 6, 12, 3], 50), -1], actual['p50_delay'].tolist())
+        self.assertEqual([numpy.percentile([0, 6, 12, 3], 90), -1], actual['p90_delay'].tolist())
+
+    def test_by_station_and_hour(self):
+        actual = punctuality(_services(), by=('crs', 'hour'))
+
+        rows = list(zip(actual['crs'].tolist(), actual['hour'].tolist(), actual['count'].tolist()))
+        self.assertEqual([('CLJ', 8, 2), ('CLJ', 9, 1), ('WOK', 8, 1), ('WOK', 9, 1), ('SOU', 9, 1), ('SOU', 10, 1),
+                          ('VIC', 8, 1)], rows)
+
+    def test_no_observed_calls_is_nan(self):
+        actual = punctuality(_services(), by='crs')
+
+        index = actual['crs'].tolist().index('VIC')
+        self.assertEqual(0, actual['observed'][index])
+        self.assertTrue(numpy.isnan(actual['mean_delay'][index]))
+        self.assertTrue(numpy.isnan(actual['p50_delay'][index]))
+
+    def test_actual_only(self):
+        actual = punctuality(_services(), by='atoc_code', actual_only=True)
+
+        self.assertEqual([3, 1], actual['observed'].tolist())
+        self.assertEqual([3, -1], actual['mean_delay'].tolist())
+
+    def test_destination_only(self):
+        actual = punctuality(_services(), by='atoc_code', destination_only=True)
+
+        self.assertEqual([2, 1], actual['count'].tolist())
+        self.assertEqual([1, 0], actual['observed'].tolist())
+
+    def test_accepts_columns(self):
+        services = _services()
+
+        self.assertEqual(punctuality(services)['count'].tolist(),
+                         punctuality(service_columns(services))['count'].tolist())
+
+    def test_percentiles_match_numpy(self):
+        rng = numpy.random.default_rng(1)
+        services = []
+        for i in range(40):
+            delays = rng.integers(-2, 30, size=5)
+            services.append(_service('W{:05d}'.format(i), 'SW' if i % 3 else 'SN', [
+                _location('CLJ', '1000', '10{:02d}'.format(delay)) if delay >= 0 else
+                _location('CLJ', '1000', '095{}'.format(10 + delay))
+                for delay in delays
+            ]))
+        columns = service_columns(services)
+        delay = (columns['realtime_arrival_seconds'] - columns['gbtt_booked_arrival_seconds']) / 60.0
+        operators = columns['atoc_code'].values()
+
+        actual = punctuality(columns, by='atoc_code', percentiles=(25, 50, 99.5))
+
+        for i, operator in enumerate(actual['atoc_code']):
+            expected = numpy.percentile(delay[operators == operator], [25, 50, 99.5])
+            self.assertEqual(expected.tolist(), [actual['p25_delay'][i], actual['p50_delay'][i],
+                                                 actual['p99_5_delay'][i]])
+
+    def test_unknown_group_fails(self):
+        with self.assertRaises(ValueError):
+            punctuality(_services(), by='platform')
+
+    def test_empty(self):
+        actual = punctuality([], by='crs')
+
+        self.assertEqual(0, len(actual['count']))
+
+
+if __name__ == '__main__':
+    unittest.main()
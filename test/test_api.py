@@ -0,0 +1,356 @@
+import datetime
+import json as _json
+import tempfile
+import unittest
+
+import requests
+
+from rttapi.api import RttApi
+from rttapi.cache import ResponseCache
+from rttapi.conditional import ValidatorCache
+from rttapi.ratelimit import RateLimiter
+from rttapi.store import ServiceStore
+from rttapi.transport import Transport
+from test.fakes import ETagTransport, FakeResponse, FakeTransport, search_json
+
+
+class ApiTest(unittest.TestCase):
+
+    def test_search_routes_through_transport(self):
+        transport = FakeTransport()
+        api = RttApi('user', 'pass', transport=transport)
+
+        actual = api.search_station_departures('CLJ')
+
+        self.assertEqual('CLJ', actual.location.crs)
+        self.assertEqual(1, len(transport.calls))
+        self.assertEqual('https://api.rtt.io/api/v1/json/search/CLJ', transport.calls[0][0])
+        self.assertEqual(('user', 'pass'), transport.calls[0][1])
+
+    def test_base_url_override(self):
+        transport = FakeTransport()
+        api = RttApi('user', 'pass', transport=transport, base_url='http://127.0.0.1:8080/api/v1/')
+
+        api.search_station_departures('CLJ')
+
+        self.assertEqual('http://127.0.0.1:8080/api/v1/json/search/CLJ', transport.calls[0][0])
+
+    def test_service_url(self):
+        transport = FakeTransport({
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        })
+        api = RttApi('user', 'pass', transport=transport)
+
+        actual = api.fetch_service_info_datetime('W12345', datetime.date(2021, 3, 27))
+
+        self.assertEqual('W12345', actual.service_uid)
+        self.assertEqual('https://api.rtt.io/api/v1/json/service/W12345/2021/03/27', transport.calls[0][0])
+
+    def test_custom_decoder(self):
+        decoded = []
+
+        def decoder(raw):
+            decoded.append(raw)
+            return _json.loads(raw)
+
+        api = RttApi('user', 'pass', transport=FakeTransport(), decoder=decoder)
+
+        api.search_station_departures('CLJ')
+
+        self.assertEqual(1, len(decoded))
+        self.assertIsInstance(decoded[0], bytes)
+
+    def test_failed_request_raises(self):
+        api = RttApi('user', 'pass', transport=FakeTransport(status_code=500))
+
+        with self.assertRaises(requests.HTTPError):
+            api.search_station_departures('CLJ')
+
+    def test_arrivals_url(self):
+        transport = FakeTransport()
+        api = RttApi('user', 'pass', transport=transport)
+
+        api.search_station_arrivals('CLJ')
+
+        self.assertEqual('https://api.rtt.io/api/v1/json/search/CLJ/arrivals', transport.calls[0][0])
+
+
+class _UrlTransport(Transport):
+    """ Answers each request from a dict of url suffix -> (status, json) """
+    def __init__(self, routes):
+        self.routes = routes
+
+    def get(self, url, auth, headers=None):
+        for suffix, (status, json) in self.routes.items():
+            if url.endswith(suffix):
+                return FakeResponse(json, status)
+        return FakeResponse({}, 404, 'Not Found')
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_search_many_reports_errors_per_item(self):
+        api = RttApi('user', 'pass', transport=_UrlTransport({
+            '/search/CLJ': (200, search_json('CLJ')),
+            '/search/WAT': (200, search_json('WAT')),
+            '/search/XXX': (500, {})
+        }))
+
+        results = {r.key: r for r in api.search_many(['CLJ', 'WAT', 'XXX'], max_workers=2)}
+
+        self.assertEqual({'CLJ', 'WAT', 'XXX'}, set(results))
+        self.assertTrue(results['CLJ'].ok)
+        self.assertEqual('WAT', results['WAT'].result.location.crs)
+        self.assertFalse(results['XXX'].ok)
+        self.assertIsInstance(results['XXX'].error, requests.HTTPError)
+
+    def test_search_many_arrivals(self):
+        api = RttApi('user', 'pass', transport=_UrlTransport({
+            '/search/CLJ/arrivals': (200, search_json('CLJ'))
+        }))
+
+        results = list(api.search_many(['CLJ'], kind='arrivals'))
+
+        self.assertTrue(results[0].ok)
+
+    def test_search_many_rejects_unknown_kind(self):
+        api = RttApi('user', 'pass', transport=FakeTransport())
+
+        with self.assertRaises(ValueError):
+            api.search_many(['CLJ'], kind='passes')
+
+    def test_fetch_services(self):
+        service = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        }
+        api = RttApi('user', 'pass', transport=_UrlTransport({
+            '/service/W12345/2021/03/27': (200, service)
+        }))
+        keys = [('W12345', datetime.date(2021, 3, 27)), ('W99999', datetime.date(2021, 3, 27))]
+
+        results = {r.key: r for r in api.fetch_services(keys)}
+
+        self.assertEqual('1A23', results[keys[0]].result.train_identity)
+        self.assertFalse(results[keys[1]].ok)
+
+
+class CacheTest(unittest.TestCase):
+
+    def test_repeated_search_is_cached(self):
+        transport = FakeTransport()
+        cache = ResponseCache()
+        api = RttApi('user', 'pass', transport=transport, cache=cache)
+
+        api.search_station_departures('CLJ')
+        api.search_station_departures('CLJ')
+        api.search_station_arrivals('CLJ')
+
+        self.assertEqual(2, len(transport.calls))
+        self.assertEqual(1, cache.stats().hits)
+        self.assertEqual(2, cache.stats().misses)
+
+    def test_historic_service_is_kept(self):
+        transport = FakeTransport({
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        })
+        cache = ResponseCache(service_ttl=0)
+        api = RttApi('user', 'pass', transport=transport, cache=cache)
+
+        api.fetch_service_info_ymd('W12345', '2021', '03', '27')
+        api.fetch_service_info_ymd('W12345', '2021', '03', '27')
+
+        self.assertEqual(1, len(transport.calls))
+
+
+class StoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_historic_service_is_read_from_store(self):
+        first = FakeTransport(self.service)
+        RttApi('user', 'pass', transport=first, store=ServiceStore(self.tmp.name)) \
+            .fetch_service_info_ymd('W12345', '2021', '03', '27')
+
+        second = FakeTransport(self.service)
+        actual = RttApi('user', 'pass', transport=second, store=ServiceStore(self.tmp.name)) \
+            .fetch_service_info_ymd('W12345', '2021', '03', '27')
+
+        self.assertEqual(1, len(first.calls))
+        self.assertEqual(0, len(second.calls))
+        self.assertEqual('1A23', actual.train_identity)
+
+    def test_current_service_is_not_stored(self):
+        store = ServiceStore(self.tmp.name)
+        api = RttApi('user', 'pass', transport=FakeTransport(self.service), store=store)
+
+        api.fetch_service_info_datetime('W12345', datetime.date.today())
+
+        self.assertEqual(0, len(store))
+
+    def test_service_read_from_store_is_counted_in_cache(self):
+        RttApi('user', 'pass', transport=FakeTransport(self.service), store=ServiceStore(self.tmp.name)) \
+            .fetch_service_info_ymd('W12345', '2021', '03', '27')
+        raw = ServiceStore(self.tmp.name).get('W12345', datetime.date(2021, 3, 27))
+
+        cache = ResponseCache()
+        api = RttApi('user', 'pass', transport=FakeTransport(self.service), cache=cache,
+                     store=ServiceStore(self.tmp.name), validators=ValidatorCache())
+        api.fetch_service_info_ymd('W12345', '2021', '03', '27')
+
+        self.assertEqual(len(raw), cache.stats().size)
+
+
+class ConditionalTest(unittest.TestCase):
+
+    def test_not_modified_reuses_parsed_result(self):
+        transport = ETagTransport()
+        validators = ValidatorCache()
+        api = RttApi('user', 'pass', transport=transport, validators=validators)
+
+        first = api.search_station_departures('CLJ')
+        second = api.search_station_departures('CLJ')
+
+        self.assertIsNone(transport.headers[0])
+        self.assertEqual({'If-None-Match': '"v1"'}, transport.headers[1])
+        self.assertIs(first, second)
+        self.assertEqual(1, validators.not_modified)
+
+    def test_modified_response_is_parsed_again(self):
+        transport = ETagTransport()
+        api = RttApi('user', 'pass', transport=transport, validators=ValidatorCache())
+
+        first = api.search_station_departures('CLJ')
+        transport.etag = '"v2"'
+        transport.json = search_json('WAT')
+        second = api.search_station_departures('CLJ')
+
+        self.assertIsNot(first, second)
+        self.assertEqual('WAT', second.location.crs)
+
+    def test_identical_body_without_validators_reuses_parsed_result(self):
+        validators = ValidatorCache()
+        api = RttApi('user', 'pass', transport=FakeTransport(), validators=validators)
+
+        first = api.search_station_departures('CLJ')
+        second = api.search_station_departures('CLJ')
+
+        self.assertIs(first, second)
+        self.assertEqual(1, validators.unchanged)
+
+    def test_not_modified_with_cache(self):
+        transport = ETagTransport()
+        cache = ResponseCache(search_ttl=0)
+        api = RttApi('user', 'pass', transport=transport, cache=cache, validators=ValidatorCache())
+
+        first = api.search_station_departures('CLJ')
+        second = api.search_station_departures('CLJ')
+
+        self.assertIs(first, second)
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_iter_station_departures(self):
+        json = search_json()
+        json['services'] = [{
+            'locationDetail': {'crs': 'CLJ'},
+            'serviceUid': 'W{:05d}'.format(i),
+            'runDate': '2021-03-27',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'serviceType': 'train',
+            'isPassenger': True
+        } for i in range(5)]
+        transport = FakeTransport(json)
+        api = RttApi('user', 'pass', transport=transport)
+
+        actual = [service.service_uid for service in api.iter_station_departures('CLJ')]
+
+        self.assertEqual(['W00000', 'W00001', 'W00002', 'W00003', 'W00004'], actual)
+        self.assertEqual(datetime.date(2021, 3, 27), next(api.iter_station_arrivals('CLJ')).run_date)
+        self.assertTrue(transport.calls[1][0].endswith('/arrivals'))
+
+    def test_iter_station_departures_failure(self):
+        api = RttApi('user', 'pass', transport=FakeTransport(status_code=500))
+
+        with self.assertRaises(requests.HTTPError):
+            next(api.iter_station_departures('CLJ'))
+
+
+class _SequenceTransport(Transport):
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, auth, headers=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class RateLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.slept = []
+        self.limiter = RateLimiter(rate=100, max_retries=2, sleep=self.slept.append, jitter=lambda: 1.0)
+
+    def test_throttled_request_is_retried(self):
+        transport = _SequenceTransport(
+            FakeResponse({}, 429, 'Too Many Requests', {'Retry-After': '2'}),
+            FakeResponse(search_json())
+        )
+        api = RttApi('user', 'pass', transport=transport, rate_limiter=self.limiter)
+
+        actual = api.search_station_departures('CLJ')
+
+        self.assertEqual('CLJ', actual.location.crs)
+        self.assertEqual(2, transport.calls)
+        self.assertEqual(1, self.limiter.retries)
+        self.assertEqual(0.5, self.slept[0])
+        self.assertAlmostEqual(2.0, sum(self.slept[1:]), delta=0.1)
+
+    def test_gives_up_after_max_retries(self):
+        transport = _SequenceTransport(*(FakeResponse({}, 503, 'Service Unavailable') for _ in range(3)))
+        api = RttApi('user', 'pass', transport=transport, rate_limiter=self.limiter)
+
+        with self.assertRaises(requests.HTTPError):
+            api.search_station_departures('CLJ')
+        self.assertEqual(3, transport.calls)
+
+    def test_client_error_is_not_retried(self):
+        transport = _SequenceTransport(FakeResponse({}, 404, 'Not Found'))
+        api = RttApi('user', 'pass', transport=transport, rate_limiter=self.limiter)
+
+        with self.assertRaises(requests.HTTPError):
+            api.search_station_departures('CLJ')
+        self.assertEqual(1, transport.calls)
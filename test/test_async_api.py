@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import json
+import unittest
+
+import requests
+
+from rttapi.async_api import AsyncRttApi, AsyncResponse, AsyncTransport
+from rttapi.ratelimit import RateLimiter
+
+
+def _search_json():
+    return {
+        'location': {'name': 'Clapham Junction', 'crs': 'CLJ', 'tiploc': 'CLPHMJC'},
+        'filter': None,
+        'services': [{
+            'locationDetail': {'crs': 'CLJ', 'tiploc': 'CLPHMJC', 'description': 'Clapham Junction'},
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'serviceType': 'train',
+            'isPassenger': True
+        }]
+    }
+
+
+class _FakeAsyncTransport(AsyncTransport):
+    def __init__(self, body, status_code=200, delay=0.0):
+        self.body = json.dumps(body).encode('utf-8')
+        self.status_code = status_code
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, credentials, headers=None):
+        self.calls.append(url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return AsyncResponse(self.status_code, 'OK', {}, self.body)
+
+
+class AsyncApiTest(unittest.TestCase):
+
+    def test_search_departures(self):
+        transport = _FakeAsyncTransport(_search_json())
+        api = AsyncRttApi('user', 'pass', transport=transport)
+
+        actual = asyncio.run(api.search_station_departures('CLJ'))
+
+        self.assertEqual('CLJ', actual.location.crs)
+        self.assertEqual('W12345', actual.services[0].service_uid)
+        self.assertEqual(datetime.date(2021, 3, 27), actual.services[0].run_date)
+        self.assertEqual(['https://api.rtt.io/api/v1/json/search/CLJ'], transport.calls)
+
+    def test_search_arrivals(self):
+        transport = _FakeAsyncTransport(_search_json())
+        api = AsyncRttApi('user', 'pass', transport=transport)
+
+        asyncio.run(api.search_station_arrivals('CLJ'))
+
+        self.assertEqual(['https://api.rtt.io/api/v1/json/search/CLJ/arrivals'], transport.calls)
+
+    def test_service_info_datetime(self):
+        transport = _FakeAsyncTransport({
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        })
+        api = AsyncRttApi('user', 'pass', transport=transport)
+
+        actual = asyncio.run(api.fetch_service_info_datetime('W12345', datetime.date(2021, 3, 27)))
+
+        self.assertEqual('1A23', actual.train_identity)
+        self.assertEqual(['https://api.rtt.io/api/v1/json/service/W12345/2021/03/27'], transport.calls)
+
+    def test_concurrency_is_bounded(self):
+        transport = _FakeAsyncTransport(_search_json(), delay=0.01)
+        api = AsyncRttApi('user', 'pass', transport=transport, max_concurrency=3)
+
+        async def fan_out():
+            return await asyncio.gather(*(api.search_station_departures('CLJ') for _ in range(20)))
+
+        results = asyncio.run(fan_out())
+
+        self.assertEqual(20, len(results))
+        self.assertEqual(3, transport.max_in_flight)
+
+    def test_failed_request_raises(self):
+        api = AsyncRttApi('user', 'pass', transport=_FakeAsyncTransport({}, status_code=503))
+
+        with self.assertRaises(requests.HTTPError):
+            asyncio.run(api.search_station_departures('CLJ'))
+
+    def test_throttled_request_is_retried(self):
+        transport = _FakeAsyncTransport(_search_json())
+        statuses = [429, 200]
+
+        async def get(url, credentials, headers=None):
+            transport.calls.append(url)
+            return AsyncResponse(statuses.pop(0), 'OK', {'Retry-After': '0'}, transport.body)
+
+        transport.get = get
+        limiter = RateLimiter(rate=100, base_delay=0.001)
+        api = AsyncRttApi('user', 'pass', transport=transport, rate_limiter=limiter)
+
+        actual = asyncio.run(api.search_station_departures('CLJ'))
+
+        self.assertEqual('CLJ', actual.location.crs)
+        self.assertEqual(2, len(transport.calls))
+        self.assertEqual(1, limiter.throttled)
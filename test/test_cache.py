@@ -0,0 +1,86 @@
+import datetime
+import unittest
+
+from rttapi.cache import ResponseCache
+from test.fakes import Clock
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_get_missing(self):
+        cache = ResponseCache()
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(1, cache.stats().misses)
+
+    def test_put_and_get(self):
+        cache = ResponseCache()
+        cache.put('a', {'value': 1}, 10, ttl=30)
+
+        self.assertEqual({'value': 1}, cache.get('a'))
+        self.assertEqual(1, cache.stats().hits)
+        self.assertEqual(10, cache.stats().size)
+
+    def test_entry_expires(self):
+        clock = Clock(0.0)
+        cache = ResponseCache(clock=clock)
+        cache.put('a', 1, 10, ttl=30)
+
+        clock.now = 29
+        self.assertEqual(1, cache.get('a'))
+
+        clock.now = 30
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(0, len(cache))
+
+    def test_entry_without_ttl_never_expires(self):
+        clock = Clock(0.0)
+        cache = ResponseCache(clock=clock)
+        cache.put('a', 1, 10, ttl=None)
+
+        clock.now = 10 ** 9
+        self.assertEqual(1, cache.get('a'))
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('a', 1, 1)
+        cache.put('b', 2, 1)
+        cache.get('a')
+        cache.put('c', 3, 1)
+
+        self.assertEqual(1, cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual(1, cache.stats().evictions)
+
+    def test_evicts_by_size(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.put('a', 1, 60)
+        cache.put('b', 2, 60)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(2, cache.get('b'))
+        self.assertEqual(60, cache.stats().size)
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.put('a', 1, 101)
+
+        self.assertEqual(0, len(cache))
+
+    def test_replacing_entry_updates_size(self):
+        cache = ResponseCache()
+        cache.put('a', 1, 60)
+        cache.put('a', 2, 40)
+
+        self.assertEqual(2, cache.get('a'))
+        self.assertEqual(40, cache.stats().size)
+
+    def test_ttl_for(self):
+        cache = ResponseCache(search_ttl=15, service_ttl=60, historic_service_ttl=None)
+        today = datetime.date.today()
+
+        self.assertEqual(15, cache.ttl_for(None))
+        self.assertEqual(60, cache.ttl_for(today))
+        self.assertEqual(60, cache.ttl_for(today - datetime.timedelta(days=1)))
+        self.assertIsNone(cache.ttl_for(today - datetime.timedelta(days=2)))
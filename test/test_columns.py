@@ -0,0 +1,130 @@
+import unittest
+
+import rttapi.parser as parser
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from rttapi.columns import MISSING_TIME, Categorical, search_columns, service_columns
+
+
+def _location(crs, arrival, departure, realtime_departure=None, lateness=None):
+    out = {'tiploc': crs + 'TIP', 'crs': crs, 'gbttBookedArrival': arrival, 'gbttBookedDeparture': departure}
+    if realtime_departure is not None:
+        out['realtimeDeparture'] = realtime_departure
+        out['realtimeGbttDepartureLateness'] = lateness
+    return out
+
+
+def _service(uid, atoc_code):
+    return {
+        'serviceUid': uid,
+        'runDate': '2021-03-27',
+        'serviceType': 'train',
+        'isPassenger': True,
+        'trainIdentity': '1A23',
+        'atocCode': atoc_code,
+        'atocName': atoc_code,
+        'origin': [{'tiploc': 'WATTIP', 'description': 'London Waterloo', 'workingTime': '233000',
+                    'publicTime': '2330'}],
+        'locations': [
+            _location('WAT', None, '2330', '2332', 2),
+            _location('CLJ', '2340', '2341'),
+            _location('SOU', '0055', None),
+        ]
+    }
+
+
+def _search():
+    return {
+        'location': {'name': 'Clapham Junction', 'crs': 'CLJ', 'tiploc': 'CLPHMJC'},
+        'filter': None,
+        'services': [
+            {
+                'locationDetail': dict(_location('CLJ', '2340', '2341'),
+                                       origin=[{'tiploc': 'WATTIP', 'description': 'London Waterloo',
+                                                'workingTime': '233000', 'publicTime': '2330'}]),
+                'serviceUid': 'W00001',
+                'runDate': '2021-03-27',
+                'atocCode': 'SW',
+                'atocName': 'South Western Railway',
+                'serviceType': 'train',
+                'isPassenger': True,
+            },
+            {
+                'locationDetail': _location('CLJ', '0010', '0011', '0015', 4),
+                'serviceUid': 'W00002',
+                'runDate': '2021-03-28',
+                'atocCode': 'SN',
+                'atocName': 'Southern',
+                'serviceType': 'train',
+                'isPassenger': True,
+                'countdownMinutes': 3,
+            },
+        ]
+    }
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class ColumnsTest(unittest.TestCase):
+
+    def assertColumnsEqual(self, expected, actual):
+        self.assertEqual(sorted(expected), sorted(actual))
+        for name in expected:
+            if isinstance(expected[name], Categorical):
+                self.assertEqual(list(expected[name].values()), list(actual[name].values()), name)
+            else:
+                self.assertTrue(numpy.array_equal(expected[name], actual[name]), name)
+
+    def test_categorical(self):
+        column = Categorical.from_values(['SW', None, 'SN', 'SW'])
+
+        self.assertEqual(['SW', 'SN'], column.categories)
+        self.assertEqual([0, -1, 1, 0], column.codes.tolist())
+        self.assertEqual(['SW', None, 'SN', 'SW'], column.values().tolist())
+
+    def test_service_columns(self):
+        services = [parser.parse_service(_service('W00001', 'SW')), parser.parse_service(_service('W00002', 'SN'))]
+
+        actual = service_columns(services)
+
+        self.assertEqual([0, 0, 0, 1, 1, 1], actual['service'].tolist())
+        self.assertEqual(['WAT', 'CLJ', 'SOU'] * 2, actual['crs'].values().tolist())
+        self.assertEqual(['SW', 'SN'], actual['atoc_code'].categories)
+        self.assertEqual([MISSING_TIME, 85200, 86400 + 3300] * 2, actual['gbtt_booked_arrival_seconds'].tolist())
+        self.assertEqual([84720, MISSING_TIME, MISSING_TIME] * 2, actual['realtime_departure_seconds'].tolist())
+        self.assertEqual([2, 0, 0] * 2, actual['realtime_gbtt_departure_lateness'].tolist())
+        self.assertEqual(numpy.datetime64('2021-03-27'), actual['run_date'][0])
+
+    def test_service_columns_from_raw_json_match_parsed(self):
+        eager = [parser.parse_service(_service('W00001', 'SW'))]
+        lazy = [parser.parse_service(_service('W00001', 'SW'), lazy=True)]
+
+        self.assertColumnsEqual(service_columns(eager), service_columns(lazy))
+        self.assertEqual(0, lazy[0].locations.parsed_count)
+
+    def test_search_columns(self):
+        actual = parser.parse_search(_search()).to_columns()
+
+        self.assertEqual([0, 0], actual['search'].tolist())
+        self.assertEqual(['W00001', 'W00002'], actual['service_uid'].values().tolist())
+        self.assertEqual(['WATTIP', None], actual['origin_tiploc'].values().tolist())
+        self.assertEqual([85200, 600], actual['gbtt_booked_arrival_seconds'].tolist())
+        self.assertEqual([-1, 3], actual['countdown_minutes'].tolist())
+        self.assertEqual([False, False], actual['planned_cancel'].tolist())
+
+    def test_search_columns_from_raw_json_match_parsed(self):
+        eager = search_columns([parser.parse_search(_search()), parser.parse_search(_search())])
+        lazy_results = [parser.parse_search(_search(), lazy=True), parser.parse_search(_search(), lazy=True)]
+        lazy = search_columns(lazy_results)
+
+        self.assertColumnsEqual(eager, lazy)
+        self.assertEqual([0, 0, 1, 1], lazy['search'].tolist())
+        self.assertEqual(0, lazy_results[0].services.parsed_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from rttapi.decoder import available_decoders, get_decoder
+
+_RAW = '{"serviceUid": "W12345", "atocName": "Caf\\u00e9 Rail", "locations": [{"crs": "CLJ", "lateness": -1.5}], ' \
+       '"isPassenger": true, "filter": null}'.encode('utf-8')
+
+_EXPECTED = {
+    'serviceUid': 'W12345',
+    'atocName': 'Café Rail',
+    'locations': [{'crs': 'CLJ', 'lateness': -1.5}],
+    'isPassenger': True,
+    'filter': None
+}
+
+
+class DecoderTest(unittest.TestCase):
+
+    def test_stdlib_always_available(self):
+        self.assertIn('json', available_decoders())
+        self.assertEqual(_EXPECTED, get_decoder('json')(_RAW))
+
+    def test_default_decoder(self):
+        self.assertEqual(_EXPECTED, get_decoder()(_RAW))
+
+    def test_every_available_backend_agrees(self):
+        for name in available_decoders():
+            self.assertEqual(_EXPECTED, get_decoder(name)(_RAW), name)
+
+    def test_unknown_backend_fails(self):
+        with self.assertRaises(ValueError):
+            get_decoder('yaml')
@@ -0,0 +1,155 @@
+import copy
+import datetime
+import random
+import unittest
+
+import rttapi.parser as parser
+from rttapi.diff import ADDED, CHANGED, MOVED, REMOVED, apply_changes, diff_searches, iter_changes
+
+
+def _service(uid, departure, platform='1', realtime=None, **detail):
+    location = {'tiploc': 'CLPHMJC', 'crs': 'CLJ', 'description': 'Clapham Junction',
+                'gbttBookedDeparture': departure, 'platform': platform}
+    if realtime is not None:
+        location['realtimeDeparture'] = realtime
+    location.update(detail)
+    return {'locationDetail': location, 'serviceUid': uid, 'runDate': '2021-03-27', 'atocCode': 'SW',
+            'atocName': 'South Western Railway', 'serviceType': 'train', 'isPassenger': True}
+
+
+def _search(*services):
+    return {
+        'location': {'name': 'Clapham Junction', 'crs': 'CLJ', 'tiploc': 'CLPHMJC'},
+        'filter': None,
+        'services': list(services)
+    }
+
+
+def _board(search):
+    return [(s.service_uid, s.location_detail.gbtt_booked_departure, s.location_detail.platform,
+             s.location_detail.realtime_departure, s.location_detail.display_as) for s in search.services]
+
+
+class DiffTest(unittest.TestCase):
+
+    def setUp(self):
+        self.old_json = _search(_service('W1', '1000'), _service('W2', '1005'), _service('W3', '1010'))
+        self.new_json = _search(
+            _service('W2', '1005', platform='4', realtime='1007', realtimeGbttDepartureLateness=2),
+            _service('W3', '1010'),
+            _service('W4', '1015'),
+        )
+
+    def test_diff(self):
+        old = parser.parse_search(self.old_json)
+        new = parser.parse_search(self.new_json)
+
+        actual = diff_searches(old, new)
+
+        self.assertEqual([('W4', datetime.date(2021, 3, 27))], [change.key for change in actual.added])
+        self.assertEqual(2, actual.added[0].index)
+        self.assertEqual(['W1'], [change.key[0] for change in actual.removed])
+        self.assertEqual(1, len(actual.changed))
+        self.assertEqual({'platform': ('1', '4'), 'realtime_departure': (None, '1007'),
+                          'realtime_gbtt_departure_lateness': (0, 2)}, actual.changed[0].fields)
+        self.assertIs(new.services[0], actual.changed[0].service)
+        self.assertEqual(3, len(actual))
+
+    def test_identical_polls_have_no_changes(self):
+        old = parser.parse_search(self.old_json)
+        new = parser.parse_search(copy.deepcopy(self.old_json))
+
+        self.assertFalse(diff_searches(old, new))
+
+    def test_cancellation(self):
+        old = parser.parse_search(self.old_json)
+        cancelled = copy.deepcopy(self.old_json)
+        cancelled['services'][1]['locationDetail'].update(displayAs='CANCELLED_CALL', cancelReasonCode='TG')
+
+        actual = diff_searches(old, parser.parse_search(cancelled))
+
+        self.assertEqual({'display_as': (None, 'CANCELLED_CALL'), 'cancel_reason_code': (None, 'TG')},
+                         actual.changed[0].fields)
+
+    def test_custom_fields(self):
+        old = parser.parse_search(self.old_json)
+        new = parser.parse_search(self.new_json)
+
+        actual = diff_searches(old, new, fields=('realtime_departure',))
+
+        self.assertEqual({'realtime_departure': (None, '1007')}, actual.changed[0].fields)
+
+    def test_no_previous_poll(self):
+        new = parser.parse_search(self.new_json)
+
+        actual = list(iter_changes(None, new))
+
+        self.assertEqual([ADDED] * 3, [change.kind for change in actual])
+        self.assertEqual([0, 1, 2], [change.index for change in actual])
+
+    def test_streaming_order(self):
+        old = parser.parse_search(self.old_json)
+        new = parser.parse_search(self.new_json)
+
+        actual = [(change.kind, change.key[0]) for change in iter_changes(old, new)]
+
+        self.assertEqual([(CHANGED, 'W2'), (ADDED, 'W4'), (REMOVED, 'W1')], actual)
+
+    def test_apply_changes_reproduces_new_board(self):
+        old = parser.parse_search(self.old_json)
+        new = parser.parse_search(self.new_json)
+        before = _board(old)
+
+        actual = apply_changes(old, iter_changes(old, new))
+
+        self.assertEqual(_board(new), _board(actual))
+        self.assertEqual(before, _board(old))
+        self.assertIs(old.services[2], actual.services[1])
+        self.assertFalse(diff_searches(actual, new))
+
+    def test_apply_changes_reorders(self):
+        old = parser.parse_search(_search(_service('A', '1000'), _service('B', '1005'), _service('C', '1010')))
+        new = parser.parse_search(_search(_service('B', '1005'), _service('D', '1015'), _service('A', '1000')))
+
+        changes = list(iter_changes(old, new))
+        actual = apply_changes(old, changes)
+
+        self.assertEqual(['B', 'D', 'A'], [service.service_uid for service in actual.services])
+        self.assertEqual([ADDED, MOVED, REMOVED], [change.kind for change in changes])
+
+    def test_apply_changes_matches_random_boards(self):
+        rng = random.Random(4)
+        for _ in range(200):
+            old_ids = rng.sample(range(12), rng.randint(0, 8))
+            new_ids = rng.sample(range(12), rng.randint(0, 8))
+            old = parser.parse_search(_search(*(_service('W{}'.format(i), '1000') for i in old_ids)))
+            new = parser.parse_search(_search(*(_service('W{}'.format(i), '1000', platform=rng.choice('12'))
+                                                for i in new_ids)))
+
+            actual = apply_changes(old, iter_changes(old, new))
+
+            self.assertEqual(_board(new), _board(actual))
+
+    def test_apply_changes_takes_whole_changed_service(self):
+        old_json = _search(_service('W1', '1000', realtime='1000'))
+        old_json['services'][0]['countdownMinutes'] = 5
+        new_json = _search(_service('W1', '1000', realtime='1010'))
+        new_json['services'][0]['countdownMinutes'] = 15
+        old, new = parser.parse_search(old_json), parser.parse_search(new_json)
+
+        actual = apply_changes(old, iter_changes(old, new))
+
+        self.assertEqual(10 * 3600 + 10 * 60, actual.services[0].location_detail.realtime_departure_seconds)
+        self.assertEqual(15, actual.services[0].countdown_minutes)
+        self.assertEqual(10 * 3600, old.services[0].location_detail.realtime_departure_seconds)
+
+    def test_apply_unknown_service_fails(self):
+        old = parser.parse_search(self.old_json)
+        changes = list(iter_changes(old, parser.parse_search(self.new_json)))
+
+        with self.assertRaises(ValueError):
+            apply_changes(parser.parse_search(_search()), changes)
+
+
+if __name__ == '__main__':
+    unittest.main()
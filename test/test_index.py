@@ -0,0 +1,147 @@
+import datetime
+import unittest
+
+import rttapi.parser as parser
+from rttapi.index import TimetableIndex, call_seconds
+
+_STATIONS = {'WAT': 'WATRLMN', 'CLJ': 'CLPHMJC', 'WOK': 'WOKING', 'GLD': 'GUILDFD', 'BSK': 'BSNGSTK'}
+
+
+def _service(uid, calls, run_date='2021-03-27', realtime=None):
+    """
+    :param calls: (crs, public time) pairs. The first is the origin and the last the destination.
+    """
+    locations = []
+    for i, (crs, time) in enumerate(calls):
+        location = {'tiploc': _STATIONS.get(crs, crs), 'crs': crs, 'description': crs}
+        if i > 0:
+            location['gbttBookedArrival'] = time
+        if i < len(calls) - 1:
+            location['gbttBookedDeparture'] = time
+            if realtime is not None:
+                location['realtimeDeparture'] = realtime
+        locations.append(location)
+    locations.insert(1, {'tiploc': 'VAUXHLM', 'crs': 'VXH', 'description': 'Vauxhall',
+                         'wttBookedPass': calls[0][1] + '30'})
+    return parser.parse_service({
+        'serviceUid': uid,
+        'runDate': run_date,
+        'serviceType': 'train',
+        'isPassenger': True,
+        'trainIdentity': '1A23',
+        'atocCode': 'SW',
+        'atocName': 'South Western Railway',
+        'origin': [{'tiploc': _STATIONS.get(calls[0][0]), 'description': calls[0][0],
+                    'workingTime': calls[0][1] + '00', 'publicTime': calls[0][1]}],
+        'locations': locations
+    })
+
+
+def _at(hhmm, day=27):
+    return datetime.datetime(2021, 3, day, int(hhmm[:2]), int(hhmm[2:]))
+
+
+class TimetableIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.services = [
+            _service('W1', [('WAT', '0800'), ('CLJ', '0807'), ('WOK', '0830')]),
+            _service('W2', [('WAT', '0815'), ('CLJ', '0822'), ('GLD', '0850')]),
+            _service('W3', [('WOK', '0900'), ('CLJ', '0925'), ('WAT', '0932')]),
+            _service('W4', [('WAT', '2340'), ('CLJ', '2347'), ('BSK', '0035')]),
+        ]
+        self.index = TimetableIndex(self.services)
+
+    def test_calls_at_window(self):
+        actual = self.index.calls_at('CLJ', _at('0800'), _at('0900'))
+
+        self.assertEqual(['W1', 'W2'], [call.service.service_uid for call in actual])
+        self.assertEqual('CLJ', actual[0].location.crs)
+        self.assertEqual(_at('0807'), actual[0].time)
+
+    def test_calls_at_by_tiploc(self):
+        actual = self.index.calls_at('CLPHMJC')
+
+        self.assertEqual(['W1', 'W2', 'W3', 'W4'], [call.service.service_uid for call in actual])
+
+    def test_window_is_half_open(self):
+        self.assertEqual(['W2'], [c.service.service_uid for c in self.index.calls_at('CLJ', _at('0808'), _at('0925'))])
+
+    def test_passes_are_not_indexed(self):
+        self.assertEqual([], self.index.calls_at('VAUXHLM'))
+        self.assertEqual([], self.index.calls_at('VXH'))
+        self.assertEqual([], self.index.calls_at('XXX'))
+
+    def test_after_midnight(self):
+        actual = self.index.calls_at('BSK', _at('0000', day=28), _at('0100', day=28))
+
+        self.assertEqual(['W4'], [call.service.service_uid for call in actual])
+        self.assertEqual(datetime.datetime(2021, 3, 28, 0, 35), actual[0].time)
+        self.assertEqual([], self.index.calls_at('BSK', _at('0000'), _at('0100')))
+
+    def test_journeys(self):
+        actual = self.index.journeys('WAT', 'CLJ', _at('0000'), _at('2359'))
+
+        self.assertEqual(['W1', 'W2', 'W4'], [journey.service.service_uid for journey in actual])
+        self.assertEqual('WAT', actual[0].origin.location.crs)
+        self.assertEqual(_at('0807'), actual[0].destination.time)
+
+    def test_journeys_respect_direction(self):
+        self.assertEqual(['W3'], [journey.service.service_uid for journey in self.index.journeys('CLJ', 'WAT')])
+        self.assertEqual(['W1'], [journey.service.service_uid for journey in self.index.journeys('WAT', 'WOK')])
+        self.assertEqual([], self.index.journeys('GLD', 'WAT'))
+
+    def test_replace_with_realtime(self):
+        self.index.add(_service('W1', [('WAT', '0800'), ('CLJ', '0807'), ('WOK', '0830')], realtime='0910'))
+
+        self.assertEqual(4, len(self.index))
+        self.assertEqual(['W2'], [c.service.service_uid for c in self.index.calls_at('CLJ', _at('0800'), _at('0900'))])
+        self.assertEqual(['W1', 'W3', 'W4'], [c.service.service_uid for c in self.index.calls_at('CLJ', _at('0900'))])
+
+    def test_booked_times(self):
+        index = TimetableIndex(realtime=False)
+        index.add(_service('W1', [('WAT', '0800'), ('CLJ', '0807'), ('WOK', '0830')], realtime='0910'))
+
+        self.assertEqual(['W1'], [c.service.service_uid for c in index.calls_at('CLJ', _at('0800'), _at('0900'))])
+
+    def test_remove(self):
+        self.assertTrue(self.index.remove('W2', datetime.date(2021, 3, 27)))
+        self.assertFalse(self.index.remove('W2', datetime.date(2021, 3, 27)))
+
+        self.assertEqual(['W1', 'W3', 'W4'], [c.service.service_uid for c in self.index.calls_at('CLJ')])
+        self.assertNotIn('GLD', self.index.codes)
+        self.assertIsNone(self.index.get('W2', datetime.date(2021, 3, 27)))
+        self.assertIs(self.services[0], self.index.get('W1', datetime.date(2021, 3, 27)))
+
+    def test_add_matches_add_all(self):
+        one_by_one = TimetableIndex()
+        for service in reversed(self.services):
+            one_by_one.add(service)
+        self.index.add_all(self.services[:2])
+
+        for code in ('WAT', 'CLJ', 'WOK', 'GLD', 'BSK'):
+            self.assertEqual([(c.service.service_uid, c.position) for c in self.index.calls_at(code)],
+                             [(c.service.service_uid, c.position) for c in one_by_one.calls_at(code)])
+
+    def test_run_dates(self):
+        self.index.add(_service('W1', [('WAT', '0800'), ('CLJ', '0807')], run_date='2021-03-28'))
+
+        self.assertEqual(5, len(self.index))
+        self.assertEqual(['W1'], [c.service.service_uid for c in self.index.calls_at('CLJ', _at('0800', day=28))])
+
+    def test_requires_key(self):
+        service = _service('W1', [('WAT', '0800'), ('CLJ', '0807')])
+        service.run_date = None
+
+        self.assertRaises(ValueError, self.index.add, service)
+
+    def test_call_seconds(self):
+        origin, passing, middle = self.services[0].locations[:3]
+
+        self.assertEqual(8 * 3600, call_seconds(origin))
+        self.assertEqual(8 * 3600 + 7 * 60, call_seconds(middle))
+        self.assertIsNone(call_seconds(passing))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import rttapi.parser as parser
+from rttapi.lazy import LazyList
+
+
+def _service(uid):
+    return {
+        'locationDetail': {'crs': 'CLJ'},
+        'serviceUid': uid,
+        'runDate': '2021-03-27',
+        'atocCode': 'SW',
+        'atocName': 'South Western Railway',
+        'serviceType': 'train',
+        'isPassenger': True
+    }
+
+
+class LazyListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parsed = []
+
+        def parse(value):
+            self.parsed.append(value)
+            return value * 10
+
+        self.items = LazyList([1, 2, 3, 4, 5], parse)
+
+    def test_len_does_not_parse(self):
+        self.assertEqual(5, len(self.items))
+        self.assertEqual([], self.parsed)
+
+    def test_index_parses_once(self):
+        self.assertEqual(20, self.items[1])
+        self.assertEqual(20, self.items[1])
+        self.assertEqual(50, self.items[-1])
+        self.assertEqual([2, 5], self.parsed)
+
+    def test_slice_parses_only_slice(self):
+        self.assertEqual([10, 20, 30], self.items[:3])
+        self.assertEqual([1, 2, 3], self.parsed)
+        self.assertEqual(3, self.items.parsed_count)
+
+    def test_iteration_and_equality(self):
+        self.assertEqual([10, 20, 30, 40, 50], list(self.items))
+        self.assertEqual([10, 20, 30, 40, 50], self.items)
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.items[5]
+
+
+class LazyParseTest(unittest.TestCase):
+
+    def test_lazy_search(self):
+        data = {
+            'location': {'name': 'Clapham Junction', 'crs': 'CLJ', 'tiploc': 'CLPHMJC'},
+            'filter': None,
+            'services': [_service('W00001'), _service('W00002'), _service('W00003')]
+        }
+
+        actual = parser.parse_search(data, lazy=True)
+
+        self.assertIsInstance(actual.services, LazyList)
+        self.assertEqual(3, len(actual.services))
+        self.assertEqual('W00001', actual.services[0].service_uid)
+        self.assertEqual(1, actual.services.parsed_count)
+        self.assertEqual(
+            [s.service_uid for s in parser.parse_search(data).services],
+            [s.service_uid for s in actual.services]
+        )
+
+    def test_lazy_service(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'locations': [{'crs': 'WAT'}, {'crs': 'CLJ'}, {'crs': 'WOK'}]
+        }
+
+        actual = parser.parse_service(data, lazy=True)
+
+        self.assertIsInstance(actual.locations, LazyList)
+        self.assertEqual('WOK', actual.locations[-1].crs)
+        self.assertEqual(1, actual.locations.parsed_count)
+
+    def test_lazy_service_without_locations(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        }
+
+        actual = parser.parse_service(data, lazy=True)
+
+        self.assertEqual([], actual.locations)
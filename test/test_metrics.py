@@ -0,0 +1,125 @@
+import unittest
+
+from rttapi.api import RttApi
+from rttapi.cache import ResponseCache
+from rttapi.conditional import ValidatorCache
+from rttapi.metrics import Metrics, MetricsRegistry, current_span
+from test.fakes import ETagTransport, FakeTransport
+
+
+class RegistryTest(unittest.TestCase):
+
+    def test_counter(self):
+        registry = MetricsRegistry()
+
+        registry.inc('calls', (('endpoint', 'service'),))
+        registry.inc('calls', (('endpoint', 'service'),), 2)
+
+        self.assertEqual(3, registry.counter('calls', endpoint='service'))
+        self.assertEqual(0, registry.counter('calls', endpoint='search'))
+
+    def test_histogram(self):
+        registry = MetricsRegistry()
+
+        registry.observe('seconds', (), 0.2, (0.1, 1.0))
+        registry.observe('seconds', (), 0.4, (0.1, 1.0))
+
+        count, total = registry.histogram('seconds')
+        self.assertEqual(2, count)
+        self.assertAlmostEqual(0.6, total)
+
+    def test_prometheus_format(self):
+        registry = MetricsRegistry()
+        registry.describe('calls', 'counter', 'Calls made')
+        registry.describe('seconds', 'histogram', 'Call duration')
+        registry.inc('calls', (('endpoint', 'a"b'),))
+        registry.observe('seconds', (('endpoint', 'x'),), 0.5, (0.1, 1.0))
+        registry.observe('seconds', (('endpoint', 'x'),), 2, (0.1, 1.0))
+
+        self.assertEqual('\n'.join([
+            '# HELP calls Calls made',
+            '# TYPE calls counter',
+            'calls{endpoint="a\\"b"} 1',
+            '# HELP seconds Call duration',
+            '# TYPE seconds histogram',
+            'seconds_bucket{endpoint="x",le="0.1"} 0',
+            'seconds_bucket{endpoint="x",le="1"} 1',
+            'seconds_bucket{endpoint="x",le="+Inf"} 2',
+            'seconds_sum{endpoint="x"} 2.5',
+            'seconds_count{endpoint="x"} 2',
+        ]) + '\n', registry.to_prometheus())
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_request_is_recorded(self):
+        metrics = Metrics()
+        spans = []
+        metrics.add_listener(spans.append)
+        api = RttApi('user', 'pass', transport=FakeTransport(), metrics=metrics)
+
+        api.search_station_departures('CLJ')
+
+        registry = metrics.registry
+        self.assertEqual(1, registry.counter('rttapi_requests_total', endpoint='search_departures', status='200'))
+        self.assertEqual(1, registry.histogram('rttapi_request_seconds', endpoint='search_departures')[0])
+        self.assertEqual(1, registry.histogram('rttapi_response_bytes', endpoint='search_departures')[0])
+        for phase in ('wait', 'download', 'decode', 'parse'):
+            self.assertEqual(1, registry.histogram('rttapi_phase_seconds', endpoint='search_departures',
+                                                   phase=phase)[0], phase)
+
+        self.assertEqual(1, len(spans))
+        self.assertEqual('search_departures', spans[0].name)
+        self.assertEqual(200, spans[0].attributes['status'])
+        self.assertGreaterEqual(spans[0].duration, 0)
+        self.assertIsNone(current_span())
+
+    def test_failed_request_is_recorded(self):
+        metrics = Metrics()
+        api = RttApi('user', 'pass', transport=FakeTransport(status_code=401), metrics=metrics)
+
+        with self.assertRaises(Exception):
+            api.search_station_departures('CLJ')
+
+        self.assertEqual(1, metrics.registry.counter('rttapi_requests_total', endpoint='search_departures',
+                                                     status='401'))
+        self.assertIsNone(current_span())
+
+    def test_cache_outcomes(self):
+        metrics = Metrics()
+        api = RttApi('user', 'pass', transport=FakeTransport(), cache=ResponseCache(), metrics=metrics)
+
+        api.search_station_departures('CLJ')
+        api.search_station_departures('CLJ')
+
+        registry = metrics.registry
+        self.assertEqual(1, registry.counter('rttapi_cache_total', endpoint='search_departures', outcome='miss'))
+        self.assertEqual(1, registry.counter('rttapi_cache_total', endpoint='search_departures', outcome='hit'))
+
+    def test_not_modified_reuses_parse(self):
+        metrics = Metrics()
+        api = RttApi('user', 'pass', transport=ETagTransport(), validators=ValidatorCache(), metrics=metrics)
+
+        api.search_station_departures('CLJ')
+        api.search_station_departures('CLJ')
+
+        registry = metrics.registry
+        self.assertEqual(1, registry.counter('rttapi_cache_total', endpoint='search_departures',
+                                             outcome='not_modified'))
+        self.assertEqual(1, registry.counter('rttapi_parse_reused_total', endpoint='search_departures'))
+        self.assertEqual(1, registry.histogram('rttapi_phase_seconds', endpoint='search_departures',
+                                               phase='parse')[0])
+
+    def test_prometheus_export(self):
+        metrics = Metrics()
+        api = RttApi('user', 'pass', transport=FakeTransport(), metrics=metrics)
+
+        api.search_station_departures('CLJ')
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE rttapi_requests_total counter', text)
+        self.assertIn('rttapi_requests_total{endpoint="search_departures",status="200"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,19 @@
+import unittest
+
+from rttapi.model import Location, LocationContainer, LocationDetail, Pair, SearchResult, Service
+
+
+class ModelTest(unittest.TestCase):
+
+    def test_models_have_no_instance_dict(self):
+        for obj in (Location(), LocationContainer(), LocationDetail('Clapham Junction', 'CLJ', 'CLPHMJC'),
+                    Pair(), SearchResult(), Service()):
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+
+    def test_defaults_are_kept(self):
+        container = LocationContainer()
+
+        self.assertEqual('ZZ', container.atoc_code)
+        self.assertEqual('Unknown', container.atoc_name)
+        self.assertEqual(-1, container.countdown_minutes)
+        self.assertEqual([], container.origin)
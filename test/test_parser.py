@@ -1,4 +1,7 @@
+import datetime
+import json
 import rttapi.parser as parser
+from rttapi.sharing import IdentityTable
 import unittest
 
 class ParserTest(unittest.TestCase):
@@ -321,4 +324,234 @@ class ParserTest(unittest.TestCase):
         self.assertEqual('leaves on the line in the Havant area', actual.cancel_reason_long_text)
 
         self.assertEqual('CALL', actual.display_as)
-        self.assertEqual('DEP_READY', actual.service_location)
\ No newline at end of file
+        self.assertEqual('DEP_READY', actual.service_location)
+
+    def test_parse_location_null_values_keep_defaults(self):
+        data = {
+            'crs': 'ABC',
+            'tiploc': None,
+            'platform': None,
+            'realtimeGbttDepartureLateness': None,
+            'origin': None
+        }
+
+        actual = parser.parse_location(data)
+
+        self.assertEqual('ABC', actual.crs)
+        self.assertIsNone(actual.tiploc)
+        self.assertIsNone(actual.platform)
+        self.assertEqual(0, actual.realtime_gbtt_departure_lateness)
+        self.assertEqual([], actual.origin)
+
+    def test_parse_service(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'powerType': 'EMU',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'performanceMonitored': True,
+            'origin': [{
+                'tiploc': 'WATRLMN',
+                'description': 'London Waterloo',
+                'workingTime': '123000',
+                'publicTime': '1230'
+            }],
+            'locations': [{'crs': 'WAT'}, {'crs': 'CLJ'}],
+            'realtimeActivated': True
+        }
+
+        actual = parser.parse_service(data)
+
+        self.assertEqual('W12345', actual.service_uid)
+        self.assertEqual(datetime.date(2021, 3, 27), actual.run_date)
+        self.assertEqual('EMU', actual.power_type)
+        self.assertIsNone(actual.train_class)
+        self.assertTrue(actual.performance_monitored)
+        self.assertEqual('WATRLMN', actual.origin[0].tiploc)
+        self.assertEqual([], actual.destination)
+        self.assertEqual(['WAT', 'CLJ'], [location.crs for location in actual.locations])
+        self.assertIsNone(actual.running_identity)
+
+    def test_parse_service_with_error_fails(self):
+        with self.assertRaises(ValueError):
+            parser.parse_service({'error': 'No schedule found'})
+
+    def test_parse_service_without_required_key_fails(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway'
+        }
+
+        for key in data:
+            missing = {k: v for k, v in data.items() if k != key}
+            for lazy, table in ((False, None), (True, None), (False, IdentityTable())):
+                with self.subTest(key=key, lazy=lazy, table=table), self.assertRaises(ValueError):
+                    parser.parse_service(missing, lazy=lazy, table=table)
+
+    def test_parse_location_container_without_required_key_fails(self):
+        data = {
+            'locationDetail': {'crs': 'CLJ'},
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'serviceType': 'train',
+            'isPassenger': True
+        }
+
+        for key in data:
+            with self.subTest(key=key), self.assertRaises(ValueError):
+                parser.parse_location_container({k: v for k, v in data.items() if k != key})
+
+    def test_parse_pair_fills_seconds(self):
+        data = {
+            'tiploc': 'SOTON',
+            'description': 'Southampton Central',
+            'workingTime': '125130',
+            'publicTime': '1251'
+        }
+
+        actual = parser.parse_pair(data)
+
+        self.assertEqual(12 * 3600 + 51 * 60 + 30, actual.working_time_seconds)
+        self.assertEqual(12 * 3600 + 51 * 60, actual.public_time_seconds)
+
+    def test_parse_service_rolls_times_past_midnight(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'trainIdentity': '1A23',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'origin': [{'tiploc': 'WATRLMN', 'description': 'London Waterloo',
+                        'workingTime': '233000', 'publicTime': '2330'}],
+            'destination': [{'tiploc': 'SOTON', 'description': 'Southampton Central',
+                             'workingTime': '005500', 'publicTime': '0055'}],
+            'locations': [
+                {'crs': 'WAT', 'wttBookedDeparture': '233000', 'gbttBookedDeparture': '2330',
+                 'realtimeDeparture': '2329'},
+                {'crs': 'SOU', 'wttBookedArrival': '005500', 'gbttBookedArrival': '0055',
+                 'realtimeArrival': '0102'},
+            ]
+        }
+
+        for lazy in (False, True):
+            actual = parser.parse_service(data, lazy=lazy)
+
+            self.assertEqual(23 * 3600 + 30 * 60, actual.origin[0].working_time_seconds)
+            self.assertEqual(86400 + 55 * 60, actual.destination[0].working_time_seconds)
+
+            first, last = actual.locations
+            self.assertEqual(23 * 3600 + 29 * 60, first.realtime_departure_seconds)
+            self.assertEqual(86400 + 55 * 60, last.gbtt_booked_arrival_seconds)
+            self.assertEqual(86400 + 62 * 60, last.realtime_arrival_seconds)
+            self.assertEqual(7 * 60, last.realtime_arrival_seconds - last.gbtt_booked_arrival_seconds)
+            self.assertEqual('0055', last.gbtt_booked_arrival)
+
+    def test_parse_location_container_rolls_times_past_midnight(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'locationDetail': {'crs': 'SOU', 'gbttBookedArrival': '0055', 'realtimeArrival': '2359'},
+            'origin': [{'tiploc': 'WATRLMN', 'description': 'London Waterloo',
+                        'workingTime': '233000', 'publicTime': '2330'}],
+            'destination': []
+        }
+
+        actual = parser.parse_location_container(data)
+
+        self.assertEqual(86400 + 55 * 60, actual.location_detail.gbtt_booked_arrival_seconds)
+        self.assertEqual(23 * 3600 + 59 * 60, actual.location_detail.realtime_arrival_seconds)
+
+    def test_parse_location_container_uses_location_detail_origin(self):
+        data = {
+            'serviceUid': 'W12345',
+            'runDate': '2021-03-27',
+            'atocCode': 'SW',
+            'atocName': 'South Western Railway',
+            'serviceType': 'train',
+            'isPassenger': True,
+            'locationDetail': {'crs': 'SOU', 'gbttBookedArrival': '0055',
+                               'origin': [{'tiploc': 'WATRLMN', 'description': 'London Waterloo',
+                                           'workingTime': '233000', 'publicTime': '2330'}]},
+        }
+
+        actual = parser.parse_location_container(data)
+
+        self.assertEqual(86400 + 55 * 60, actual.location_detail.gbtt_booked_arrival_seconds)
+
+    def test_parse_run_date_shares_date_objects(self):
+        first = parser._parse_run_date('2021-03-27')
+        second = parser._parse_run_date('2021-03-27')
+
+        self.assertEqual(datetime.date(2021, 3, 27), first)
+        self.assertIs(first, second)
+
+    def test_parse_run_date_invalid_fails(self):
+        for value in ('2021-02-30', '2021-+3-27', '27/03/2021', ''):
+            with self.assertRaises(ValueError):
+                parser._parse_run_date(value)
+
+
+class InternPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = parser.get_intern_pool()
+
+    def tearDown(self):
+        parser.set_intern_pool(self.pool)
+
+    def test_intern_returns_canonical_string(self):
+        pool = parser.InternPool()
+        first = ''.join(['CLP', 'HMJC'])
+        second = ''.join(['CLPH', 'MJC'])
+
+        self.assertIs(first, pool.intern(first))
+        self.assertIs(first, pool.intern(second))
+        self.assertEqual(1, len(pool))
+
+    def test_intern_full_pool_returns_value(self):
+        pool = parser.InternPool(max_size=1)
+        pool.intern('WAT')
+        value = ''.join(['CL', 'J'])
+
+        self.assertIs(value, pool.intern(value))
+        self.assertNotIn('CLJ', pool)
+
+    def test_intern_non_string_returns_value(self):
+        pool = parser.InternPool()
+        value = ['FIRSTTIP', 'SECONDTIP']
+
+        self.assertIs(value, pool.intern(value))
+
+    def test_parsed_fields_share_pooled_strings(self):
+        parser.set_intern_pool(parser.InternPool())
+        first = parser.parse_pair(json.loads('{"tiploc": "SOTON", "description": "Southampton Central", '
+                                             '"workingTime": "125100", "publicTime": "1251"}'))
+        second = parser.parse_pair(json.loads('{"tiploc": "SOTON", "description": "Southampton Central", '
+                                              '"workingTime": "135100", "publicTime": "1351"}'))
+
+        self.assertIs(first.tiploc, second.tiploc)
+        self.assertIs(first.description, second.description)
+
+    def test_interning_disabled(self):
+        parser.set_intern_pool(None)
+        data = {'tiploc': 'SOTON', 'description': 'Southampton Central', 'workingTime': '125100', 'publicTime': '1251'}
+
+        self.assertIsNone(parser.get_intern_pool())
+        self.assertEqual('SOTON', parser.parse_pair(data).tiploc)
@@ -0,0 +1,112 @@
+import asyncio
+import email.utils
+import time
+import unittest
+
+from rttapi.ratelimit import RateLimiter, TokenBucket, _parse_retry_after
+from test.fakes import Clock
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+        self.assertEqual([0, 0, 0], [bucket.reserve() for _ in range(3)])
+        self.assertEqual(0.5, bucket.reserve())
+        self.assertEqual(1.0, bucket.reserve())
+
+    def test_refills_over_time(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now += 0.5
+        self.assertEqual(0, bucket.reserve())
+        self.assertEqual(0.5, bucket.reserve())
+
+    def test_refill_capped_at_burst(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+        clock.now += 60
+        self.assertEqual([0, 0], [bucket.reserve() for _ in range(2)])
+        self.assertEqual(0.1, bucket.reserve())
+
+    def test_pause(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=2, burst=5, clock=clock)
+
+        bucket.pause(10)
+
+        self.assertEqual(10.5, bucket.reserve())
+        self.assertEqual(11.0, bucket.reserve())
+
+    def test_invalid_rate_fails(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.limiter = RateLimiter(rate=10, min_rate=2, increase=1, clock=self.clock, sleep=self.clock.sleep,
+                                   jitter=lambda: 1.0)
+
+    def test_backs_off_and_recovers(self):
+        self.limiter.on_response(429)
+        self.assertEqual(5, self.limiter.rate)
+        self.limiter.on_response(503)
+        self.limiter.on_response(500)
+        self.assertEqual(2, self.limiter.rate)
+
+        self.limiter.on_response(200)
+        self.assertEqual(3, self.limiter.rate)
+        for _ in range(20):
+            self.limiter.on_response(200)
+        self.assertEqual(10, self.limiter.rate)
+        self.assertEqual(3, self.limiter.throttled)
+
+    def test_client_errors_do_not_change_rate(self):
+        self.limiter.on_response(404)
+
+        self.assertEqual(10, self.limiter.rate)
+
+    def test_retry_after_pauses(self):
+        self.limiter.on_response(429, '7')
+
+        self.limiter.acquire()
+
+        self.assertAlmostEqual(7.2, self.clock.slept[0])
+
+    def test_retry_delay(self):
+        self.assertEqual(0.5, self.limiter.retry_delay(429, 0))
+        self.assertEqual(2.0, self.limiter.retry_delay(503, 2))
+        self.assertIsNone(self.limiter.retry_delay(503, 3))
+        self.assertIsNone(self.limiter.retry_delay(404, 0))
+        self.assertEqual(2, self.limiter.retries)
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(rate=1000, burst=1)
+
+        async def run():
+            await asyncio.gather(*(limiter.acquire_async() for _ in range(5)))
+
+        started = time.monotonic()
+        asyncio.run(run())
+        self.assertGreaterEqual(time.monotonic() - started, 0.003)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(3, _parse_retry_after('3'))
+        self.assertIsNone(_parse_retry_after(None))
+        self.assertIsNone(_parse_retry_after('soon'))
+
+        when = email.utils.formatdate(time.time() + 60, usegmt=True)
+        self.assertAlmostEqual(60, _parse_retry_after(when), delta=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import threading
+import unittest
+
+import rttapi.parser as parser
+from rttapi.scheduler import PollScheduler
+from test.fakes import Clock
+
+
+def _board(code, platform='1', countdown=None):
+    service = {
+        'locationDetail': {'tiploc': code + 'TIP', 'crs': code, 'platform': platform},
+        'serviceUid': 'W00001', 'runDate': '2021-03-27', 'atocCode': 'SW', 'atocName': 'South Western Railway',
+        'serviceType': 'train', 'isPassenger': True
+    }
+    if countdown is not None:
+        service['countdownMinutes'] = countdown
+    return parser.parse_search({'location': {'name': code, 'crs': code, 'tiploc': code + 'TIP'}, 'filter': None,
+                                'services': [service]})
+
+
+class _Api:
+    """ Answers each search with the next board given for the station, repeating the last """
+    def __init__(self, clock=None, boards=None):
+        self.clock = clock
+        self.boards = boards or {}
+        self.calls = []
+
+    def search_station_departures(self, code):
+        self.calls.append((code, self.clock() if self.clock else None))
+        boards = self.boards.get(code)
+        if boards is None:
+            return _board(code)
+        if isinstance(boards[0], Exception):
+            raise boards.pop(0)
+        return boards.pop(0) if len(boards) > 1 else boards[0]
+
+
+class PollSchedulerTest(unittest.TestCase):
+
+    def test_requests_are_spread_within_budget(self):
+        clock = Clock()
+        api = _Api(clock)
+        scheduler = PollScheduler(api, budget=2, clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ', 'WAT', 'VIC', 'WOK'])
+
+        for _ in range(4):
+            scheduler.poll_next()
+
+        self.assertEqual(['CLJ', 'WAT', 'VIC', 'WOK'], [code for code, _ in api.calls])
+        self.assertEqual([100.0, 100.5, 101.0, 101.5], [at for _, at in api.calls])
+
+    def test_first_poll_reports_every_service_added(self):
+        clock = Clock()
+        scheduler = PollScheduler(_Api(clock), budget=1, clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ'])
+
+        update = scheduler.poll_next()
+
+        self.assertEqual('CLJ', update.code)
+        self.assertEqual(1, len(update.changes.added))
+        self.assertIs(update.result, scheduler.result('CLJ'))
+
+    def test_busier_station_is_polled_more_often(self):
+        clock = Clock()
+        api = _Api(clock, {'CLJ': [_board('CLJ', str(i)) for i in range(100)]})
+        scheduler = PollScheduler(api, budget=1, min_interval=1, max_interval=600, clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ', 'BOG'])
+
+        for _ in range(40):
+            scheduler.poll_next()
+
+        codes = [code for code, _ in api.calls]
+        self.assertGreater(codes.count('CLJ'), codes.count('BOG'))
+
+    def test_interval_shares_budget_by_square_root_of_rate(self):
+        clock = Clock()
+        api = _Api(clock, {'CLJ': [_board('CLJ', str(i)) for i in range(100)]})
+        scheduler = PollScheduler(api, budget=1, min_interval=0.1, max_interval=1000, smoothing=1.0,
+                                  clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ'])
+
+        scheduler.poll_next()
+        update = scheduler.poll_next()
+
+        # One station with the whole budget is polled once a second, whatever its rate
+        self.assertAlmostEqual(1.0, update.interval)
+
+    def test_reordering_alone_is_not_a_change(self):
+        clock = Clock()
+        first, second = _board('CLJ'), _board('CLJ')
+        second.services[0].service_uid = 'W00002'
+        boards = [_board('CLJ') for _ in range(10)]
+        for i, board in enumerate(boards):
+            board.services = [first.services[0], second.services[0]][::1 if i % 2 else -1]
+        api = _Api(clock, {'CLJ': boards})
+        scheduler = PollScheduler(api, budget=1, min_interval=0.1, max_interval=1000, smoothing=1.0,
+                                  clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ', 'BOG'])
+
+        updates = [scheduler.poll_next() for _ in range(6)]
+
+        # Neither station has changed, so the budget is shared equally between them
+        self.assertTrue(all(update.changes.moved for update in updates[2:] if update.code == 'CLJ'))
+        self.assertEqual([2.0] * 4, [update.interval for update in updates[2:]])
+
+    def test_countdown_brings_next_poll_forward(self):
+        clock = Clock()
+        api = _Api(clock, {'CLJ': [_board('CLJ', countdown=2)]})
+        scheduler = PollScheduler(api, budget=0.001, min_interval=30, max_interval=600, clock=clock,
+                                  sleep=clock.sleep)
+        scheduler.watch(['CLJ'])
+
+        update = scheduler.poll_next()
+
+        self.assertEqual(120, update.interval)
+
+    def test_failure_backs_off_and_keeps_previous_result(self):
+        clock = Clock()
+        board = _board('CLJ')
+        api = _Api(clock, {'CLJ': [board, ValueError('failed'), ValueError('failed'), board]})
+        scheduler = PollScheduler(api, budget=1, min_interval=10, clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ'])
+        updates = []
+        scheduler.add_listener(updates.append)
+
+        for _ in range(3):
+            scheduler.poll_next()
+
+        self.assertIsNone(updates[1].changes)
+        self.assertIsInstance(updates[1].error, ValueError)
+        self.assertIs(board, updates[1].result)
+        self.assertEqual([20, 40], [updates[1].interval, updates[2].interval])
+
+    def test_unwatch(self):
+        clock = Clock()
+        api = _Api(clock)
+        scheduler = PollScheduler(api, budget=10, clock=clock, sleep=clock.sleep)
+        scheduler.watch(['CLJ', 'WAT'])
+        scheduler.unwatch(['CLJ'])
+
+        scheduler.poll_next()
+
+        self.assertEqual(['WAT'], [code for code, _ in api.calls])
+        self.assertEqual(['WAT'], scheduler.codes)
+
+    def test_nothing_watched(self):
+        clock = Clock()
+        scheduler = PollScheduler(_Api(clock), budget=1, max_interval=60, clock=clock, sleep=clock.sleep)
+
+        self.assertIsNone(scheduler.poll_next())
+        self.assertEqual([60], clock.slept)
+
+    def test_run_until_stopped(self):
+        stop = threading.Event()
+        api = _Api()
+        scheduler = PollScheduler(api, budget=100)
+        scheduler.watch(['CLJ', 'WAT'])
+        scheduler.add_listener(lambda update: stop.set() if update.code == 'WAT' else None)
+
+        scheduler.run(stop)
+
+        self.assertEqual(['CLJ', 'WAT'], [code for code, _ in api.calls])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            PollScheduler(_Api(), budget=0)
+        with self.assertRaises(ValueError):
+            PollScheduler(_Api(), budget=1, kind='passes')
+
+
+class _AsyncApi:
+    def __init__(self):
+        self.calls = []
+
+    async def search_station_departures(self, code):
+        self.calls.append(code)
+        await asyncio.sleep(0)
+        return _board(code)
+
+
+class AsyncUpdatesTest(unittest.TestCase):
+
+    def test_async_api(self):
+        api = _AsyncApi()
+        scheduler = PollScheduler(api, budget=1000)
+        scheduler.watch(['CLJ', 'WAT'])
+
+        async def collect():
+            out = []
+            async for update in scheduler.updates():
+                out.append(update.code)
+                if len(out) == 2:
+                    break
+            return out
+
+        self.assertEqual(['CLJ', 'WAT'], sorted(asyncio.run(collect())))
+
+    def test_blocking_api_runs_in_executor(self):
+        api = _Api()
+        scheduler = PollScheduler(api, budget=1000)
+        scheduler.watch(['CLJ'])
+
+        async def first():
+            async for update in scheduler.updates():
+                return update
+
+        self.assertEqual('CLJ', asyncio.run(first()).code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import json
+import multiprocessing
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import shared_memory
+
+import rttapi.parser as parser
+from rttapi.sharded import SharedStore, ShardedPoller
+
+
+def _search_json(code):
+    return {
+        'location': {'name': code, 'crs': code, 'tiploc': code + 'TIP'},
+        'filter': None,
+        'services': [{
+            'locationDetail': {'tiploc': code + 'TIP', 'crs': code, 'platform': '1'},
+            'serviceUid': 'W00001', 'runDate': '2021-03-27', 'atocCode': 'SW',
+            'atocName': 'South Western Railway', 'serviceType': 'train', 'isPassenger': True
+        }]
+    }
+
+
+def _read_in_child(name, code, out):
+    store = SharedStore.attach(name)
+    try:
+        out.put(store.get(code).location.crs)
+    finally:
+        store.close()
+
+
+class SharedStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SharedStore(['CLJ', 'WAT'], slot_size=4096)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_nothing_published(self):
+        self.assertIsNone(self.store.get('CLJ'))
+        self.assertEqual(0, self.store.version('CLJ'))
+
+    def test_publish_and_get(self):
+        self.assertTrue(self.store.publish('CLJ', parser.parse_search(_search_json('CLJ'))))
+
+        actual = self.store.get('CLJ')
+
+        self.assertEqual('CLJ', actual.location.crs)
+        self.assertEqual('1', actual.services[0].location_detail.platform)
+        self.assertEqual(1, self.store.version('CLJ'))
+        self.assertIsNone(self.store.get('WAT'))
+
+    def test_unchanged_version_returns_same_object(self):
+        self.store.publish('CLJ', parser.parse_search(_search_json('CLJ')))
+
+        first = self.store.get('CLJ')
+        second = self.store.get('CLJ')
+        self.store.publish('CLJ', parser.parse_search(_search_json('CLJ')))
+        third = self.store.get('CLJ')
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(2, self.store.version('CLJ'))
+
+    def test_result_too_large_for_slot(self):
+        self.store.publish('CLJ', parser.parse_search(_search_json('CLJ')))
+
+        self.assertFalse(self.store.publish_raw('CLJ', b'x' * 5000))
+
+        self.assertIsNone(self.store.get('CLJ'))
+        self.assertEqual(2, self.store.version('CLJ'))
+
+    def test_attach(self):
+        self.store.publish('WAT', parser.parse_search(_search_json('WAT')))
+
+        reader = SharedStore.attach(self.store.name)
+        try:
+            self.assertEqual(['CLJ', 'WAT'], reader.codes)
+            self.assertEqual('WAT', reader.get('WAT').location.crs)
+        finally:
+            reader.close()
+
+    def test_read_from_another_process(self):
+        self.store.publish('WAT', parser.parse_search(_search_json('WAT')))
+        out = multiprocessing.Queue()
+
+        child = multiprocessing.Process(target=_read_in_child, args=(self.store.name, 'WAT', out))
+        child.start()
+        child.join(30)
+
+        self.assertEqual('WAT', out.get(timeout=5))
+        self.assertEqual(0, child.exitcode)
+
+    def test_torn_copy_is_retried(self):
+        self.store.publish_raw('CLJ', b'first payload')
+        block = shared_memory.SharedMemory(self.store.name)
+        try:
+            # As a reader might see it if the payload's stores became visible after the sequence number's
+            offset = bytes(block.buf).find(b'first payload')
+            block.buf[offset:offset + 5] = b'xxxxx'
+
+            with self.assertRaises(TimeoutError):
+                self.store.read_raw('CLJ', retries=3)
+
+            block.buf[offset:offset + 5] = b'first'
+            self.assertEqual(b'first payload', self.store.read_raw('CLJ')[2])
+        finally:
+            block.close()
+
+    def test_unrelated_process_does_not_free_store(self):
+        # A separate interpreter has its own resource tracker, which would free the block when it exits if
+        # attaching left the block registered with it
+        code = 'from rttapi.sharded import SharedStore; SharedStore.attach({!r}).close()'.format(self.store.name)
+        subprocess.run([sys.executable, '-c', code], check=True, timeout=60)
+
+        reader = SharedStore.attach(self.store.name)
+        reader.close()
+
+    def test_unknown_code_fails(self):
+        with self.assertRaises(KeyError):
+            self.store.get('VIC')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps(_search_json(self.path.split('/')[5])).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ShardedPollerTest(unittest.TestCase):
+
+    def test_workers_publish_every_station(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = 'http://127.0.0.1:{}/api/v1'.format(server.server_address[1])
+        codes = ['CLJ', 'WAT', 'VIC', 'WOK', 'BOG']
+
+        try:
+            with ShardedPoller('user', 'pass', codes, processes=2, budget=100, min_interval=0.1,
+                               base_url=base_url) as poller:
+                self.assertEqual([['CLJ', 'VIC', 'BOG'], ['WAT', 'WOK']], poller.shards)
+
+                deadline = time.monotonic() + 30
+                while time.monotonic() < deadline and not all(poller.store.version(code) for code in codes):
+                    time.sleep(0.05)
+
+                self.assertEqual(codes, [poller.store.get(code).location.crs for code in codes])
+
+                # The boards never change, so polling them again publishes nothing
+                time.sleep(0.5)
+                self.assertEqual([1] * len(codes), [poller.store.version(code) for code in codes])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
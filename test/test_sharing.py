@@ -0,0 +1,173 @@
+import copy
+import json as _json
+import unittest
+
+import rttapi.parser as parser
+from rttapi.api import RttApi
+from rttapi.sharing import IdentityTable
+from rttapi.transport import Transport
+
+
+def _location(crs, departure, platform='1'):
+    return {'tiploc': crs + 'TIP', 'crs': crs, 'description': crs, 'wttBookedDeparture': departure + '00',
+            'gbttBookedDeparture': departure, 'platform': platform}
+
+
+def _search():
+    return {
+        'location': {'name': 'Clapham Junction', 'crs': 'CLJ', 'tiploc': 'CLJTIP'},
+        'filter': None,
+        'services': [
+            {'locationDetail': _location('CLJ', '10{:02d}'.format(i)), 'serviceUid': 'W0000{}'.format(i),
+             'runDate': '2021-03-27', 'atocCode': 'SW', 'atocName': 'South Western Railway',
+             'serviceType': 'train', 'isPassenger': True}
+            for i in range(3)
+        ]
+    }
+
+
+def _service():
+    return {
+        'serviceUid': 'W00001',
+        'runDate': '2021-03-27',
+        'serviceType': 'train',
+        'isPassenger': True,
+        'trainIdentity': '1A23',
+        'atocCode': 'SW',
+        'atocName': 'South Western Railway',
+        'origin': [{'tiploc': 'WATTIP', 'description': 'London Waterloo', 'workingTime': '235000',
+                    'publicTime': '2350'}],
+        'locations': [_location('WAT', '2350'), _location('CLJ', '2358'), _location('WOK', '0020')]
+    }
+
+
+class IdentityTableTest(unittest.TestCase):
+
+    def test_share(self):
+        table = IdentityTable()
+
+        first = table.share('a', {'x': 1}, list, 'ab')
+        same = table.share('a', {'x': 1}, list, 'ab')
+        changed = table.share('a', {'x': 2}, list, 'ab')
+
+        self.assertIs(first, same)
+        self.assertIsNot(first, changed)
+        self.assertEqual(1, table.hits)
+        self.assertEqual(2, table.misses)
+
+    def test_evicts_least_recently_used(self):
+        table = IdentityTable(max_entries=2)
+        a = table.share('a', 1, object)
+        table.share('b', 1, object)
+        table.share('a', 1, object)
+        table.share('c', 1, object)
+
+        self.assertIs(a, table.share('a', 1, object))
+        self.assertEqual(2, len(table))
+        self.assertEqual(3, table.misses)
+
+
+class SharedParseTest(unittest.TestCase):
+
+    def test_unchanged_services_are_reused(self):
+        table = IdentityTable()
+        first = parser.parse_search(_search(), table=table)
+        changed = _search()
+        changed['services'][1]['locationDetail']['platform'] = '4'
+
+        second = parser.parse_search(changed, table=table)
+
+        self.assertIs(first.services[0], second.services[0])
+        self.assertIsNot(first.services[1], second.services[1])
+        self.assertEqual('4', second.services[1].location_detail.platform)
+        self.assertIs(first.services[2], second.services[2])
+
+    def test_same_service_on_different_boards_is_not_shared(self):
+        table = IdentityTable()
+        other = _search()
+        for service in other['services']:
+            service['locationDetail'] = _location('WAT', '0950')
+
+        first = parser.parse_search(_search(), table=table)
+        second = parser.parse_search(other, table=table)
+
+        self.assertEqual('CLJ', first.services[0].location_detail.crs)
+        self.assertEqual('WAT', second.services[0].location_detail.crs)
+
+    def test_lazy(self):
+        table = IdentityTable()
+        first = parser.parse_search(_search(), lazy=True, table=table)
+        second = parser.parse_search(_search(), lazy=True, table=table)
+
+        self.assertIs(first.services[1], second.services[1])
+
+    def test_unchanged_service_is_reused(self):
+        table = IdentityTable()
+
+        first = parser.parse_service(_service(), table=table)
+        second = parser.parse_service(_service(), table=table)
+
+        self.assertIs(first, second)
+
+    def test_unchanged_locations_are_reused(self):
+        table = IdentityTable()
+        first = parser.parse_service(_service(), table=table)
+        changed = _service()
+        changed['locations'][2]['platform'] = '5'
+
+        second = parser.parse_service(changed, table=table)
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.locations[0], second.locations[0])
+        self.assertIs(first.locations[1], second.locations[1])
+        self.assertEqual('5', second.locations[2].platform)
+        self.assertEqual(1200 + 86400, second.locations[2].gbtt_booked_departure_seconds)
+
+    def test_matches_unshared_parse(self):
+        table = IdentityTable()
+        parser.parse_service(_service(), table=table)
+        changed = _service()
+        changed['locations'][1]['platform'] = '2'
+
+        shared = parser.parse_service(copy.deepcopy(changed), table=table)
+        plain = parser.parse_service(changed)
+
+        for a, b in zip(shared.locations, plain.locations):
+            self.assertEqual([getattr(a, name) for name in ('crs', 'platform', 'gbtt_booked_departure_seconds')],
+                             [getattr(b, name) for name in ('crs', 'platform', 'gbtt_booked_departure_seconds')])
+
+
+class _Response:
+    status_code = 200
+    ok = True
+    reason = 'OK'
+    headers = {}
+
+    def __init__(self, body):
+        self.content = body
+
+    def close(self):
+        pass
+
+
+class _Transport(Transport):
+    def get(self, url, auth, headers=None):
+        return _Response(_json.dumps(_search()).encode('utf-8'))
+
+
+class ApiTest(unittest.TestCase):
+
+    def test_repeated_polls_share_services(self):
+        table = IdentityTable()
+        api = RttApi('user', 'pass', transport=_Transport(), identity_table=table)
+
+        first = api.search_station_departures('CLJ')
+        second = api.search_station_departures('CLJ')
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.services[0], second.services[0])
+        self.assertEqual(3, table.hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
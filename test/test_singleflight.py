@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from rttapi.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait()
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', work))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+
+        while flight.calls < 5:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(4, flight.coalesced)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+
+        self.assertEqual(1, flight.do('key', lambda: 1))
+        self.assertEqual(2, flight.do('key', lambda: 2))
+        self.assertEqual(0, flight.coalesced)
+
+    def test_error_is_raised(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            flight.do('key', fail)
+
+        self.assertEqual(1, flight.do('key', lambda: 1))
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_result(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def run():
+            return await asyncio.gather(*(flight.do('key', work) for _ in range(5)))
+
+        results = asyncio.run(run())
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(4, flight.coalesced)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_error_is_shared(self):
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError()
+
+        async def run():
+            return await asyncio.gather(*(flight.do('key', fail) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return 'result'
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do('key', work))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do('key', work))
+            await asyncio.sleep(0.005)
+            leader.cancel()
+            return await asyncio.gather(leader, follower, return_exceptions=True)
+
+        leader, follower = asyncio.run(run())
+
+        self.assertIsInstance(leader, asyncio.CancelledError)
+        self.assertEqual('result', follower)
+        self.assertEqual(1, len(calls))
+
+    def test_work_cancelled_with_last_caller(self):
+        flight = AsyncSingleFlight()
+        cancelled = []
+
+        async def work():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        async def run():
+            caller = asyncio.ensure_future(flight.do('key', work))
+            await asyncio.sleep(0.005)
+            caller.cancel()
+            await asyncio.gather(caller, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        self.assertEqual([1], cancelled)
+
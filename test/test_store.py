@@ -0,0 +1,94 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from rttapi.store import ServiceStore
+
+_DATE = datetime.date(2021, 3, 27)
+
+
+class ServiceStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_missing(self):
+        store = ServiceStore(self.directory)
+
+        self.assertIsNone(store.get('W12345', _DATE))
+
+    def test_put_and_get(self):
+        store = ServiceStore(self.directory)
+        store.put('W12345', _DATE, b'{"serviceUid": "W12345"}')
+
+        self.assertEqual(b'{"serviceUid": "W12345"}', store.get('W12345', _DATE))
+        self.assertIn(('W12345', _DATE), store)
+        self.assertNotIn(('W12345', _DATE + datetime.timedelta(days=1)), store)
+
+    def test_data_is_compressed(self):
+        store = ServiceStore(self.directory)
+        raw = b'{"locations": [' + b','.join([b'{"tiploc": "CLPHMJC"}'] * 500) + b']}'
+        store.put('W12345', _DATE, raw)
+
+        on_disk = sum(os.path.getsize(os.path.join(self.directory, f))
+                      for f in os.listdir(self.directory) if f.endswith('.json.gz'))
+        self.assertLess(on_disk, len(raw) / 10)
+
+    def test_visible_to_other_instances(self):
+        writer = ServiceStore(self.directory)
+        reader = ServiceStore(self.directory)
+
+        self.assertIsNone(reader.get('W12345', _DATE))
+
+        writer.put('W12345', _DATE, b'{}')
+
+        self.assertEqual(b'{}', reader.get('W12345', _DATE))
+
+    def test_evicts_oldest_when_over_size(self):
+        store = ServiceStore(self.directory, max_bytes=100)
+        store.put('W00001', _DATE, os.urandom(60))
+        store.put('W00002', _DATE, os.urandom(60))
+
+        self.assertIsNone(store.get('W00001', _DATE))
+        self.assertIsNotNone(store.get('W00002', _DATE))
+        self.assertEqual(1, len(store))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'W00001_2021-03-27.json.gz')))
+
+    def test_sizes_shared_between_instances(self):
+        first = ServiceStore(self.directory, max_bytes=200)
+        second = ServiceStore(self.directory, max_bytes=200)
+        first.put('W00001', _DATE, os.urandom(60))
+        second.put('W00002', _DATE, os.urandom(60))
+        first.put('W00003', _DATE, os.urandom(60))
+
+        self.assertIsNone(second.get('W00001', _DATE))
+        self.assertIsNotNone(second.get('W00002', _DATE))
+        self.assertEqual(2, len(first))
+        self.assertEqual(2, len(second))
+
+    def test_replacing_an_entry_counts_it_once(self):
+        store = ServiceStore(self.directory, max_bytes=200)
+        for _ in range(3):
+            store.put('W00001', _DATE, os.urandom(60))
+        store.put('W00002', _DATE, os.urandom(60))
+
+        self.assertIsNotNone(store.get('W00001', _DATE))
+        self.assertEqual(2, len(store))
+
+    def test_log_is_compacted(self):
+        store = ServiceStore(self.directory)
+        reader = ServiceStore(self.directory)
+        for i in range(1500):
+            store.put('W00001', _DATE, str(i).encode('utf-8'))
+        store.put('W00002', _DATE, b'{}')
+
+        with open(os.path.join(self.directory, 'index.log'), 'rb') as f:
+            self.assertLess(len(f.read().splitlines()), 1024)
+        self.assertEqual(2, len(reader))
+        self.assertEqual(b'1499', reader.get('W00001', _DATE))
+
@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from rttapi.stream import iter_json_array
+
+
+def _chunks(data, size):
+    raw = json.dumps(data).encode('utf-8') if not isinstance(data, bytes) else data
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class StreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.document = {
+            'location': {'name': 'Clapham Junction', 'crs': 'CLJ', 'tiploc': ['CLPHMJ1', 'CLPHMJ2']},
+            'filter': None,
+            'count': 12345,
+            'services': [
+                {'serviceUid': 'W00001', 'locationDetail': {'description': 'Café [sic], "quoted" {x}'}},
+                {'serviceUid': 'W00002', 'countdownMinutes': 1234567},
+                {'serviceUid': 'W00003', 'services': []}
+            ]
+        }
+
+    def test_yields_every_item_for_any_chunk_size(self):
+        for size in (1, 2, 7, 64, 100000):
+            actual = list(iter_json_array(_chunks(self.document, size), 'services'))
+            self.assertEqual(self.document['services'], actual, size)
+
+    def test_numbers_split_between_chunks(self):
+        raw = b'{"services": [5.5, -12.25, 1.5e3, 2E-2, 10]}'
+        for split in range(1, len(raw)):
+            actual = list(iter_json_array([raw[:split], raw[split:]], 'services'))
+            self.assertEqual([5.5, -12.25, 1500.0, 0.02, 10], actual, raw[:split])
+
+    def test_stops_reading_after_array(self):
+        raw = json.dumps(self.document).encode('utf-8') + b' trailing garbage'
+        chunks = iter(_chunks(raw, 10))
+
+        actual = list(iter_json_array(chunks, 'services'))
+
+        self.assertEqual(3, len(actual))
+        self.assertNotEqual([], list(chunks))
+
+    def test_caller_can_stop_early(self):
+        items = iter_json_array(_chunks(self.document, 16), 'services')
+
+        self.assertEqual('W00001', next(items)['serviceUid'])
+        items.close()
+
+    def test_null_and_empty_and_missing(self):
+        self.assertEqual([], list(iter_json_array(_chunks({'services': None}, 3), 'services')))
+        self.assertEqual([], list(iter_json_array(_chunks({'services': []}, 3), 'services')))
+        self.assertEqual([], list(iter_json_array(_chunks({'location': {}}, 3), 'services')))
+        self.assertEqual([], list(iter_json_array(_chunks({}, 3), 'services')))
+
+    def test_truncated_document_fails(self):
+        raw = json.dumps(self.document).encode('utf-8')[:-20]
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array(_chunks(raw, 8), 'services'))
+
+    def test_not_an_object_fails(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1, 2]'], 'services'))
@@ -0,0 +1,58 @@
+import unittest
+
+import rttapi.timing as timing
+from rttapi.model import Location
+
+
+class TimingTest(unittest.TestCase):
+
+    def test_time_to_seconds(self):
+        self.assertEqual(0, timing.time_to_seconds('0000'))
+        self.assertEqual(15 * 3600 + 3 * 60, timing.time_to_seconds('1503'))
+        self.assertEqual(15 * 3600 + 3 * 60 + 30, timing.time_to_seconds('150330'))
+
+    def test_time_to_seconds_invalid(self):
+        self.assertIsNone(timing.time_to_seconds(None))
+        self.assertIsNone(timing.time_to_seconds(''))
+        self.assertIsNone(timing.time_to_seconds('15:3'))
+        self.assertIsNone(timing.time_to_seconds('15030'))
+
+    def test_rollover(self):
+        reference = timing.time_to_seconds('2330')
+
+        self.assertEqual(timing.SECONDS_PER_DAY + 55 * 60, timing.rollover(timing.time_to_seconds('0055'), reference))
+        self.assertEqual(timing.time_to_seconds('2320'), timing.rollover(timing.time_to_seconds('2320'), reference))
+        self.assertEqual(timing.time_to_seconds('0600'),
+                         timing.rollover(timing.time_to_seconds('0600'), timing.time_to_seconds('0610')))
+        self.assertIsNone(timing.rollover(None, reference))
+
+    def test_seconds_to_time(self):
+        self.assertEqual('0055', timing.seconds_to_time(timing.SECONDS_PER_DAY + 55 * 60))
+        self.assertEqual('150330', timing.seconds_to_time(timing.time_to_seconds('150330'), with_seconds=True))
+
+    def test_delay_seconds(self):
+        self.assertEqual(120, timing.delay_seconds(100, 220))
+        self.assertEqual(-60, timing.delay_seconds(100, 40))
+        self.assertIsNone(timing.delay_seconds(None, 40))
+
+    def test_compare_times(self):
+        self.assertLess(timing.compare_times(1, 2), 0)
+        self.assertEqual(0, timing.compare_times(2, 2))
+        self.assertLess(timing.compare_times(2, None), 0)
+        self.assertGreater(timing.compare_times(None, 2), 0)
+        self.assertEqual(0, timing.compare_times(None, None))
+
+    def test_departure_sort_key(self):
+        early = Location()
+        early.gbtt_booked_departure_seconds = 100
+        late = Location()
+        late.gbtt_booked_departure_seconds = 200
+        late.realtime_departure_seconds = 50
+        unknown = Location()
+
+        self.assertEqual([late, early, unknown], sorted([unknown, early, late], key=timing.departure_sort_key))
+        self.assertIsNone(timing.arrival_seconds(unknown))
+
+
+if __name__ == '__main__':
+    unittest.main()